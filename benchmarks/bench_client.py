@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""End-to-end benchmarks of BigDbClient against a local BigDbSimulator (see pybsn.simulator).
+
+The simulator serves the data under controller/bench: a small object (small), lists of 10k and 100k
+switch-like records (list-10000, list-100000) and a list to write to (switch), and the RPC bench/echo.
+It reuses the encoded response of unchanged data, so the time of reads is dominated by pybsn; the
+time of writes includes storing the data in the simulator.
+
+Each scenario is run --repeat times after a warm-up round; the median time per operation is reported.
+Results can be written as JSON and compared with an earlier run, e.g., between two commits:
+
+    python benchmarks/bench_client.py --output base.json
+    (change pybsn)
+    python benchmarks/bench_client.py --compare base.json
+
+--compare exits with status 1 if a scenario got slower by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pybsn  # noqa: E402
+from pybsn.simulator import BigDbSimulator  # noqa: E402
+
+LIST_SIZES = (10000, 100000)
+
+SCENARIOS: Dict[str, Callable[[argparse.Namespace, str], Callable[[], int]]] = {}
+
+
+def scenario(name: str) -> Callable[[Callable[[argparse.Namespace, str], Callable[[], int]]], Any]:
+    """Registers a scenario. The decorated function sets up and returns a callable that runs one round
+    and returns the number of operations it performed."""
+
+    def register(setup: Callable[[argparse.Namespace, str], Callable[[], int]]) -> Any:
+        SCENARIOS[name] = setup
+        return setup
+
+    return register
+
+
+def make_records(count: int) -> List[Dict[str, Any]]:
+    """Returns count records resembling core/switch entries; the output is deterministic."""
+    return [
+        {
+            "name": "leaf%d" % i,
+            "dpid": "00:00:%02x:%02x:%02x:%02x:%02x:%02x" % tuple((i >> s) & 0xFF for s in (40, 32, 24, 16, 8, 0)),
+            "connected": i % 7 != 0,
+            "fabric-role": ("leaf", "spine")[i % 2],
+            "connected-since": "2026-01-01T00:00:00.000Z",
+            "inet-address": {"ip": "10.%d.%d.%d" % ((i >> 16) & 0xFF, (i >> 8) & 0xFF, i & 0xFF), "port": 6653},
+            "stats": {"rx-packets": i * 1000, "tx-packets": i * 998, "rx-bytes": i * 64000, "errors": i % 3},
+        }
+        for i in range(count)
+    ]
+
+
+def start_simulator() -> BigDbSimulator:
+    """Starts a simulator serving the data and RPC used by the scenarios."""
+    data: Dict[str, Any] = {"small": make_records(1)[0], "switch": []}
+    for size in LIST_SIZES:
+        data["list-%d" % size] = make_records(size)
+    simulator = BigDbSimulator(data={"bench": data})
+    simulator.add_rpc("bench/echo", lambda body: body if body is not None else {})
+    return simulator.start()
+
+
+def _client(url: str) -> pybsn.BigDbClient:
+    return pybsn.connect(url)
+
+
+@scenario("small-get")
+def small_get(args: argparse.Namespace, url: str) -> Callable[[], int]:
+    node = _client(url).root.bench.small
+    count = 1000 * args.scale
+
+    def run() -> int:
+        for _ in range(count):
+            node.get()
+        return count
+
+    return run
+
+
+def _list_get(size: int) -> Callable[[argparse.Namespace, str], Callable[[], int]]:
+    def setup(args: argparse.Namespace, url: str) -> Callable[[], int]:
+        node = _client(url).root.bench["list-%d" % size]
+
+        def run() -> int:
+            node.get()
+            return 1
+
+        return run
+
+    return setup
+
+
+for _size in LIST_SIZES:
+    scenario("list-get-%dk" % (_size // 1000))(_list_get(_size))
+
+
+@scenario("list-iter-100k")
+def list_iter(args: argparse.Namespace, url: str) -> Callable[[], int]:
+    node = _client(url).root.bench["list-100000"]
+
+    def run() -> int:
+        for _ in node.iter():
+            pass
+        return 1
+
+    return run
+
+
+@scenario("bulk-put-10k")
+def bulk_put(args: argparse.Namespace, url: str) -> Callable[[], int]:
+    node = _client(url).root.bench.switch
+    records = make_records(10000)
+
+    def run() -> int:
+        node.put(records)
+        return 1
+
+    return run
+
+
+@scenario("rpc")
+def rpc(args: argparse.Namespace, url: str) -> Callable[[], int]:
+    node = _client(url).root.bench.echo
+    count = 500 * args.scale
+
+    def run() -> int:
+        for i in range(count):
+            node.rpc({"sequence": i})
+        return count
+
+    return run
+
+
+@scenario("concurrent-get")
+def concurrent_get(args: argparse.Namespace, url: str) -> Callable[[], int]:
+    nodes = [_client(url).root.bench.small for _ in range(args.clients)]
+    count = 200 * args.scale
+
+    def worker(node: pybsn.Node) -> None:
+        for _ in range(count):
+            node.get()
+
+    def run() -> int:
+        threads = [threading.Thread(target=worker, args=(node,)) for node in nodes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return count * len(nodes)
+
+    return run
+
+
+def measure(run: Callable[[], int], repeat: int) -> Dict[str, Any]:
+    run()  # warm-up
+    per_op: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = run()
+        per_op.append((time.perf_counter() - start) / ops)
+    median = statistics.median(per_op)
+    return {
+        "ops": ops,
+        "median_s": median,
+        "min_s": min(per_op),
+        "max_s": max(per_op),
+        "ops_per_s": 1.0 / median,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Prints the change of each scenario against baseline; returns False if one regressed."""
+    ok = True
+    print("\n%-16s %12s %12s %8s" % ("scenario", "base (ms)", "now (ms)", "change"))
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print("%-16s %12s %12.3f" % (name, "-", result["median_s"] * 1000))
+            continue
+        change = result["median_s"] / base["median_s"] - 1.0
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(
+            "%-16s %12.3f %12.3f %+7.1f%%%s"
+            % (name, base["median_s"] * 1000, result["median_s"] * 1000, change * 100, "  REGRESSION" if regressed else "")
+        )
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pybsn against a local BigDB simulator")
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all of %s)" % ", ".join(SCENARIOS))
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Measured rounds per scenario")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier for the operations per round")
+    parser.add_argument("--clients", type=int, default=8, help="Clients (threads) for concurrent-get")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", "-c", help="Compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as regression")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error("unknown scenarios: %s" % ", ".join(sorted(unknown)))
+
+    server = start_simulator()
+    try:
+        results: Dict[str, Any] = {
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "codec": pybsn.get_codec().name,
+            },
+            "parameters": {"repeat": args.repeat, "scale": args.scale, "clients": args.clients},
+            "results": {},
+        }
+        for name in args.scenarios or SCENARIOS:
+            result = measure(SCENARIOS[name](args, server.url), args.repeat)
+            results["results"][name] = result
+            print("%-16s %10.3f ms/op %12.1f ops/s" % (name, result["median_s"] * 1000, result["ops_per_s"]))
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
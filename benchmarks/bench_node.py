@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""Micro-benchmark of Node path building: traversal, match(), filter() and at()/compiled templates.
+
+No controller is needed; nodes are built against a placeholder connection. Prints the time per
+operation in microseconds, e.g.,
+
+    python benchmarks/bench_node.py --number 100000
+"""
+
+import argparse
+import timeit
+
+import pybsn
+
+parser = argparse.ArgumentParser(description="Measure the cost of building Node paths")
+parser.add_argument("--number", "-n", type=int, default=100000, help="Operations per measurement")
+parser.add_argument("--repeat", "-r", type=int, default=5, help="Measurements; the best is reported")
+args = parser.parse_args()
+
+root = pybsn.Node("controller", None)
+SEGMENT = "tenant[name=$t]/segment[name=$s]"
+
+CASES = {
+    "traverse root.core.switch_config": lambda: root.core.switch_config,
+    "traverse root.applications.bcf.info.fabric.switch": lambda: root.applications.bcf.info.fabric.switch,
+    "match tenant/segment": lambda: root.applications.bcf.tenant.match(name="t1").segment.match(name="s1"),
+    "filter member-vlan<$max": lambda: root.applications.bcf.tenant.segment.filter("member-vlan<$max", max=1000),
+    "at tenant[name=$t]/segment[name=$s]": lambda: root.applications.bcf.at(SEGMENT, t="t1", s="s1"),
+    "normalize str/int/bool": lambda: (pybsn.normalize("leaf 1"), pybsn.normalize(1000), pybsn.normalize(True)),
+}
+
+for name, case in CASES.items():
+    best = min(timeit.repeat(case, number=args.number, repeat=args.repeat))
+    print("%-55s %8.3f us" % (name, best / args.number * 1e6))
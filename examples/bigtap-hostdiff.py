@@ -21,7 +21,7 @@ parser.add_argument("--password", "-p", type=str, default="adminadmin", help="Pa
 args = parser.parse_args()
 
 bt = pybsn.connect(args.host, args.user, args.password)
-hosts = bt.root.applications.bigtap.tracked_host()
+hosts = bt.root.applications.bigtap.tracked_host.select("ip_addr", "mac_addr", "host_name")()
 
 new_data = []
 for host in hosts:
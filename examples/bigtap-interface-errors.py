@@ -15,14 +15,18 @@ args = parser.parse_args()
 bt = pybsn.connect(args.host, args.user, args.password)
 topology = bt.root.applications.bigtap.topology
 
+interface_types = ["core", "filter", "delivery", "service"]
+# Fetch all interface lists and the switches concurrently
+*interface_results, switch_result = bt.get_many([topology[t + "-interface"] for t in interface_types] + [bt.root.core.switch])
+
 interfaces = []
-for interface_type in ["core", "filter", "delivery", "service"]:
-    for interface in topology[interface_type + "-interface"]():
+for interface_type, result in zip(interface_types, interface_results):
+    for interface in result.result():
         interface["type"] = interface_type
         interfaces.append(interface)
 
 switches_by_dpid = {}
-for switch in bt.root.core.switch():
+for switch in switch_result.result():
     switches_by_dpid[switch["dpid"]] = switch
 
 
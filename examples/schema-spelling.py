@@ -16,25 +16,9 @@ args = parser.parse_args()
 
 bcf = pybsn.connect(args.host, args.user, args.password)
 
-names = []
-descriptions = []
-
-
-def traverse(node):
-    if "name" in node:
-        names.append(node["name"])
-
-    if "description" in node:
-        descriptions.append(node["description"])
-
-    if node["nodeType"] == "CONTAINER" or node["nodeType"] == "LIST_ELEMENT":
-        for child_name, child in node["childNodes"].items():
-            traverse(child)
-    elif node["nodeType"] == "LIST":
-        traverse(node["listElementSchemaNode"])
-
-
-traverse(bcf.root.schema())
+index = pybsn.SchemaIndex(bcf.schema(args.path), args.path)
+names = index.names
+descriptions = [description for description in index.descriptions if description is not None]
 
 chkr = SpellChecker("en_US")
 chkr.set_text(" ".join(names).lower())
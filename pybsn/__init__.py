@@ -1,16 +1,46 @@
+import concurrent.futures
+import contextlib
 import json
 import logging
 import re
-import urllib.parse
+import sys
+import time
 import warnings
-from string import Template
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, TypeVar, Union
 from urllib.parse import urlparse
 
 import requests
 import urllib3.util
 from urllib3.exceptions import InsecureRequestWarning
 
+from pybsn.cache import ResponseCache  # noqa: F401
+from pybsn.codec import JsonCodec, get_codec  # noqa: F401
+from pybsn.columns import ColumnType, column_types, decode_columns  # noqa: F401
+from pybsn.compression import CompressionOptions, TransferStats, compress_request  # noqa: F401
+from pybsn.conditional import ConditionalResult, ConditionalStore, digest
+from pybsn.counters import CounterPoller, CounterSample  # noqa: F401
+from pybsn.discovery import (  # noqa: F401
+    PROBE_TIMEOUT,
+    cached_url,
+    candidate_urls,
+    clear_url_cache,
+    forget_url,
+    probe_urls,
+    remember_url,
+)
+from pybsn.instrument import LatencyCollector, PendingEvents, RequestEvent, RequestHooks, emit  # noqa: F401
+from pybsn.paging import Page, list_key, paginate, schema_path  # noqa: F401
+from pybsn.pool import PooledHTTPAdapter, PoolOptions, PoolStats, mount_pool  # noqa: F401
+from pybsn.projection import child_names, excluding, field_name, select_params, selected_fields
+from pybsn.records import Record, record_class  # noqa: F401
+from pybsn.retry import BreakerOptions, CircuitBreaker, CircuitOpenError, RetryPolicy, RetryStats  # noqa: F401
+from pybsn.schemacache import ROOT_SCHEMA_PATH, VERSION_PATH, SchemaCache, version_key  # noqa: F401
+from pybsn.schemaindex import SchemaEntry, SchemaIndex  # noqa: F401
+from pybsn.sessioncache import SessionCache  # noqa: F401
+from pybsn.singleflight import SingleFlight  # noqa: F401
+from pybsn.stream import iter_json_array
+from pybsn.template import PathTemplate, compile_template, normalize  # noqa: F401
+
 warnings.simplefilter("ignore", InsecureRequestWarning)
 
 logger = logging.getLogger("pybsn")
@@ -32,8 +62,171 @@ class _ClientTimeout:
 """Use the timeout that has been specified by the client."""
 CLIENT_TIMEOUT = _ClientTimeout()
 
+_N = TypeVar("_N", bound="_BaseNode")
+
+"""Default number of worker threads used by BigDbClient.get_many(). Stays below the default size of the
+connection pool (10), so that concurrent requests reuse pooled connections."""
+GET_MANY_MAX_WORKERS = 8
+
+"""Default number of bytes read from the connection at a time by BigDbClient.iter_get()."""
+ITER_CHUNK_SIZE = 64 * 1024
+
+
+class GetResult(NamedTuple):
+    """Outcome of a single GET issued by BigDbClient.get_many().
+
+    Exactly one of value and error is meaningful: error is the exception raised by the request, or None
+    if it succeeded.
+    """
+
+    path: str
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    def result(self) -> Any:
+        """Returns the deserialized data, or raises the exception of a failed request."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class _BaseNode(object):
+    """Path handling shared by Node and the asyncio pybsn.aio.AsyncNode.
+
+    Traversal, match(), filter() and select() return new nodes of the same class bound to the same
+    connection. Predicates and selected fields apply to the node they are added to; traversing to a
+    child node keeps the predicates in its path, but not the selected fields (at() keeps both).
+
+    Nodes are immutable, so child nodes accessed as attributes are created once per parent and reused:
+    traversing root.core.switch again returns the same objects. Their names are interned. Children
+    accessed with [] (e.g., with names computed at runtime) are not kept, so that the children of a
+    long-lived node do not accumulate; [] returns the memoized child if there is one, though.
+    """
+
+    __slots__ = ("_path", "_connection", "_select", "_children")
+
+    def __init__(self, path: str, connection: Any, select: Tuple[str, ...] = ()) -> None:
+        self._path = path
+        self._connection = connection
+        self._select = select
+        self._children: Optional[Dict[str, Any]] = None
+
+    def __getattr__(self: _N, name: str) -> _N:
+        """Provides node traversal access to child nodes (root.core.switch_config).
+
+        As hyphens cannot be used in identifiers in python, they are converted to underscores here.
+        """
+        if name.startswith("_"):
+            # Protocol lookups (e.g., __deepcopy__ or __getstate__) and unset slots are not child nodes
+            raise AttributeError(name)
+        children = self._children
+        if children is None:
+            children = self._children = {}
+        child_name = name.replace("_", "-")
+        child = children.get(child_name)
+        if child is None:
+            child = children[sys.intern(child_name)] = type(self)(self._path + "/" + child_name, self._connection)
+        return child
+
+    def __getitem__(self: _N, name: str) -> _N:
+        """Provides dictionary style access to child nodes, e.g., root["os"]["global"]["config"].
+
+        Note that the parameter values are used as-is in BigDB, i.e., use hyphens not underscores here.
+
+        E.g., root["core"]["switch-config"].
+
+        """
+        children = self._children
+        child = children.get(name) if children is not None else None
+        if child is None:
+            child = type(self)(self._path + "/" + name, self._connection)
+        return child
+
+    def match(self: _N, **kwargs: Any) -> _N:
+        """Adds exact match predicates to the path represented by the current Node. Returns
+        a Node representing the new path.
+
+        Supply the child element(s) to match on as keyword parameters:
+        * The name of the parameter indicates the child element to match on
+           (hyphens converted to underscores)
+        * The value of the parameter indicates the desired value
 
-class Node(object):
+        E.g.,
+        node.match(mac_address="01:02:03:04:05:05:06")
+        translates into the BigDB Path
+
+        .../node[mac-address="14:18:77:96:8b:d6"]
+        """
+        predicates = "".join("[%s=%s]" % (k.replace("_", "-"), normalize(v)) for k, v in kwargs.items())
+        return type(self)(self._path + predicates, self._connection, self._select)
+
+    def filter(self: _N, template: str, *args: Any, **kwargs: Any) -> _N:
+        """Adds a predicate to the path represented by the current Node. Returns
+        a Node representing the new path.
+
+        :param :template the predicate to add. Any template variables (e.g., $x)
+               will be replaced with values retrieved from the keyword arguments
+
+        E.g., to retrieve all BCF segments with a member ID smaller than 1000, you
+        might do:
+        root.applications.bcf.tenant.segment.filter("member-vlan<$max", max=1000).get()
+
+        Here,
+        segment.filter("member-vlan<$max", max=1000)
+        translates into the BigDB path:
+        .../segment[member-vlan<1000]
+
+        The template is parsed once and cached; see pybsn.template.
+        """
+        predicate = "[" + compile_template(template).substitute(kwargs) + "]"
+        return type(self)(self._path + predicate, self._connection, self._select)
+
+    def at(self: _N, template: Union[str, PathTemplate], **kwargs: Any) -> _N:
+        """Returns the Node at a relative path below the current Node, with template variables (e.g.,
+        $t) replaced with the normalized values of the keyword arguments.
+
+        The template may span several path segments and predicates; it is parsed once and cached.
+        E.g.,
+        endpoint_manager.at("tenant[name=$t]/segment[name=$s]/endpoint", t="t1", s="s1")
+        translates into the BigDB path
+        .../tenant[name='t1']/segment[name='s1']/endpoint
+
+        The fields selected on the current Node are kept.
+        """
+        if isinstance(template, str):
+            template = compile_template(template)
+        return type(self)(self._path + "/" + template.substitute(kwargs), self._connection, self._select)
+
+    def select(self: _N, *fields: str) -> _N:
+        """Restricts the data retrieved from the path represented by the current Node to the given
+        fields. Returns a Node with the selection added to that of the current Node.
+
+        Field names are given as for match() (hyphens converted to underscores); a field may also be
+        a relative path, e.g., "interface/name". Each field becomes a select query parameter, so
+        BigDB only sends the selected data.
+
+        E.g.,
+        root.applications.bigtap.tracked_host.select("ip_addr", "mac_addr", "host_name").get()
+        translates into
+
+        GET .../tracked-host?select=ip-addr&select=mac-addr&select=host-name
+
+        Fields selected with a select parameter in the params of a request are retrieved as well.
+        """
+        selected = self._select + tuple(field_name(f) for f in fields if field_name(f) not in self._select)
+        return type(self)(self._path, self._connection, selected)
+
+    def _params(self, params: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """Request parameters for a GET of this node: params and the selected fields."""
+        return select_params(params, self._select)
+
+    def __repr__(self) -> str:
+        if self._select:
+            return "%s(%s, select=%s)" % (type(self).__name__, self._path, ",".join(self._select))
+        return "%s(%s)" % (type(self).__name__, self._path)
+
+
+class Node(_BaseNode):
     """Higher level "Node" abstraction for PyBSN.
 
     In this abstraction, the BigDB tree is represented as dynamically created nodes. You can
@@ -65,28 +258,11 @@ class Node(object):
     root.os.config["global"].
     """
 
-    def __init__(self, path: str, connection: "BigDbClient") -> None:
-        self._path = path
-        self._connection = connection
-
-    def __getattr__(self, name: str) -> "Node":
-        """Provides node traversal access to child nodes (root.core.switch_config).
-
-        As hyphens cannot be used in identifiers in python, they are converted to underscores here.
-        """
-        return self[name.replace("_", "-")]
+    __slots__ = ()
 
-    def __getitem__(self, name: str) -> "Node":
-        """Provides dictionary style access to child nodes, e.g., root["os"]["global"]["config"].
+    _connection: "BigDbClient"
 
-        Note that the parameter values are used as-is in BigDB, i.e., use hyphens not underscores here.
-
-        E.g., root["core"]["switch-config"].
-
-        """
-        return Node(self._path + "/" + name, self._connection)
-
-    def get(self, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT) -> Any:
+    def get(self, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT, cache: bool = True) -> Any:
         """Retrieve the data stored in BigDB at the path identified by this node.
 
         :params params: Optional hash of parameters that will be appended to the query
@@ -96,10 +272,100 @@ class Node(object):
             CLIENT_TIMEOUT indicates to use the default value from BigDbClient.
             A float is the number of seconds.
             Otherwise a urllib3.util.Timeout strategy can be used.
+        :param cache: if False, bypasses the client's response cache (if any) for this request.
         :return: Deserialized JSON data from BigDB. Typically a list, but may be a
             single value if params={'single': 'true'} is used.
         """
-        return self._connection.get(self._path, params, timeout=timeout)
+        return self._connection.get(self._path, self._params(params), timeout=timeout, cache=cache)
+
+    def get_conditional(
+        self, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT
+    ) -> ConditionalResult:
+        """Retrieve the data at the path identified by this node, noting whether it changed since the last call.
+
+        See BigDbClient.get_conditional(). E.g., in a polling loop:
+
+        result = switches.get_conditional()
+        if result.changed:
+            update(result.value)
+        """
+        return self._connection.get_conditional(self._path, self._params(params), timeout=timeout)
+
+    def iter(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        chunk_size: int = ITER_CHUNK_SIZE,
+    ) -> Iterator[Any]:
+        """Retrieve the list stored in BigDB at the path identified by this node, one element at a time.
+
+        See BigDbClient.iter_get(). E.g.,
+
+        for interface in root.core.switch.interface.iter():
+            ...
+        """
+        return self._connection.iter_get(self._path, self._params(params), timeout=timeout, chunk_size=chunk_size)
+
+    def iter_pages(
+        self,
+        page_size: int,
+        key: Optional[str] = None,
+        start_after: Any = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+    ) -> Iterator[Page]:
+        """Retrieve the list stored in BigDB at the path identified by this node in pages of page_size elements.
+
+        See BigDbClient.iter_pages(). E.g.,
+
+        for page in root.core.switch.iter_pages(1000):
+            ...
+        """
+        return self._connection.iter_pages(
+            self._path, page_size, key=key, start_after=start_after, params=self._params(params), timeout=timeout
+        )
+
+    def get_records(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        record_type: Optional[Type[Record]] = None,
+    ) -> List[Record]:
+        """Retrieve the list stored in BigDB at the path identified by this node as compact records.
+
+        See BigDbClient.get_records(). E.g.,
+
+        for endpoint in root.applications.bcf.info.endpoint_manager.endpoint.get_records():
+            print(endpoint.mac, endpoint["ip-address"])
+        """
+        return self._connection.get_records(self._path, self._params(params), timeout=timeout, record_type=record_type)
+
+    def get_columns(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        use_numpy: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Retrieve the list stored in BigDB at the path identified by this node as one column per leaf.
+
+        See BigDbClient.get_columns(). With select(), only the selected fields are returned. E.g.,
+
+        counters = root.core.switch.interface.select("name", "rx_error_count").get_columns()
+        """
+        return self._connection.get_columns(self._path, self._params(params), timeout=timeout, use_numpy=use_numpy)
+
+    def exclude(self: _N, *fields: str, timeout: TimeoutType = CLIENT_TIMEOUT) -> _N:
+        """Like select(), but selects all fields except the given ones. Returns a new Node.
+
+        The fields of the node are looked up in the schema (or, if fields have been selected already,
+        taken from the selection), e.g.,
+        root.core.switch.exclude("interface", "stats").get()
+
+        :raises ValueError if one of fields is not a field of the node.
+        """
+        available = self._select or tuple(child_names(self._connection.schema(schema_path(self._path), timeout=timeout)))
+        selected = excluding(available, [field_name(f) for f in fields])
+        return type(self)(self._path, self._connection, selected)
 
     def post(
         self, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT
@@ -193,46 +459,24 @@ class Node(object):
         """
         return self._connection.rpc(self._path, data, params, timeout=timeout)
 
-    def match(self, **kwargs: Any) -> "Node":
-        """Adds exact match predicates to the path represented by the current Node. Returns
-        a Node representing the new path.
+    def get_many(
+        self,
+        paths: Iterable[Union[str, "Node"]],
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        max_workers: int = GET_MANY_MAX_WORKERS,
+        as_completed: bool = False,
+    ) -> Iterator[GetResult]:
+        """Retrieve several subtrees concurrently, see BigDbClient.get_many().
 
-        Supply the child element(s) to match on as keyword parameters:
-        * The name of the parameter indicates the child element to match on
-           (hyphens converted to underscores)
-        * The value of the parameter indicates the desired value
+        :param paths: child paths relative to this node (e.g., "core-interface"), or Nodes. The fields
+            selected on this node apply to each child path; Nodes are retrieved with their own selection.
 
         E.g.,
-        node.match(mac_address="01:02:03:04:05:05:06")
-        translates into the BigDB Path
-
-        .../node[mac-address="14:18:77:96:8b:d6"]
+        topology.get_many(["core-interface", "filter-interface", "delivery-interface"])
         """
-        for k, v in kwargs.items():
-            self = self.filter("%s=$x" % k.replace("_", "-"), x=v)
-
-        return self
-
-    def filter(self, template: str, *args: Any, **kwargs: Any) -> "Node":
-        """Adds a predicate to the path represented by the current Node. Returns
-        a Node representing the new path.
-
-        :param :template the predicate to add. Any template variables (e.g., $x)
-               will be replaced with values retrieved from the keyword arguments
-
-        E.g., to retrieve all BCF segments with a member ID smaller than 1000, you
-        might do:
-        root.applications.bcf.tenant.segment.filter("member-vlan<$max", max=1000).get()
-
-        Here,
-        segment.filter("member-vlan<$max", max=1000)
-        translates into the BigDB path:
-        .../segment[member-vlan<1000]
-        """
-
-        kwargs = {k: _normalize(v) for k, v in kwargs.items()}
-        predicate = "[" + Template(template).substitute(**kwargs) + "]"
-        return Node(self._path + predicate, self._connection)
+        nodes = [p if isinstance(p, Node) else Node(self._path + "/" + p, self._connection, self._select) for p in paths]
+        return self._connection.get_many(nodes, params, timeout=timeout, max_workers=max_workers, as_completed=as_completed)
 
     def __call__(self, timeout: TimeoutType = CLIENT_TIMEOUT) -> Any:
         """Execute get method.
@@ -250,9 +494,6 @@ class Node(object):
     def __exit__(self, *args: Any) -> None:
         pass
 
-    def __repr__(self) -> str:
-        return "Node(%s)" % self._path
-
 
 class BigDbClient(object):
     """
@@ -272,9 +513,31 @@ class BigDbClient(object):
     url: str
     session: requests.Session
     root: Node
+    codec: JsonCodec
+    compression: Optional[CompressionOptions] = None
+    cache: Optional[ResponseCache] = None
+    _singleflight: Optional[SingleFlight] = None
+    hooks: List[RequestHooks]
+    retry: Optional[RetryPolicy] = None
+    breaker: Optional[CircuitBreaker] = None
+    schema_cache: Optional[SchemaCache] = None
+    """If True, close() does not log out of the session, so that it can be reused (see pybsn.sessioncache)."""
+    keep_session: bool = False
 
     def __init__(
-        self, url: str, session: requests.Session, timeout: Optional[Union[float, urllib3.util.Timeout]] = None
+        self,
+        url: str,
+        session: requests.Session,
+        timeout: Optional[Union[float, urllib3.util.Timeout]] = None,
+        pool_options: Optional[PoolOptions] = None,
+        codec: Union[None, str, JsonCodec] = None,
+        compression: Optional[CompressionOptions] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = False,
+        hooks: Optional[Iterable[RequestHooks]] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[BreakerOptions] = None,
+        schema_cache: Optional[SchemaCache] = None,
     ) -> None:
         """Create a new BigDBClient. Generally, you should use pybsn.connect() to get an instance.
 
@@ -289,11 +552,62 @@ class BigDbClient(object):
             The timeout value will be used by any following calls of
             the BigDbClient unless it is modified, or the timeout is
             overridden.
+        :param pool_options: if set, mounts a PooledHTTPAdapter with these connection pool and
+            socket options on the session.
+        :param codec: JSON codec (or codec name) used to encode request and decode response bodies;
+            see pybsn.codec. By default, the fastest installed codec is used.
+        :param compression: if set, negotiates compressed responses, compresses large request bodies
+            and counts transferred bytes (see transfer_stats()).
+        :param cache: if set, GET responses are cached according to its TTLs; see pybsn.cache.
+        :param coalesce: if True, concurrent GETs of the same path and params share one request;
+            see pybsn.singleflight.
+        :param hooks: RequestHooks called for each request; see pybsn.instrument.
+        :param retry: if set, failed requests are retried according to this policy (see retry_stats());
+            see pybsn.retry.
+        :param breaker: if set, requests fail fast with CircuitOpenError while the controller is down
+            (see breaker_stats()); see pybsn.retry.
+        :param schema_cache: if set, schema() is served from the complete schema of the controller,
+            which is cached on disk per software version (see schema_cache_stats()); see pybsn.schemacache.
         """
         self.url = url
         self.session = session
+        self._init_state(timeout, codec, compression, cache, coalesce, hooks, retry, breaker, schema_cache)
+        if pool_options is not None:
+            mount_pool(session, pool_options)
         self.root = Node("controller", self)
+
+    def _init_state(
+        self,
+        timeout: Optional[Union[float, urllib3.util.Timeout]] = None,
+        codec: Union[None, str, JsonCodec] = None,
+        compression: Optional[CompressionOptions] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = False,
+        hooks: Optional[Iterable[RequestHooks]] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[BreakerOptions] = None,
+        schema_cache: Optional[SchemaCache] = None,
+    ) -> None:
+        """Initializes the state of the client that does not depend on its URL and session (see __init__()).
+
+        Shared with subclasses that provide url, session and root differently, e.g., BigDbClusterClient.
+        """
         self.default_timeout = timeout
+        self.codec = get_codec(codec)
+        self.compression = compression
+        self._transfer_stats = TransferStats()
+        self.cache = cache
+        self._conditional = ConditionalStore()
+        self._singleflight = SingleFlight() if coalesce else None
+        self.hooks = list(hooks) if hooks else []
+        self._pending = PendingEvents()
+        self.retry = retry
+        self._retry_stats = RetryStats()
+        self.breaker = CircuitBreaker(breaker) if breaker is not None else None
+        self.schema_cache = schema_cache
+        self._schema_version: Optional[str] = None
+        self._record_types: Dict[str, Type[Record]] = {}
+        self._column_types: Dict[str, Dict[str, ColumnType]] = {}
 
     def _effective_timeout(self, timeout: TimeoutType) -> Optional[Union[float, urllib3.util.Timeout]]:
         """Calculate the timeout value for a request.
@@ -311,7 +625,13 @@ class BigDbClient(object):
         # At this point, timeout is not CLIENT_TIMEOUT, so it's one of: None, float, or urllib3.util.Timeout
         return timeout  # type: ignore[return-value]
 
-    def get(self, path: str, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT) -> Any:
+    def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        cache: bool = True,
+    ) -> Any:
         """Retrieves information from the REST API using the GET method.
 
         :param path: the URL path to retrieve the data from; does not include the prefix
@@ -322,10 +642,239 @@ class BigDbClient(object):
             CLIENT_TIMEOUT indicates to use the default value from BigDbClient.
             A float is the number of seconds.
             Otherwise a urllib3.util.Timeout strategy can be used.
+        :param cache: if False, the response cache (if any) is not consulted; the response is still
+            stored in it, refreshing the cached entry.
         :return: Deserialized JSON data from BigDB. Typically a list, but may be a
             single value if params={'single': 'true'} is used.
+
+        If the client coalesces requests, a GET that is issued while an identical one is in flight
+        waits for that request (with its timeout) instead of sending its own.
+        """
+        response_cache = self.cache
+        if response_cache is None:
+            with self._decoding():
+                return self.codec.loads(self._get_content(path, params, timeout))
+        content = response_cache.get(path, params) if cache else None
+        if content is None:
+            generation = response_cache.generation
+            with self._decoding():
+                content = self._get_content(path, params, timeout)
+                result = self.codec.loads(content)
+            response_cache.put(path, params, content, generation)
+            return result
+        return self.codec.loads(content)
+
+    def _get_content(self, path: str, params: Optional[Dict[str, str]], timeout: TimeoutType) -> bytes:
+        """Returns the raw body of a GET; shares the request with identical GETs in flight if coalescing."""
+        singleflight = self._singleflight
+        if singleflight is None:
+            return self._request("GET", path, params=params, timeout=timeout, decode=True).content
+        return singleflight.do(
+            ConditionalStore.key(path, params),
+            lambda: self._request("GET", path, params=params, timeout=timeout, decode=True).content,
+        )
+
+    def get_conditional(
+        self, path: str, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT
+    ) -> ConditionalResult:
+        """Retrieves information from the REST API like get(), but skips the transfer or the decoding of
+        the response if it did not change since the last get_conditional() of the same path and params.
+
+        The request is conditional (If-None-Match / If-Modified-Since) if the previous response had an
+        ETag or Last-Modified header. Otherwise, the raw body is compared to the previous one by digest.
+        Either way, an unchanged response returns the previously decoded value, which thus must not be
+        modified by the caller. The response cache (if any) is not used.
+
+        :param path: the URL path to retrieve the data from; does not include the prefix
+              (/api/v1/data).
+        :param params: request parameters to attach
+        :param timeout: see get().
+        :return: ConditionalResult of the decoded value and whether it changed.
+        """
+        key = ConditionalStore.key(path, params)
+        previous = self._conditional.get(key)
+        headers = previous.headers() if previous is not None else None
+        with self._decoding():
+            response = self._request("GET", path, params=params, timeout=timeout, headers=headers, decode=True)
+            if previous is not None and response.status_code == requests.codes.not_modified:
+                return ConditionalResult(previous.value, changed=False)
+            content_digest = digest(response.content)
+            if previous is not None and previous.digest == content_digest:
+                value, changed = previous.value, False
+            else:
+                value, changed = self.codec.loads(response.content), True
+        self._conditional.put(key, response.headers, content_digest, value)
+        return ConditionalResult(value, changed)
+
+    def iter_get(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        chunk_size: int = ITER_CHUNK_SIZE,
+    ) -> Iterator[Any]:
+        """Retrieves a list from the REST API and yields its elements as they are received.
+
+        Unlike get(), the response is decoded incrementally while it is streamed, so memory use is bounded
+        by the largest element rather than by the whole list. The request is sent when iteration starts;
+        the connection is released when iteration completes or the iterator is closed.
+
+        :param path: the URL path to retrieve the data from; does not include the prefix
+              (/api/v1/data).
+        :param params: request parameters to attach
+        :param timeout: see get(). With a float timeout, the read timeout applies to each chunk.
+        :param chunk_size: number of bytes to read from the connection at a time.
+        :return: an iterator over the list elements. If the result is not a list (e.g.,
+            params={'single': 'true'} is used), it is yielded as the only element.
+        """
+        response = self._request("GET", path, params=params, timeout=timeout, stream=True)
+        size = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal size
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                yield chunk
+
+        try:
+            yield from iter_json_array(chunks(), self.codec.loads)
+        finally:
+            response.close()
+            if self.compression is not None:
+                self._transfer_stats.record_response(response, size=size)
+
+    def iter_pages(
+        self,
+        path: str,
+        page_size: int,
+        key: Optional[str] = None,
+        start_after: Any = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+    ) -> Iterator[Page]:
+        """Retrieves a keyed list from the REST API and yields its elements in pages as they are received.
+
+        The list is streamed as by iter_get(), so at most one page is held in memory. Iteration can be
+        stopped at any page and later resumed after it by passing its last_key as start_after, which
+        adds the predicate [<key> > start_after] to the path; see pybsn.paging.
+
+        :param path: the URL path of the list; does not include the prefix (/api/v1/data).
+        :param page_size: number of elements per page.
+        :param key: name of the key leaf of the list elements. By default, it is looked up in the schema.
+        :param start_after: if set, only elements with a key greater than this value are retrieved.
+        :param params: request parameters to attach
+        :param timeout: see iter_get().
+        :return: an iterator over Pages of list elements.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be positive: %d" % page_size)
+        if key is None:
+            key = list_key(self.schema(schema_path(path), timeout=timeout))
+        if start_after is not None:
+            path += "[%s>%s]" % (key, normalize(start_after))
+        selected = selected_fields(params)
+        if selected is not None and key not in selected:
+            # The key is needed for Page.last_key
+            params = select_params(params, (key,))
+        return paginate(self.iter_get(path, params, timeout=timeout), page_size, key)
+
+    def get_records(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        record_type: Optional[Type[Record]] = None,
+    ) -> List[Record]:
+        """Retrieves a list from the REST API with its elements decoded into records; see pybsn.records.
+
+        A record stores the values of an element in the slots of a class generated from the schema of the
+        list, instead of in a dict, which takes a fraction of the memory for large lists. Records support
+        attribute access and read-only dict access. The list is streamed as by iter_get(), so the decoded
+        dict of at most one element exists at a time.
+
+        :param path: the URL path of the list; does not include the prefix (/api/v1/data).
+        :param params: request parameters to attach
+        :param timeout: see get()
+        :param record_type: the class of the records; by default, the class generated for the schema of path
+            (see record_type()).
+        :return: a list of records
         """
-        return self._request("GET", path, params=params, timeout=timeout).json()
+        from_dict = (record_type or self.record_type(path, timeout=timeout)).from_dict
+        return [from_dict(element) for element in self.iter_get(path, params, timeout=timeout)]
+
+    def get_columns(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        use_numpy: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves a list from the REST API as one column per leaf of its elements; see pybsn.columns.
+
+        Numeric leaves become arrays of the type given by the schema (NumPy arrays if NumPy is installed,
+        array.array otherwise), other leaves lists. The list is streamed as by iter_get() and decoded into
+        the columns one element at a time.
+
+        :param path: the URL path of the list; does not include the prefix (/api/v1/data).
+        :param params: request parameters to attach. If fields are selected (see Node.select()), only
+            their columns are returned.
+        :param timeout: see get()
+        :param use_numpy: whether numeric columns are NumPy arrays; by default, if NumPy is installed.
+        :return: the columns by leaf name (for leaves of containers within the elements, by their path
+            within the element, e.g., stats/rx-bytes)
+        """
+        key = schema_path(path).strip("/")
+        types = self._column_types.get(key)
+        if types is None:
+            types = self._column_types[key] = column_types(self.schema(key, timeout=timeout))
+        fields = selected_fields(params)
+        return decode_columns(self.iter_get(path, params, timeout=timeout), types, fields=fields, use_numpy=use_numpy)
+
+    def record_type(self, path: str, timeout: TimeoutType = CLIENT_TIMEOUT) -> Type[Record]:
+        """Returns the record class for the elements of the list (or the container) at path, generated from
+        its schema once per client; see pybsn.records.
+        """
+        path = schema_path(path).strip("/")
+        record_types = self._record_types
+        if path not in record_types:
+            record_types[path] = record_class(self.schema(path, timeout=timeout))
+        return record_types[path]
+
+    def get_many(
+        self,
+        paths: Iterable[Union[str, Node]],
+        params: Optional[Dict[str, str]] = None,
+        timeout: TimeoutType = CLIENT_TIMEOUT,
+        max_workers: int = GET_MANY_MAX_WORKERS,
+        as_completed: bool = False,
+    ) -> Iterator[GetResult]:
+        """Retrieves several paths concurrently using the GET method.
+
+        The requests run on a bounded pool of worker threads and share this client's session, and thus its
+        connection pool. All requests are issued when get_many() is called; the returned iterator yields
+        results as they become available. A failed request does not affect the others; its exception is
+        reported in GetResult.error.
+
+        :param paths: paths (as for get()) or Nodes to retrieve. The fields selected on a Node (see
+            Node.select()) are added to params for its request.
+        :param params: request parameters to attach to every request
+        :param timeout: Amount of time to wait for each response before timing out; see get().
+        :param max_workers: maximum number of requests in flight at the same time.
+        :param as_completed: if False, results are yielded in the order of paths. If True, they are
+            yielded in the order in which the requests complete.
+        :return: iterator of GetResult
+        """
+        # a Node is retrieved with its selected fields
+        requests_list = [(p._path, p._params(params)) if isinstance(p, Node) else (p, params) for p in paths]
+        if not requests_list:
+            return iter([])
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(requests_list))), thread_name_prefix="pybsn-get"
+        )
+        futures = {executor.submit(self.get, path, path_params, timeout=timeout): path for path, path_params in requests_list}
+        # Worker threads exit once the queued requests are done; no need to wait for them here
+        executor.shutdown(wait=False)
+        return _collect_results(futures, as_completed)
 
     def rpc(
         self,
@@ -347,16 +896,19 @@ class BigDbClient(object):
             Otherwise a urllib3.util.Timeout strategy can be used.
         :return: Deserialized RPC output (typically a dict), or None for 204/202 responses.
         """
-        response = self._request("POST", path, data=self._dump_if_present(data), rpc=True, params=params, timeout=timeout)
-        if response.status_code == requests.codes.no_content:
-            return None
-        elif response.status_code == requests.codes.accepted:
-            try:
-                return response.json()
-            except (json.JSONDecodeError, ValueError):
+        with self._decoding():
+            response = self._request(
+                "POST", path, data=self._dump_if_present(data), rpc=True, params=params, timeout=timeout, decode=True
+            )
+            if response.status_code == requests.codes.no_content:
                 return None
-        else:
-            return response.json()
+            elif response.status_code == requests.codes.accepted:
+                try:
+                    return self.codec.loads(response.content)
+                except ValueError:
+                    return None
+            else:
+                return self.codec.loads(response.content)
 
     def post(
         self, path: str, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: TimeoutType = CLIENT_TIMEOUT
@@ -443,18 +995,100 @@ class BigDbClient(object):
             Otherwise, a urllib3.util.Timeout strategy can be used.
         :return: Schema dict
         """
+        if self.schema_cache is not None:
+            node = self._cached_schema(schema_path(path), timeout)
+            if node is not None:
+                return node
+        return self._fetch_schema(path, timeout)
+
+    def _fetch_schema(self, path: str, timeout: TimeoutType) -> Dict[str, Any]:
         url = self.url + SCHEMA_PREFIX + path
         request = requests.Request(method="GET", url=url)
         response = self._logged_request(request, timeout)
-        return json.loads(response.text)
+        return self.codec.loads(response.content)
+
+    def _cached_schema(self, path: str, timeout: TimeoutType) -> Optional[Dict[str, Any]]:
+        """Returns the schema node at path from the schema cache, or None to retrieve it from the controller."""
+        assert self.schema_cache is not None
+        if self._schema_version is None:
+            with self._decoding():
+                try:
+                    content = self._get_content(VERSION_PATH, None, timeout)
+                except requests.exceptions.HTTPError as e:
+                    logger.debug("Not using the schema cache, the software version is unknown: %s", e)
+                    content = b""
+                # BigDB returns an empty list for a path without data
+                self._schema_version = version_key(content) if content and self.codec.loads(content) else ""
+        if not self._schema_version:
+            return None
+        if self.schema_cache.load(self.url, self._schema_version) is None:
+            self.schema_cache.store(self.url, self._schema_version, self._fetch_schema(ROOT_SCHEMA_PATH, timeout))
+        return self.schema_cache.lookup(self.url, self._schema_version, path)
+
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """Returns statistics of the connection pool used for this client's URL (see PoolStats.snapshot()),
+        or None if the session does not use a PooledHTTPAdapter.
+        """
+        adapter = self.session.get_adapter(self.url)
+        if isinstance(adapter, PooledHTTPAdapter):
+            return adapter.stats.snapshot()
+        return None
+
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """Returns the response cache hit/miss counters (see ResponseCache.stats()), or None if the client
+        does not cache responses.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+
+    def coalesce_stats(self) -> Optional[Dict[str, int]]:
+        """Returns the numbers of GETs sent and of GETs that shared a request in flight
+        (see SingleFlight.stats()), or None if the client does not coalesce requests.
+        """
+        if self._singleflight is None:
+            return None
+        return self._singleflight.stats()
+
+    def transfer_stats(self) -> Optional[Dict[str, int]]:
+        """Returns the bytes transferred by this client before and after compression
+        (see TransferStats.snapshot()), or None if compression is not enabled.
+        """
+        if self.compression is None:
+            return None
+        return self._transfer_stats.snapshot()
+
+    def retry_stats(self) -> Optional[Dict[str, int]]:
+        """Returns the numbers of requests retried, retries sent and requests that failed despite retries
+        (see RetryStats.snapshot()), or None if the client does not retry requests.
+        """
+        if self.retry is None:
+            return None
+        return self._retry_stats.snapshot()
+
+    def breaker_stats(self) -> Optional[Dict[str, Any]]:
+        """Returns the state of the circuit breaker (see CircuitBreaker.stats()), or None if the client
+        has none.
+        """
+        if self.breaker is None:
+            return None
+        return self.breaker.stats()
+
+    def schema_cache_stats(self) -> Optional[Dict[str, int]]:
+        """Returns the numbers of schema lookups served from the schema cache and sent to the controller
+        (see SchemaCache.stats()), or None if the client has no schema cache.
+        """
+        if self.schema_cache is None:
+            return None
+        return self.schema_cache.stats()
 
     def close(self) -> None:
         """Closes the client.
         If this client was created by user/password (i..e, it holds an interactive session),
-        then logs out of the session. Persistent API Tokens are not deleted.
+        then logs out of the session, unless keep_session is set. Persistent API Tokens are not deleted.
         """
         token = self.session.cookies.get_dict().get("session_cookie")
-        if token:
+        if token and not self.keep_session:
             # This is a no-op/fine for api tokens
             self.root.core.aaa.session.logout.rpc()
 
@@ -462,36 +1096,180 @@ class BigDbClient(object):
         self,
         method: str,
         path: str,
-        data: Optional[str] = None,
+        data: Optional[Union[bytes, str]] = None,
         params: Optional[Dict[str, str]] = None,
         rpc: bool = False,
         timeout: TimeoutType = CLIENT_TIMEOUT,
+        stream: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+        decode: bool = False,
+    ) -> requests.Response:
+        """Low level request method; generally, use the specialized methods below.
+
+        With stream=True, the response body is not read before returning; the caller must consume or
+        close the response.
+
+        With decode=True, the request must be made within _decoding(), which calls the request hooks
+        once the response body has been decoded.
+        """
+        try:
+            hooks = self.hooks
+            if not hooks:
+                return self._send_retrying(method, path, data, params, rpc, timeout, stream, headers)
+            event = RequestEvent(method, path)
+            emit(hooks, "on_request", event)
+            try:
+                response = self._send_retrying(method, path, data, params, rpc, timeout, stream, headers, event)
+            except BaseException as e:
+                event.error = e
+                emit(hooks, "on_error", event)
+                raise
+            if decode and not stream:
+                self._pending.event = event
+                self._pending.received = time.perf_counter()
+            else:
+                emit(hooks, "on_response", event)
+            return response
+        finally:
+            self._invalidate_cache(method, path, rpc)
+
+    def _send_retrying(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[bytes, str]],
+        params: Optional[Dict[str, str]],
+        rpc: bool,
+        timeout: TimeoutType,
+        stream: bool,
+        headers: Optional[Dict[str, str]],
+        event: Optional[RequestEvent] = None,
+    ) -> requests.Response:
+        """Sends a request, retrying it according to the retry policy; see _request()."""
+        retry = self.retry
+        if retry is None:
+            return self._send(method, path, data, params, rpc, timeout, stream, headers, event)
+        attempt = 1
+        while True:
+            try:
+                response = self._send(method, path, data, params, rpc, timeout, stream, headers, event)
+            except requests.exceptions.RequestException as e:
+                delay = retry.delay(attempt, method, rpc, e)
+                if delay is None:
+                    self._retry_stats.record(attempt - 1, failed=True)
+                    raise
+                logger.debug("Retrying %s %s in %.3fs (attempt %d failed: %s)", method, path, delay, attempt, e)
+            else:
+                self._retry_stats.record(attempt - 1, failed=False)
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[bytes, str]],
+        params: Optional[Dict[str, str]],
+        rpc: bool,
+        timeout: TimeoutType,
+        stream: bool,
+        headers: Optional[Dict[str, str]],
+        event: Optional[RequestEvent] = None,
     ) -> requests.Response:
-        """Low level request method; generally, use the specialized methods below."""
+        """Sends a request once; see _request()."""
         url = self.url + (RPC_PREFIX if rpc else DATA_PREFIX) + path
+        request = requests.Request(method=method, url=url, data=data, params=params, headers=headers)
+        breaker = self.breaker
+        if breaker is None:
+            return self._logged_request(request, timeout=timeout, stream=stream, event=event)
+        breaker.allow(self.url)
+        try:
+            response = self._logged_request(request, timeout=timeout, stream=stream, event=event)
+        except requests.exceptions.RequestException as e:
+            breaker.record(e)
+            raise
+        except BaseException:
+            # e.g., KeyboardInterrupt: says nothing about the controller
+            breaker.release()
+            raise
+        breaker.record(None)
+        return response
 
-        request = requests.Request(method=method, url=url, data=data, params=params)
-        return self._logged_request(request, timeout=timeout)
+    @contextlib.contextmanager
+    def _decoding(self) -> Iterator[None]:
+        """Context of a request made with decode=True and the decoding of its response (see _request()).
 
-    def _logged_request(self, request: requests.Request, timeout: TimeoutType) -> requests.Response:
+        On exit, the request hooks are called with the time from the response to the exit as decoding
+        time, or with the error if decoding failed. This is the only place that completes such events, so
+        each one is completed exactly once, whether the response was decoded or not.
+        """
+        pending = self._pending
+        pending.event = None
+        try:
+            yield
+        except Exception as e:
+            event = pending.event
+            if event is not None:
+                pending.event = None
+                event.error = e
+                emit(self.hooks, "on_error", event)
+            raise
+        event = pending.event
+        if event is not None:
+            pending.event = None
+            event.decode_time = time.perf_counter() - pending.received
+            emit(self.hooks, "on_response", event)
+
+    def _invalidate_cache(self, method: str, path: str, rpc: bool) -> None:
+        """Invalidates cached responses affected by a write or an RPC (even if it failed; it may have been
+        applied), and stops sharing the GETs in flight with later GETs."""
+        if rpc or method != "GET":
+            if self.cache is not None:
+                self.cache.invalidate(path)
+            if self._singleflight is not None:
+                self._singleflight.forget()
+
+    def _logged_request(
+        self,
+        request: requests.Request,
+        timeout: TimeoutType,
+        stream: bool = False,
+        event: Optional[RequestEvent] = None,
+    ) -> requests.Response:
         effective_timeout = self._effective_timeout(timeout)
-        response = logged_request(session=self.session, request=request, timeout=effective_timeout)
+        if self.compression is not None:
+            start = time.perf_counter()
+            compress_request(request, self.compression, self._transfer_stats)
+            if event is not None:
+                event.prepare_time += time.perf_counter() - start
+        response = logged_request(session=self.session, request=request, timeout=effective_timeout, stream=stream, event=event)
+        if self.compression is not None and not stream:
+            self._transfer_stats.record_response(response)
 
         try:
             # Raise an HTTPError for 4xx/5xx codes
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
-            if e.response.text:
-                error_json = json.loads(e.response.text)
+            error_response = e.response
+            if error_response is None:
+                raise
+            if error_response.content:
+                try:
+                    error_json = self.codec.loads(error_response.content)
+                except ValueError:
+                    # e.g., an HTML error page from a proxy
+                    error_json = None
                 # Attempt to capture the REST API error description and pass it along to the HTTPError
-                if "description" in error_json:
+                if isinstance(error_json, dict) and "description" in error_json:
                     e.args = (e.args[0] + ": " + error_json["description"],)
+            error_response.close()
             raise
         return response
 
-    def _dump_if_present(self, data: Optional[JSONValue]) -> Optional[str]:
+    def _dump_if_present(self, data: Optional[JSONValue]) -> Optional[Union[bytes, str]]:
         if data is not None:
-            return json.dumps(data)
+            return self.codec.dumps(data)
         else:
             return None
 
@@ -506,26 +1284,42 @@ class BigDbClient(object):
         return "BigDbClient(%s)" % self.url
 
 
-def _normalize(v: Any) -> str:
-    """Helper method to normalize query values"""
-    if isinstance(v, bool):
-        # replace to use booleans to use strings in JSON-boolean style
-        if v:
-            return "'true'"
-        else:
-            return "'false'"
-    repr_ = repr(v)
-    if repr_.startswith("'") and repr_.endswith("'"):
-        return "'" + urllib.parse.quote(repr_[1:-1]) + "'"
-    else:
-        return urllib.parse.quote(repr(v))
+def _collect_results(futures: Dict[concurrent.futures.Future, str], as_completed: bool) -> Iterator[GetResult]:
+    """Yields a GetResult per future; cancels requests that have not started when iteration stops early."""
+    try:
+        for future in concurrent.futures.as_completed(futures) if as_completed else futures:
+            try:
+                yield GetResult(futures[future], value=future.result())
+            except Exception as e:
+                yield GetResult(futures[future], error=e)
+    finally:
+        for future in futures:
+            future.cancel()
 
 
 def logged_request(
-    session: requests.Session, request: requests.Request, timeout: Optional[Union[float, urllib3.util.Timeout]]
+    session: requests.Session,
+    request: requests.Request,
+    timeout: Optional[Union[float, urllib3.util.Timeout]],
+    stream: bool = False,
+    event: Optional[RequestEvent] = None,
 ) -> requests.Response:
-    """Helper method that logs HTTP requests made by this library, if configured."""
+    """Helper method that logs HTTP requests made by this library, if configured.
+
+    With stream=True, the response body is not read (and therefore not logged).
+
+    If event is given, the preparation and network times, the status and the body sizes are recorded in it.
+    """
+    start = time.perf_counter()
     prepared = session.prepare_request(request)
+    if event is not None:
+        sent = time.perf_counter()
+        event.prepare_time += sent - start
+        body = prepared.body
+        # requests encodes form data as str; JSON and compressed bodies are bytes
+        if isinstance(body, str):
+            body = body.encode()
+        event.request_bytes = len(body) if isinstance(body, bytes) else 0
 
     marker = "-" * 30
     if logger.isEnabledFor(logging.DEBUG):
@@ -538,7 +1332,14 @@ def logged_request(
             prepared.body,
         )
 
-    response = session.send(prepared, timeout=timeout)  # type: ignore[arg-type]
+    if stream:
+        response = session.send(prepared, timeout=timeout, stream=True)  # type: ignore[arg-type]
+    else:
+        response = session.send(prepared, timeout=timeout)  # type: ignore[arg-type]
+    if event is not None:
+        event.network_time = time.perf_counter() - sent
+        event.status = response.status_code
+        event.response_bytes = None if stream else len(response.content)
 
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
@@ -547,7 +1348,7 @@ def logged_request(
             marker,
             response.status_code,
             "\n".join("{}: {}".format(k, v) for k, v in response.headers.items()),
-            response.content,
+            "<streamed>" if stream else response.content,
         )
 
     return response
@@ -559,28 +1360,35 @@ BIGDB_PROTO_PORTS = [
 ]
 
 
-def guess_url(session: requests.Session, host: str, validate_path: str = "/api/v1/auth/healthy") -> str:
+def guess_url(
+    session: requests.Session,
+    host: str,
+    validate_path: str = "/api/v1/auth/healthy",
+    timeout: float = PROBE_TIMEOUT,
+    url_cache: Optional[SessionCache] = None,
+) -> str:
     """Guess the correct BigDB URL for a given host if not specified completely.
+
+    The candidates in BIGDB_PROTO_PORTS are probed concurrently, and the URL found is cached for the
+    host; see pybsn.discovery.
+
     :param session: requests session to use
     :param host: host as specified by the user
     :param validate_path: BigDB path to use to validate the correctness of the guess
+    :param timeout: seconds to wait for the response of each candidate
+    :param url_cache: if set, the URL is also looked up in and stored to this on-disk cache
     :return fully qualified BigDB URL
     """
     if re.match(r"^https?://", host):
         return host
-    else:
-        for schema, port in BIGDB_PROTO_PORTS:
-            url = "%s://%s:%d" % (schema, host, port)
-            try:
-                response = session.get(url + validate_path, timeout=2)
-            except requests.exceptions.ConnectionError as e:
-                logger.debug("Error connecting to %s: %s", url, str(e))
-                continue
-            if response.status_code == 200:  # OK
-                return url
-            else:
-                logger.debug("Could connect to URL %s: %s", url, response)
-    raise Exception("Could not find available BigDB service on {}".format(host))
+    url = cached_url(host, url_cache)
+    if url is not None:
+        return url
+    url = probe_urls(session, candidate_urls(host, BIGDB_PROTO_PORTS), validate_path, timeout)
+    if url is None:
+        raise Exception("Could not find available BigDB service on {}".format(host))
+    remember_url(host, url, url_cache)
+    return url
 
 
 def _attempt_login(
@@ -606,11 +1414,66 @@ def _attempt_login(
 
     # If we reach here, status is 2xx (typically 200 for login endpoint)
     json_ = response.json()
+    _set_session_cookie(session, url, json_["session-cookie"])
+    return url
+
+
+def _set_session_cookie(session: requests.Session, url: str, value: str) -> None:
     session_cookie = requests.cookies.create_cookie(
-        name="session_cookie", value=json_["session-cookie"], domain=urlparse(url).hostname, path="/api"  # type: ignore[arg-type]
+        name="session_cookie", value=value, domain=urlparse(url).hostname, path="/api"  # type: ignore[arg-type]
     )
     session.cookies.set_cookie(session_cookie)
-    return url
+
+
+def _reuse_session(
+    session: requests.Session,
+    session_cache: SessionCache,
+    host: str,
+    user: Optional[str],
+    login: bool,
+    timeout: Optional[Union[float, urllib3.util.Timeout]],
+) -> Optional[str]:
+    """Returns the cached URL for host if its cached session cookie (with login) or the token already set
+    on session is accepted there. Otherwise, removes the cached session and returns None.
+    """
+    cached = session_cache.load(host, user)
+    if cached is None or (login and not cached.cookie):
+        return None
+    if login:
+        assert cached.cookie is not None
+        _set_session_cookie(session, cached.url, cached.cookie)
+    request = requests.Request(method="GET", url=cached.url + "/api/v1/data/controller/core/aaa/auth-context")
+    try:
+        response = logged_request(session, request, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("Cached session for %s is not usable: %s", host, e)
+        response = None
+    if response is not None and response.status_code == 200:
+        return cached.url
+    session_cache.forget(host, user)
+    if login:
+        requests.cookies.remove_cookie_by_name(session.cookies, "session_cookie")
+    return None
+
+
+def _authenticate(
+    session: requests.Session,
+    url: str,
+    username: Optional[str],
+    password: Optional[str],
+    token: Optional[str],
+    login: bool,
+    timeout: Optional[Union[float, urllib3.util.Timeout]],
+) -> None:
+    """Logs in, or checks the token already set on session."""
+    if login:
+        assert username is not None and password is not None  # login=True implies both are not None
+        _attempt_login(session=session, url=url, username=username, password=password, timeout=timeout)
+    elif token:
+        request = requests.Request(method="GET", url=url + "/api/v1/data/controller/core/aaa/auth-context")
+        response = logged_request(session, request, timeout=timeout)
+        if response.status_code != 200:
+            response.raise_for_status()
 
 
 def connect(
@@ -622,6 +1485,17 @@ def connect(
     verify_tls: bool = False,
     session_headers: Optional[Dict[str, str]] = None,
     timeout: Optional[Union[float, urllib3.util.Timeout]] = None,
+    pool_options: Optional[PoolOptions] = None,
+    codec: Union[None, str, JsonCodec] = None,
+    compression: Optional[CompressionOptions] = None,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    hooks: Optional[Iterable[RequestHooks]] = None,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[BreakerOptions] = None,
+    session_cache: Optional[SessionCache] = None,
+    probe_timeout: float = PROBE_TIMEOUT,
+    schema_cache: Optional[SchemaCache] = None,
 ) -> BigDbClient:
     """Creates a connected BigDb client.
 
@@ -645,6 +1519,47 @@ def connect(
         to wait forever. The timeout value will be used as the default
         for future operations unless it is changed.
 
+    Connection pooling:
+    :parameter pool_options: PoolOptions for the size and blocking behavior of the connection
+        pool and TCP socket options (TCP_NODELAY, keepalive). Defaults to the requests defaults.
+        Pool activity can be monitored with BigDbClient.pool_stats().
+
+    :parameter codec: JSON codec or codec name ("orjson", "msgspec", "ujson", "json") for request
+        and response bodies. Defaults to the fastest installed codec, see pybsn.codec.
+
+    :parameter compression: CompressionOptions to negotiate compressed responses and gzip large
+        request bodies; see pybsn.compression. Transfer sizes are reported by
+        BigDbClient.transfer_stats().
+
+    :parameter cache: ResponseCache to cache GET responses in, with TTLs per path prefix; see
+        pybsn.cache. Hits and misses are reported by BigDbClient.cache_stats().
+
+    :parameter coalesce: if True, concurrent identical GETs (same path and params) share a single
+        request in flight; see pybsn.singleflight. Reported by BigDbClient.coalesce_stats().
+
+    :parameter hooks: RequestHooks called before and after each request with its path, status, sizes
+        and timings, e.g., a LatencyCollector; see pybsn.instrument.
+
+    :parameter retry: RetryPolicy for requests that fail transiently (connection errors, timeouts,
+        429/502/503/504); by default, only idempotent methods are retried, with jittered exponential
+        backoff and honoring Retry-After. See pybsn.retry. Reported by BigDbClient.retry_stats().
+
+    :parameter breaker: BreakerOptions of a circuit breaker that makes requests fail fast while the
+        controller is down; see pybsn.retry. Reported by BigDbClient.breaker_stats().
+
+    :parameter session_cache: SessionCache to reuse the URL and session of an earlier invocation for
+        the same host and user from; see pybsn.sessioncache. The cached session is checked with one
+        request, and only if it is rejected is the URL probed and a new session created (and cached).
+        The returned client does not log out of a cached session on close(). The URL discovered for a
+        host is cached in it as well.
+
+    :parameter probe_timeout: seconds to wait for each candidate URL when host is not a full URL; see
+        guess_url().
+
+    :parameter schema_cache: SchemaCache to serve BigDbClient.schema() from without a request. The
+        complete schema is retrieved once per controller and software version and kept on disk; see
+        pybsn.schemacache. Reported by BigDbClient.schema_cache_stats().
+
     (other parameters for advanced/internal use).
 
     :return A connected BigDBClient instance
@@ -652,23 +1567,51 @@ def connect(
     """
     session = requests.Session()
     session.verify = verify_tls
+    mount_pool(session, pool_options)
     if session_headers:
         for k, v in session_headers.items():
             session.headers[k] = v
 
-    url = guess_url(session, host)
     if login is None:
         login = (token is None) and username is not None and password is not None
-
-    if login:
-        assert username is not None and password is not None  # login=True implies both are not None
-        _attempt_login(session=session, url=url, username=username, password=password, timeout=timeout)
-    elif token:
+    if token and not login:
         cookie = requests.cookies.create_cookie(name="session_cookie", value=token)
         session.cookies.set_cookie(cookie)
-        request = requests.Request(method="GET", url=url + "/api/v1/data/controller/core/aaa/auth-context")
-        response = logged_request(session, request, timeout=timeout)
-        if response.status_code != 200:
-            response.raise_for_status()
 
-    return BigDbClient(url, session, timeout=timeout)
+    cached = session_cache is not None and (login or bool(token))
+    cache_user = username if login else None
+    url = None
+    if cached:
+        assert session_cache is not None
+        url = _reuse_session(session, session_cache, host, cache_user, login, timeout)
+
+    if url is None:
+        url = guess_url(session, host, timeout=probe_timeout, url_cache=session_cache)
+        try:
+            _authenticate(session, url, username, password, token, login, timeout)
+        except requests.exceptions.ConnectionError:
+            # The URL may have been cached before the controller changed; discover it again
+            if not forget_url(host, session_cache):
+                raise
+            url = guess_url(session, host, timeout=probe_timeout, url_cache=session_cache)
+            _authenticate(session, url, username, password, token, login, timeout)
+        if cached:
+            assert session_cache is not None
+            cookie_value = session.cookies.get("session_cookie") if login else None
+            session_cache.store(host, cache_user, url, cookie_value)
+
+    client = BigDbClient(
+        url,
+        session,
+        timeout=timeout,
+        codec=codec,
+        compression=compression,
+        cache=cache,
+        coalesce=coalesce,
+        hooks=hooks,
+        retry=retry,
+        breaker=breaker,
+        schema_cache=schema_cache,
+    )
+    client.keep_session = cached and login
+    return client
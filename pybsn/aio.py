@@ -0,0 +1,552 @@
+"""asyncio interface to BigDB.
+
+AsyncBigDbClient and AsyncNode mirror pybsn.BigDbClient and pybsn.Node, but every request is a
+coroutine that runs on a shared aiohttp.ClientSession. Many requests can be in flight on a single
+event loop without a thread per request, e.g.,
+
+    client = await pybsn.aio.connect("1.2.3.4", "admin", "adminadmin")
+    async with client:
+        switches, tenants = await asyncio.gather(
+            client.root.core.switch.get(),
+            client.root.applications.bcf.info.endpoint_manager.tenant.get(),
+        )
+
+Requires aiohttp (pip install pybsn[async]).
+"""
+
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+import requests.utils
+import urllib3.util
+from yarl import URL
+
+from pybsn import (
+    BIGDB_PROTO_PORTS,
+    CLIENT_TIMEOUT,
+    DATA_PREFIX,
+    RPC_PREFIX,
+    SCHEMA_PREFIX,
+    JsonCodec,
+    JSONValue,
+    _BaseNode,
+    _ClientTimeout,
+    get_codec,
+    logger,
+)
+from pybsn.discovery import PROBE_TIMEOUT, cached_url, candidate_urls, forget_url, remember_url
+from pybsn.sessioncache import SessionCache
+
+DefaultTimeoutType = Union[None, float, urllib3.util.Timeout, aiohttp.ClientTimeout]
+AsyncTimeoutType = Union[DefaultTimeoutType, _ClientTimeout]
+
+
+def _seconds(value: Any) -> Optional[float]:
+    """urllib3 uses a sentinel object for unset timeouts; map it to None (no limit)."""
+    return value if isinstance(value, (int, float)) else None
+
+
+def _client_timeout(timeout: DefaultTimeoutType) -> aiohttp.ClientTimeout:
+    """Translates a pybsn timeout value (None, float or urllib3.util.Timeout) into an aiohttp.ClientTimeout."""
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    elif isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    elif isinstance(timeout, urllib3.util.Timeout):
+        return aiohttp.ClientTimeout(
+            total=_seconds(timeout.total),
+            sock_connect=_seconds(timeout.connect_timeout),
+            sock_read=_seconds(timeout.read_timeout),
+        )
+    else:
+        return aiohttp.ClientTimeout(total=timeout)
+
+
+def _query(params: Optional[Dict[str, Any]]) -> Optional[List[Tuple[str, str]]]:
+    """Request parameters as (name, value) pairs, repeating a parameter for each value of a list."""
+    if params is None:
+        return None
+    pairs = []
+    for k, v in params.items():
+        for value in v if isinstance(v, list) else [v]:
+            pairs.append((k, value))
+    return pairs
+
+
+class AsyncNode(_BaseNode):
+    """asyncio counterpart to pybsn.Node.
+
+    Traversal, match(), filter() and select() work exactly as on Node; the request methods are coroutines, e.g.,
+
+      await root.core.switch.match(name="leaf0a").get()
+    """
+
+    __slots__ = ()
+
+    _connection: "AsyncBigDbClient"
+
+    async def get(self, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT) -> Any:
+        """Retrieve the data stored in BigDB at the path identified by this node.
+
+        See Node.get().
+        """
+        return await self._connection.get(self._path, self._params(params), timeout=timeout)
+
+    async def post(
+        self, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Inserts (POST) the given data to BigDB at the path identified by this node.
+
+        See Node.post().
+        """
+        return await self._connection.post(self._path, data, params, timeout=timeout)
+
+    async def put(
+        self, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Replaces (PUT) the given data in BigDB at the path identified by this node.
+
+        See Node.put().
+        """
+        return await self._connection.put(self._path, data, params, timeout=timeout)
+
+    async def patch(
+        self, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Updates (PATCH) the given data in BigDB at the path identified by this node.
+
+        See Node.patch().
+        """
+        return await self._connection.patch(self._path, data, params, timeout=timeout)
+
+    async def delete(
+        self, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Delete the data stored in BigDB at the path identified by this node.
+
+        See Node.delete().
+        """
+        return await self._connection.delete(self._path, params=params, timeout=timeout)
+
+    async def schema(self, timeout: AsyncTimeoutType = CLIENT_TIMEOUT) -> Dict[str, Any]:
+        """Retrieve the schema for BigDB at the path identified by this node.
+
+        See Node.schema().
+        """
+        return await self._connection.schema(self._path, timeout=timeout)
+
+    async def rpc(
+        self,
+        data: Optional[JSONValue] = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: AsyncTimeoutType = CLIENT_TIMEOUT,
+    ) -> Any:
+        """Invoke the BigDB RPC endpoint identified by this node.
+
+        See Node.rpc().
+        """
+        return await self._connection.rpc(self._path, data, params, timeout=timeout)
+
+    def __call__(self, timeout: AsyncTimeoutType = CLIENT_TIMEOUT) -> Any:
+        """Returns the coroutine for get(), i.e., await node() retrieves the data at this node."""
+        return self.get(timeout=timeout)
+
+
+class AsyncBigDbClient(object):
+    """
+    asyncio counterpart to pybsn.BigDbClient. Generally, you should use pybsn.aio.connect() to get an
+    instance.
+
+    The higher-level AsyncNode interface can be accessed via
+    client.root
+    """
+
+    """How long to wait for a request to timeout.
+        None is used to indicate to wait forever.
+        A float is the number of seconds.
+        Otherwise a urllib3.util.Timeout or aiohttp.ClientTimeout strategy can be used.
+    """
+    default_timeout: DefaultTimeoutType = None
+    url: str
+    session: aiohttp.ClientSession
+    root: AsyncNode
+    codec: JsonCodec
+
+    def __init__(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+        timeout: DefaultTimeoutType = None,
+        codec: Union[None, str, JsonCodec] = None,
+    ) -> None:
+        """Create a new AsyncBigDbClient.
+
+        :param url: the base URL/origin of the BigDB server. Usually, https://<ip>:8443/
+        :param session: aiohttp session to use; set by connect. It is closed by close().
+        :param timeout: Default amount of time to wait for a response, see BigDbClient.
+        :param codec: JSON codec or codec name, see BigDbClient.
+        """
+        self.url = url
+        self.session = session
+        self.codec = get_codec(codec)
+        self.root = AsyncNode("controller", self)
+        self.default_timeout = timeout
+
+    def _effective_timeout(self, timeout: AsyncTimeoutType) -> aiohttp.ClientTimeout:
+        if isinstance(timeout, _ClientTimeout):
+            return _client_timeout(self.default_timeout)
+        return _client_timeout(timeout)
+
+    async def get(self, path: str, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT) -> Any:
+        """Retrieves information from the REST API using the GET method.
+
+        See BigDbClient.get().
+        """
+        _, body = await self._request("GET", path, params=params, timeout=timeout)
+        return self.codec.loads(body)
+
+    async def rpc(
+        self,
+        path: str,
+        data: Optional[JSONValue],
+        params: Optional[Dict[str, str]] = None,
+        timeout: AsyncTimeoutType = CLIENT_TIMEOUT,
+    ) -> Any:
+        """Invokes an RPC endpoint on the REST API.
+
+        See BigDbClient.rpc().
+        """
+        response, body = await self._request(
+            "POST", path, data=self._dump_if_present(data), rpc=True, params=params, timeout=timeout
+        )
+        if response.status == requests.codes.no_content:
+            return None
+        elif response.status == requests.codes.accepted:
+            try:
+                return self.codec.loads(body)
+            except ValueError:
+                return None
+        else:
+            return self.codec.loads(body)
+
+    async def post(
+        self, path: str, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Inserts new data to the BigDB REST API via the POST method.
+
+        See BigDbClient.post().
+        """
+        response, _ = await self._request("POST", path, data=self._dump_if_present(data), params=params, timeout=timeout)
+        return response
+
+    async def put(
+        self, path: str, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Replaces data in the BigDB REST API via the PUT method.
+
+        See BigDbClient.put().
+        """
+        response, _ = await self._request("PUT", path, data=self._dump_if_present(data), params=params, timeout=timeout)
+        return response
+
+    async def patch(
+        self, path: str, data: JSONValue, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Updates data in the BigDB REST API via the PATCH method.
+
+        See BigDbClient.patch().
+        """
+        response, _ = await self._request("PATCH", path, data=self._dump_if_present(data), params=params, timeout=timeout)
+        return response
+
+    async def delete(
+        self, path: str, params: Optional[Dict[str, str]] = None, timeout: AsyncTimeoutType = CLIENT_TIMEOUT
+    ) -> aiohttp.ClientResponse:
+        """Deletes data from the BigDB REST API via the DELETE method.
+
+        See BigDbClient.delete().
+        """
+        response, _ = await self._request("DELETE", path, params=params, timeout=timeout)
+        return response
+
+    async def schema(self, path: str = "", timeout: AsyncTimeoutType = CLIENT_TIMEOUT) -> Dict[str, Any]:
+        """Retrieves the schema for a given path from BigDB.
+
+        See BigDbClient.schema().
+        """
+        _, body = await self._logged_request("GET", self.url + SCHEMA_PREFIX + path, timeout=timeout)
+        return self.codec.loads(body)
+
+    async def close(self) -> None:
+        """Closes the client.
+        If this client holds an interactive session, logs out of the session. Persistent API tokens are not
+        deleted. The underlying aiohttp session is closed as well.
+        """
+        try:
+            if any(cookie.key == "session_cookie" for cookie in self.session.cookie_jar):
+                # This is a no-op/fine for api tokens
+                await self.root.core.aaa.session.logout.rpc()
+        finally:
+            await self.session.close()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[bytes, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        rpc: bool = False,
+        timeout: AsyncTimeoutType = CLIENT_TIMEOUT,
+    ) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Low level request method; generally, use the specialized methods above.
+
+        :return: the response and its body
+        """
+        url = self.url + (RPC_PREFIX if rpc else DATA_PREFIX) + path
+        return await self._logged_request(method, url, data=data, params=params, timeout=timeout)
+
+    async def _logged_request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Union[bytes, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: AsyncTimeoutType = CLIENT_TIMEOUT,
+    ) -> Tuple[aiohttp.ClientResponse, bytes]:
+        response, body = await logged_request(
+            self.session, method, url, data=data, params=params, timeout=self._effective_timeout(timeout)
+        )
+        if response.status >= 400:
+            message = response.reason or ""
+            if body:
+                try:
+                    error_json = self.codec.loads(body)
+                except ValueError:
+                    error_json = None
+                # Attempt to capture the REST API error description and pass it along to the error
+                if isinstance(error_json, dict) and "description" in error_json:
+                    message = message + ": " + error_json["description"]
+            raise aiohttp.ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=message,
+                headers=response.headers,
+            )
+        return response, body
+
+    def _dump_if_present(self, data: Optional[JSONValue]) -> Optional[Union[bytes, str]]:
+        if data is not None:
+            return self.codec.dumps(data)
+        else:
+            return None
+
+    async def __aenter__(self) -> "AsyncBigDbClient":
+        return self
+
+    async def __aexit__(self, type: Any, value: Any, trace_back: Any) -> None:
+        """For using AsyncBigDbClient as an async context manager; closes the client on exit."""
+        await self.close()
+
+    def __repr__(self) -> str:
+        return "AsyncBigDbClient(%s)" % self.url
+
+
+async def logged_request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    data: Optional[Union[bytes, str]] = None,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+) -> Tuple[aiohttp.ClientResponse, bytes]:
+    """Helper method that logs HTTP requests made by this library, if configured.
+
+    The response body is read before the connection is released to the pool, and returned along with
+    the response (the response's own read() fails once it has been released).
+    """
+    # Paths already carry quoted predicate values; requote like requests does instead of letting yarl
+    # escape the predicate brackets.
+    request_url = URL(requests.utils.requote_uri(url), encoded=True)
+    headers = {"Content-Type": "application/json"} if data is not None else None
+
+    marker = "-" * 30
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s Request: %s\n%s %s\n\n%s", marker, marker, method, request_url, data)
+
+    async with session.request(
+        method,
+        request_url,
+        data=data,
+        params=_query(params),
+        headers=headers,
+        timeout=timeout or aiohttp.ClientTimeout(total=None),
+    ) as response:
+        body = await response.read()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s Response: %s\n%s\n%s\n\n%s",
+            marker,
+            marker,
+            response.status,
+            "\n".join("{}: {}".format(k, v) for k, v in response.headers.items()),
+            body,
+        )
+
+    return response, body
+
+
+async def _probe(session: aiohttp.ClientSession, url: str, validate_path: str, timeout: float) -> bool:
+    try:
+        async with session.get(url + validate_path, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            status = response.status
+    except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+        logger.debug("Error connecting to %s: %s", url, str(e))
+        return False
+    if status == 200:  # OK
+        return True
+    logger.debug("Could connect to URL %s: %s", url, status)
+    return False
+
+
+async def probe_urls(
+    session: aiohttp.ClientSession, candidates: List[str], validate_path: str, timeout: float
+) -> Optional[str]:
+    """Probes candidates (in order of preference) concurrently and returns the most preferred healthy
+    one, without waiting for less preferred ones; None if none is healthy. See pybsn.discovery.probe_urls().
+    """
+    probes = [asyncio.ensure_future(_probe(session, url, validate_path, timeout)) for url in candidates]
+    try:
+        for url, probe in zip(candidates, probes):
+            if await probe:
+                return url
+        return None
+    finally:
+        # less preferred probes still in flight are not needed
+        for probe in probes:
+            probe.cancel()
+        await asyncio.gather(*probes, return_exceptions=True)
+
+
+async def guess_url(
+    session: aiohttp.ClientSession,
+    host: str,
+    validate_path: str = "/api/v1/auth/healthy",
+    timeout: float = PROBE_TIMEOUT,
+    url_cache: Optional[SessionCache] = None,
+) -> str:
+    """Guess the correct BigDB URL for a given host if not specified completely.
+
+    The candidates are probed concurrently, and the URL found is cached for the host, shared with
+    pybsn.guess_url(); see there.
+    """
+    if re.match(r"^https?://", host):
+        return host
+    url = cached_url(host, url_cache)
+    if url is not None:
+        return url
+    url = await probe_urls(session, candidate_urls(host, BIGDB_PROTO_PORTS), validate_path, timeout)
+    if url is None:
+        raise Exception("Could not find available BigDB service on {}".format(host))
+    remember_url(host, url, url_cache)
+    return url
+
+
+async def _attempt_login(
+    session: aiohttp.ClientSession,
+    url: str,
+    username: str,
+    password: str,
+    timeout: DefaultTimeoutType = None,
+) -> str:
+    """Attempts to create an interactive BigDB session by calling the login endpoint
+    with user and password.
+
+    If successful, stores the resulting cookie in the session's cookie jar.
+    Raises aiohttp.ClientResponseError on error.
+    """
+    auth_data = json.dumps({"user": username, "password": password})
+    path = "/api/v1/rpc/controller/core/aaa/session/login"
+    response, body = await logged_request(session, "POST", url + path, data=auth_data, timeout=_client_timeout(timeout))
+
+    # Raise for 4xx/5xx status codes
+    response.raise_for_status()
+
+    json_ = json.loads(body)
+    session.cookie_jar.update_cookies({"session_cookie": json_["session-cookie"]}, response_url=URL(url))
+    return url
+
+
+async def connect(
+    host: str,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    token: Optional[str] = None,
+    login: Optional[bool] = None,
+    verify_tls: bool = False,
+    session_headers: Optional[Dict[str, str]] = None,
+    timeout: DefaultTimeoutType = None,
+    connection_limit: int = 100,
+    codec: Union[None, str, JsonCodec] = None,
+    probe_timeout: float = PROBE_TIMEOUT,
+) -> AsyncBigDbClient:
+    """Creates a connected AsyncBigDbClient.
+
+    Takes the parameters of pybsn.connect() up to codec (except pool_options) and probe_timeout, plus:
+
+    :parameter connection_limit: maximum number of simultaneous connections to the controller.
+        Requests beyond this limit wait for a free connection. 0 means no limit.
+
+    :return A connected AsyncBigDbClient instance
+    :raises Exception on error
+    """
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=verify_tls, limit=connection_limit),
+        # BigDB controllers are usually addressed by IP; the default jar ignores cookies for IP hosts
+        cookie_jar=aiohttp.CookieJar(unsafe=True),
+        headers=session_headers,
+    )
+    try:
+        if login is None:
+            login = (token is None) and username is not None and password is not None
+        url = await guess_url(session, host, timeout=probe_timeout)
+        try:
+            await _authenticate(session, url, username, password, token, login, timeout)
+        except aiohttp.ClientConnectionError:
+            # The URL may have been cached before the controller changed; discover it again
+            if not forget_url(host):
+                raise
+            url = await guess_url(session, host, timeout=probe_timeout)
+            await _authenticate(session, url, username, password, token, login, timeout)
+    except BaseException:
+        await session.close()
+        raise
+
+    return AsyncBigDbClient(url, session, timeout=timeout, codec=codec)
+
+
+async def _authenticate(
+    session: aiohttp.ClientSession,
+    url: str,
+    username: Optional[str],
+    password: Optional[str],
+    token: Optional[str],
+    login: bool,
+    timeout: DefaultTimeoutType,
+) -> None:
+    """Logs in, or checks the session token; see pybsn._authenticate()."""
+    if login:
+        assert username is not None and password is not None  # login=True implies both are not None
+        await _attempt_login(session=session, url=url, username=username, password=password, timeout=timeout)
+    elif token:
+        session.cookie_jar.update_cookies({"session_cookie": token})
+        response, _ = await logged_request(
+            session, "GET", url + "/api/v1/data/controller/core/aaa/auth-context", timeout=_client_timeout(timeout)
+        )
+        if response.status != 200:
+            response.raise_for_status()
@@ -0,0 +1,192 @@
+"""Client-side cache of BigDB GET responses.
+
+A ResponseCache is attached to a BigDbClient with pybsn.connect(host, cache=ResponseCache(...)). GET
+responses of paths that have a TTL are kept in memory, keyed by path and parameters, and returned until
+they expire. Writes (post, put, patch, delete) and RPCs through the same client invalidate the cached
+entries of the affected path: its subtree and the paths that contain it. The cache is bounded in number
+of entries and in bytes, and evicts the least recently used entries first.
+
+Changes made by other clients are not seen until the cached entries expire; choose TTLs accordingly.
+"""
+
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from pybsn.paging import schema_path
+
+ParamsKey = Tuple[Tuple[str, Any], ...]
+CacheKey = Tuple[str, ParamsKey]
+
+
+def params_key(params: Optional[Dict[str, Any]]) -> ParamsKey:
+    """Hashable form of request parameters; list values (repeated parameters, e.g., select) become tuples."""
+    if not params:
+        return ()
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
+
+
+class _Entry(NamedTuple):
+    content: bytes
+    expires: float
+    """The path without predicates, used for invalidation."""
+    schema_path: str
+
+
+def _is_prefix(prefix: str, path: str) -> bool:
+    """True if prefix is path, or an ancestor of path (prefix ends at a segment or predicate boundary)."""
+    return path.startswith(prefix) and (len(path) == len(prefix) or path[len(prefix)] in "/[")
+
+
+class ResponseCache(object):
+    """In-memory LRU cache of GET response bodies with per-path-prefix TTLs.
+
+    E.g., to cache switches for 30 seconds and everything else below controller/core for 5 seconds:
+
+        cache = ResponseCache({"controller/core/switch": 30, "controller/core": 5})
+
+    Paths are those passed to BigDbClient.get() (and used by Node), e.g. controller/core/switch. The TTL
+    of a path is that of its longest matching prefix; paths without a matching prefix use default_ttl.
+    Response bodies are cached as bytes and decoded on every hit, so callers may modify the results.
+    """
+
+    """Lookups answered from the cache."""
+    hits: int = 0
+    """Lookups that were not in the cache or had expired."""
+    misses: int = 0
+    """Entries removed to stay within maxsize / max_bytes."""
+    evictions: int = 0
+    """Entries removed because of a write or an RPC."""
+    invalidations: int = 0
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: Optional[float] = None,
+        maxsize: int = 256,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param ttls: seconds to cache the responses of paths starting with each prefix.
+        :param default_ttl: seconds to cache responses of other paths; None to not cache them.
+        :param maxsize: maximum number of cached responses.
+        :param max_bytes: maximum total size of the cached responses; None for no limit.
+        :param clock: time source, for testing.
+        """
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # longest prefix first, so the first match is the most specific one
+        self._prefixes = sorted(self.ttls, key=len, reverse=True)
+        self._entries: "collections.OrderedDict[CacheKey, _Entry]" = collections.OrderedDict()
+        self._bytes = 0
+        # incremented on invalidation, so responses of requests that raced with a write are not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def ttl(self, path: str) -> Optional[float]:
+        """Returns the TTL for path, or None if responses for path are not cached."""
+        for prefix in self._prefixes:
+            if _is_prefix(prefix, path):
+                return self.ttls[prefix]
+        return self.default_ttl
+
+    @staticmethod
+    def key(path: str, params: Optional[Dict[str, str]] = None) -> CacheKey:
+        return path, params_key(params)
+
+    def get(self, path: str, params: Optional[Dict[str, str]] = None) -> Optional[bytes]:
+        """Returns the cached response body for path and params, or None. Counts a hit or a miss, unless
+        responses for path are not cached at all (see ttl()).
+        """
+        ttl = self.ttl(path)
+        if ttl is None or ttl <= 0:
+            return None
+        key = self.key(path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.content
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever entries are invalidated; see put()."""
+        return self._generation
+
+    def put(self, path: str, params: Optional[Dict[str, str]], content: bytes, generation: Optional[int] = None) -> None:
+        """Caches a response body for path and params, if path has a TTL.
+
+        :param generation: the value of self.generation before the request was sent. If entries have been
+            invalidated since, the response may predate a write and is not cached.
+        """
+        ttl = self.ttl(path)
+        if ttl is None or ttl <= 0 or (self.max_bytes is not None and len(content) > self.max_bytes):
+            return
+        key = self.key(path, params)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(content, self._clock() + ttl, schema_path(path))
+            self._bytes += len(content)
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, path: str) -> int:
+        """Removes the cached responses affected by a change of path, i.e., those of path, its subtree
+        and its ancestors. Predicates are ignored, so e.g. a change of core/switch[name='a'] also
+        invalidates core/switch[dpid='...']. Returns the number of removed entries.
+        """
+        changed = schema_path(path)
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if _is_prefix(changed, entry.schema_path) or _is_prefix(entry.schema_path, changed)
+            ]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            self._generation += 1
+            return len(keys)
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        self._bytes -= len(self._entries.pop(key).content)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and current size as a dict."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return "ResponseCache(%s)" % ", ".join("%s=%d" % item for item in self.stats().items())
@@ -0,0 +1,411 @@
+"""Cluster-aware BigDB client.
+
+A BigDbClusterClient talks to all controllers of a BigDB cluster. It exposes the same API as
+BigDbClient (including client.root), but:
+
+* writes (POST/PUT/PATCH/DELETE) and RPCs are sent to the active controller;
+* GETs and schema requests are spread round-robin across all healthy controllers;
+* when a controller cannot be reached, it is marked unhealthy and the request fails over to another
+  controller. Unhealthy controllers are tried again after recheck_interval seconds.
+
+Writes are only failed over when the connection to the controller could not be established, so a
+write is never sent twice.
+
+E.g.,
+    cluster = pybsn.cluster.connect_cluster(["10.0.0.1", "10.0.0.2"], "admin", "adminadmin")
+    cluster.root.core.switch()
+    for member in cluster.health():
+        print(member)
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, TypeVar, Union
+
+import requests
+import urllib3.util
+
+from pybsn import (
+    CLIENT_TIMEOUT,
+    PROBE_TIMEOUT,
+    BigDbClient,
+    BreakerOptions,
+    CompressionOptions,
+    JsonCodec,
+    Node,
+    PoolOptions,
+    RequestEvent,
+    RequestHooks,
+    ResponseCache,
+    RetryPolicy,
+    SchemaCache,
+    SessionCache,
+    TimeoutType,
+    connect,
+    logger,
+)
+from pybsn.retry import connect_failed
+
+"""Path of the BigDB container that describes the cluster status of the controller serving the request."""
+CLUSTER_STATUS_PATH = "controller/cluster"
+
+ROLE_ACTIVE = "active"
+
+"""Weight of the most recent sample in the exponentially weighted moving average of member latency."""
+LATENCY_EWMA_WEIGHT = 0.2
+
+_T = TypeVar("_T")
+
+
+class ClusterMember(object):
+    """A controller in a BigDbClusterClient, with its connection and health/latency statistics."""
+
+    host: str
+    client: Optional[BigDbClient] = None
+    """Role reported by the controller ("active", "standby"), or None if unknown."""
+    role: Optional[str] = None
+    healthy: bool = False
+    """Moving average of the request latency in seconds, or None if no request has completed yet."""
+    latency: Optional[float] = None
+    requests: int = 0
+    errors: int = 0
+    last_error: Optional[BaseException] = None
+    failed_at: Optional[float] = None
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.client.url if self.client is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """Returns the health and latency statistics of this member as a dict."""
+        return {
+            "host": self.host,
+            "url": self.url,
+            "role": self.role,
+            "healthy": self.healthy,
+            "latency": self.latency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "last-error": str(self.last_error) if self.last_error is not None else None,
+            "pool": self.client.pool_stats() if self.client is not None else None,
+            "transfer": self.client.transfer_stats() if self.client is not None else None,
+            "breaker": self.client.breaker_stats() if self.client is not None else None,
+        }
+
+    def __repr__(self) -> str:
+        return "ClusterMember(%s, role=%s, healthy=%s)" % (self.host, self.role, self.healthy)
+
+
+class BigDbClusterClient(BigDbClient):
+    """BigDbClient that distributes requests across the controllers of a cluster.
+
+    Generally, you should use pybsn.cluster.connect_cluster() to get an instance.
+    """
+
+    members: List[ClusterMember]
+
+    def __init__(
+        self,
+        members: List[ClusterMember],
+        connector: Callable[[str], BigDbClient],
+        timeout: Optional[Union[float, urllib3.util.Timeout]] = None,
+        recheck_interval: float = 30.0,
+        codec: Union[None, str, JsonCodec] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = False,
+        hooks: Optional[Iterable[RequestHooks]] = None,
+        retry: Optional[RetryPolicy] = None,
+    ) -> None:
+        """
+        :param members: the controllers of the cluster
+        :param connector: creates a connected BigDbClient for a controller host
+        :param timeout: default timeout for requests, see BigDbClient
+        :param recheck_interval: seconds after which an unhealthy controller is tried again
+        :param codec: JSON codec, see BigDbClient
+        :param cache: response cache shared by all members, see BigDbClient
+        :param coalesce: if True, concurrent identical GETs share one request, see BigDbClient
+        :param hooks: RequestHooks called for each request, see BigDbClient. A request that fails over
+            is reported once, with the timings of the last attempt.
+        :param retry: retry policy, see BigDbClient. A request is retried after it failed on all
+            controllers it was tried on (or could not be failed over).
+        """
+        # compression, the circuit breaker and the schema cache are per member (see connect_cluster())
+        self._init_state(timeout, codec, cache=cache, coalesce=coalesce, hooks=hooks, retry=retry)
+        self.members = members
+        self.recheck_interval = recheck_interval
+        self.root = Node("controller", self)
+        self.url = ""
+        self._connector = connector
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    @property
+    def session(self) -> requests.Session:  # type: ignore[override]
+        """Session of the active controller."""
+        member = self._pick(write=True, exclude=set())
+        if member is None or member.client is None:
+            raise requests.exceptions.ConnectionError("No controller of the cluster is available")
+        return member.client.session
+
+    def refresh(self) -> None:
+        """(Re-)connects to all controllers and updates their roles and health."""
+        self._refresh(exclude=set())
+
+    def _refresh(self, exclude: Set[ClusterMember]) -> None:
+        """Updates the roles and health of the controllers, except those in exclude."""
+        for member in self.members:
+            if member in exclude:
+                continue
+            client = member.client
+            if client is None:
+                if not self._connect_member(member):
+                    continue
+                client = member.client
+            assert client is not None
+            start = time.monotonic()
+            try:
+                status = client.get(CLUSTER_STATUS_PATH, timeout=self._effective_timeout(CLIENT_TIMEOUT))
+            except requests.exceptions.ConnectionError as e:
+                self._record_failure(member, e)
+                with self._lock:
+                    member.role = None
+                continue
+            except requests.exceptions.HTTPError as e:
+                logger.debug("Could not retrieve cluster status from %s: %s", member.host, e)
+                status = None
+            self._record_success(member, time.monotonic() - start)
+            with self._lock:
+                member.role = _local_role(status)
+        self._update_url()
+
+    def health(self) -> List[Dict[str, Any]]:
+        """Returns health and latency statistics for all controllers, see ClusterMember.status()."""
+        with self._lock:
+            return [member.status() for member in self.members]
+
+    def schema(self, path: str = "", timeout: TimeoutType = CLIENT_TIMEOUT) -> Dict[str, Any]:
+        effective_timeout = self._effective_timeout(timeout)
+        return self._dispatch(False, lambda client: client.schema(path, timeout=effective_timeout))
+
+    def close(self) -> None:
+        """Closes the connections to all controllers."""
+        for member in self.members:
+            if member.client is not None:
+                try:
+                    member.client.close()
+                except requests.exceptions.ConnectionError as e:
+                    logger.debug("Error closing connection to %s: %s", member.host, e)
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[bytes, str]],
+        params: Optional[Dict[str, str]],
+        rpc: bool,
+        timeout: TimeoutType,
+        stream: bool,
+        headers: Optional[Dict[str, str]],
+        event: Optional[RequestEvent] = None,
+    ) -> requests.Response:
+        effective_timeout = self._effective_timeout(timeout)
+        write = rpc or method != "GET"
+        return self._dispatch(
+            write,
+            lambda client: client._send(method, path, data, params, rpc, effective_timeout, stream, headers, event),
+        )
+
+    def _dispatch(self, write: bool, call: Callable[[BigDbClient], _T]) -> _T:
+        """Invokes call on a suitable member, failing over to other members on connection errors."""
+        tried: Set[ClusterMember] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            member = self._pick(write, tried)
+            if member is None:
+                raise requests.exceptions.ConnectionError(
+                    "No controller of the cluster is available (last error: %s)" % last_error
+                ) from last_error
+            assert member.client is not None
+            tried.add(member)
+            start = time.monotonic()
+            try:
+                result = call(member.client)
+            except requests.exceptions.ConnectionError as e:
+                self._record_failure(member, e)
+                last_error = e
+                if write:
+                    with self._lock:
+                        member.role = None
+                    if not connect_failed(e):
+                        # the write may have reached the controller; it is not repeated
+                        self._update_url()
+                        raise
+                    # the active controller may have moved; ask the controllers not tried yet
+                    self._refresh(exclude=tried)
+                logger.debug("Failing over from %s: %s", member.host, e)
+                continue
+            except requests.exceptions.HTTPError:
+                # The controller responded, so it is reachable
+                self._record_success(member, time.monotonic() - start)
+                raise
+            self._record_success(member, time.monotonic() - start)
+            return result
+
+    def _pick(self, write: bool, exclude: Set[ClusterMember]) -> Optional[ClusterMember]:
+        """Selects the member to send a request to, connecting to the members that are due to be tried."""
+        with self._lock:
+            unconnected = [member for member in self.members if member.client is None and self._usable(member, exclude)]
+        # connecting takes requests; the lock is not held meanwhile
+        for member in unconnected:
+            self._connect_member(member)
+        with self._lock:
+            candidates = [member for member in self.members if member.client is not None and self._usable(member, exclude)]
+            if not candidates:
+                return None
+            if write:
+                for member in candidates:
+                    if member.role == ROLE_ACTIVE:
+                        return member
+                return candidates[0]
+            return candidates[next(self._round_robin) % len(candidates)]
+
+    def _usable(self, member: ClusterMember, exclude: Set[ClusterMember]) -> bool:
+        """Whether a request may be sent to member: it is healthy, or due to be tried again. Call with the lock held."""
+        if member in exclude:
+            return False
+        return member.healthy or member.failed_at is None or time.monotonic() - member.failed_at >= self.recheck_interval
+
+    def _connect_member(self, member: ClusterMember) -> bool:
+        try:
+            client = self._connector(member.host)
+        except requests.exceptions.HTTPError:
+            # e.g., invalid credentials; failing over would not help
+            raise
+        except Exception as e:
+            self._record_failure(member, e)
+            return False
+        with self._lock:
+            duplicate = member.client is not None
+            if not duplicate:
+                member.client = client
+            member.healthy = True
+        if duplicate:
+            # another thread connected to the member meanwhile
+            client.close()
+        return True
+
+    def _record_success(self, member: ClusterMember, latency: float) -> None:
+        with self._lock:
+            member.requests += 1
+            member.healthy = True
+            member.failed_at = None
+            if member.latency is None:
+                member.latency = latency
+            else:
+                member.latency += LATENCY_EWMA_WEIGHT * (latency - member.latency)
+
+    def _record_failure(self, member: ClusterMember, error: BaseException) -> None:
+        logger.debug("Controller %s is unavailable: %s", member.host, error)
+        with self._lock:
+            member.requests += 1
+            member.errors += 1
+            member.healthy = False
+            member.failed_at = time.monotonic()
+            member.last_error = error
+
+    def _update_url(self) -> None:
+        member = self._pick(write=True, exclude=set())
+        self.url = (member.url or "") if member is not None else ""
+
+    def __repr__(self) -> str:
+        return "BigDbClusterClient(%s)" % ", ".join(member.host for member in self.members)
+
+
+def _local_role(status: Any) -> Optional[str]:
+    """Extracts the role of the controller that served the cluster status request."""
+    if isinstance(status, list):
+        status = status[0] if status else None
+    if not isinstance(status, dict):
+        return None
+    return status.get("status", {}).get("local-node-role")
+
+
+def connect_cluster(
+    hosts: Sequence[str],
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    token: Optional[str] = None,
+    login: Optional[bool] = None,
+    verify_tls: bool = False,
+    session_headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[Union[float, urllib3.util.Timeout]] = None,
+    pool_options: Optional[PoolOptions] = None,
+    codec: Union[None, str, JsonCodec] = None,
+    recheck_interval: float = 30.0,
+    compression: Optional[CompressionOptions] = None,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    hooks: Optional[Iterable[RequestHooks]] = None,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[BreakerOptions] = None,
+    session_cache: Optional[SessionCache] = None,
+    probe_timeout: float = PROBE_TIMEOUT,
+    schema_cache: Optional[SchemaCache] = None,
+) -> BigDbClusterClient:
+    """Creates a BigDbClusterClient connected to the given controllers.
+
+    :param hosts: the controllers of the cluster; each is specified as for pybsn.connect().
+        If the roles of the controllers cannot be determined, the first reachable host is used for writes.
+    :param recheck_interval: seconds after which an unreachable controller is tried again.
+    :param retry: retry policy of the cluster client; requests are retried after failover.
+    :param breaker: options of the circuit breaker of each controller; a controller whose breaker is
+        open is failed over immediately.
+    :param session_cache: cache of the sessions with each controller, see pybsn.connect().
+    :param probe_timeout: seconds to wait for each candidate URL of a controller, see pybsn.connect().
+    :param schema_cache: cache of the schema of each controller, see pybsn.connect().
+
+    The other parameters are the same as for pybsn.connect() and apply to every controller.
+
+    :return A connected BigDbClusterClient
+    :raises requests.exceptions.ConnectionError if none of the controllers can be reached
+    """
+
+    def connector(host: str) -> BigDbClient:
+        return connect(
+            host,
+            username=username,
+            password=password,
+            token=token,
+            login=login,
+            verify_tls=verify_tls,
+            session_headers=session_headers,
+            timeout=timeout,
+            pool_options=pool_options,
+            codec=codec,
+            compression=compression,
+            breaker=breaker,
+            session_cache=session_cache,
+            probe_timeout=probe_timeout,
+            schema_cache=schema_cache,
+        )
+
+    cluster = BigDbClusterClient(
+        [ClusterMember(host) for host in hosts],
+        connector,
+        timeout=timeout,
+        recheck_interval=recheck_interval,
+        codec=codec,
+        cache=cache,
+        coalesce=coalesce,
+        hooks=hooks,
+        retry=retry,
+    )
+    cluster.refresh()
+    if not any(member.healthy for member in cluster.members):
+        errors = "; ".join("%s: %s" % (member.host, member.last_error) for member in cluster.members)
+        raise requests.exceptions.ConnectionError("Could not connect to any controller of the cluster: " + errors)
+    return cluster
@@ -0,0 +1,120 @@
+"""Pluggable JSON encoding and decoding of BigDB request and response bodies.
+
+By default, BigDbClient uses the fastest JSON library that is installed (orjson, msgspec, ujson, in that
+order), and falls back to the standard library json module. A codec can also be chosen per client,
+e.g., pybsn.connect(host, codec="json").
+
+Response bodies are decoded directly from the raw bytes, without decoding them to a str first.
+"""
+
+import json
+from typing import Any, Dict, Optional, Type, Union
+
+
+class JsonCodec(object):
+    """JSON codec based on the standard library json module. Base class of the other codecs.
+
+    Codecs raise a ValueError (or subclass) when decoding malformed input.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decodes a JSON document; data may be UTF-8 encoded bytes or a str."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> Union[bytes, str]:
+        """Encodes obj as a JSON document."""
+        return json.dumps(obj)
+
+    def __repr__(self) -> str:
+        return "%s()" % type(self).__name__
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec based on orjson."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> Union[bytes, str]:
+        return self._dumps(obj)
+
+
+class MsgspecCodec(JsonCodec):
+    """JSON codec based on msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> Union[bytes, str]:
+        return self._encoder.encode(obj)
+
+
+class UjsonCodec(JsonCodec):
+    """JSON codec based on ujson."""
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+
+        self._ujson = ujson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> Union[bytes, str]:
+        return self._ujson.dumps(obj, escape_forward_slashes=False)
+
+
+"""Available codecs by name, in order of preference."""
+CODECS: Dict[str, Type[JsonCodec]] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+    UjsonCodec.name: UjsonCodec,
+    JsonCodec.name: JsonCodec,
+}
+
+_default_codec: Optional[JsonCodec] = None
+
+
+def get_codec(codec: Union[None, str, JsonCodec] = None) -> JsonCodec:
+    """Returns a JSON codec.
+
+    :param codec: a JsonCodec instance (returned as-is), the name of a codec in CODECS, or None to
+        select the fastest installed codec.
+    :raises ValueError if the codec name is unknown; ImportError if its library is not installed.
+    """
+    global _default_codec
+    if isinstance(codec, JsonCodec):
+        return codec
+    elif codec is not None:
+        if codec not in CODECS:
+            raise ValueError("Unknown JSON codec %s; available: %s" % (codec, ", ".join(CODECS)))
+        return CODECS[codec]()
+    if _default_codec is None:
+        for codec_class in CODECS.values():
+            try:
+                _default_codec = codec_class()
+                break
+            except ImportError:
+                continue
+    assert _default_codec is not None  # JsonCodec is always available
+    return _default_codec
@@ -0,0 +1,162 @@
+"""Columnar decoding of BigDB lists.
+
+BigDbClient.get_columns() / Node.get_columns() return a list as one column per leaf of its elements,
+instead of one dict per element:
+
+columns = root.core.switch.interface.get_columns()
+errors = columns["rx-error-count"] + columns["tx-error-count"]
+
+The columns of numeric leaves are arrays whose type is taken from the schema (e.g., unsigned 64-bit
+for counters, float64 for decimals): NumPy arrays if NumPy is installed, so that sums, deltas and
+thresholds over the whole list are vectorized, and array.array otherwise. Other leaves (strings,
+enumerations, leaf-lists, ...) are Python lists. Leaves of containers within the elements are columns
+too, named by their path within the element (e.g., "stats/rx-bytes"); nested lists are not included,
+retrieve them with their own path.
+
+A numeric leaf that is absent from an element is 0 in its column (NaN for decimals). If a value does
+not fit the type of its column (e.g., a negative value in an unsigned column), the column becomes a list.
+"""
+
+import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+"""array.array type codes of numeric leaves by the name of their type."""
+TYPE_CODES = {
+    "int8": "b",
+    "int16": "h",
+    "int32": "i",
+    "int64": "q",
+    "uint8": "B",
+    "uint16": "H",
+    "uint32": "I",
+    "uint64": "Q",
+    "counter32": "I",
+    "counter64": "Q",
+    "gauge32": "I",
+    "gauge64": "Q",
+    "decimal64": "d",
+}
+
+"""Type code of BOOLEAN leaves; they become NumPy bool arrays."""
+BOOLEAN_CODE = "B"
+
+ColumnType = Optional[str]
+
+
+def _minimum(type_node: Dict[str, Any]) -> Optional[float]:
+    """Returns the lower bound of the range validators of an integer type, if any."""
+    starts: List[Any] = [
+        bound.get("start")
+        for validator in type_node.get("typeValidator", ())
+        if isinstance(validator, dict)
+        for bound in validator.get("ranges", ())
+        if isinstance(bound, dict)
+    ]
+    if not starts or any(not isinstance(start, (int, float)) for start in starts):
+        return None
+    return float(min(starts))
+
+
+def leaf_type_code(schema: Dict[str, Any]) -> ColumnType:
+    """Returns the array.array type code of the values of a leaf from its schema node, or None if the
+    leaf is not numeric.
+    """
+    if schema.get("nodeType") != "LEAF":
+        return None
+    type_node = schema.get("typeSchemaNode", schema)
+    code = TYPE_CODES.get(str(type_node.get("name", "")).lower())
+    if code is not None:
+        return code
+    leaf_type = type_node.get("leafType", schema.get("leafType"))
+    if leaf_type == "INTEGER":
+        minimum = _minimum(type_node)
+        return "Q" if minimum is not None and minimum >= 0 else "q"
+    if leaf_type == "DECIMAL":
+        return "d"
+    if leaf_type == "BOOLEAN":
+        return BOOLEAN_CODE
+    return None
+
+
+def column_types(schema: Dict[str, Any]) -> Dict[str, ColumnType]:
+    """Returns the columns of the elements of a list (or of a container) from its schema node: the type
+    code of each leaf by its path within the element; see leaf_type_code().
+
+    :raises ValueError if the schema node is not a list or container.
+    """
+    node = schema.get("listElementSchemaNode", {}) if schema.get("nodeType") == "LIST" else schema
+    if node.get("nodeType") not in ("CONTAINER", "LIST_ELEMENT"):
+        raise ValueError("Cannot decode a %s into columns" % schema.get("nodeType"))
+    types: Dict[str, ColumnType] = {}
+    for name, child in node.get("childNodes", {}).items():
+        node_type = child.get("nodeType")
+        if node_type in ("LEAF", "LEAF_LIST"):
+            types[name] = leaf_type_code(child)
+        elif node_type == "CONTAINER":
+            for path, code in column_types(child).items():
+                types[name + "/" + path] = code
+    return types
+
+
+def _missing(code: ColumnType) -> Any:
+    if code is None:
+        return None
+    return float("nan") if code == "d" else 0
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def decode_columns(
+    elements: Iterable[Any],
+    types: Dict[str, ColumnType],
+    fields: Optional[Sequence[str]] = None,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Decodes list elements into columns.
+
+    :param elements: the decoded list elements (dicts), e.g., from BigDbClient.iter_get()
+    :param types: the columns and their type codes, see column_types()
+    :param fields: if set, only the columns of these fields (BigDB names; for a container, all of its
+        leaves) are returned
+    :param use_numpy: whether numeric columns are NumPy arrays; by default, if NumPy is installed.
+    :return: the columns by path within the element
+    :raises ImportError if use_numpy is True and NumPy is not installed
+    """
+    if fields is not None:
+        types = {path: code for path, code in types.items() if path.split("/", 1)[0] in fields}
+    numpy = _numpy() if use_numpy is not False else None
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy is not installed")
+
+    columns: Dict[str, Any] = {}
+    # for each column: its values, the keys to look up its value in an element, and the missing value
+    decoders: List[Tuple[str, Any, Tuple[str, ...], Any]] = []
+    for path, code in types.items():
+        columns[path] = array.array(code) if code is not None else []
+        decoders.append((path, columns[path], tuple(path.split("/")), _missing(code)))
+
+    for element in elements:
+        for i, (path, values, keys, missing) in enumerate(decoders):
+            value: Any = element
+            for key in keys:
+                value = value.get(key, missing) if isinstance(value, dict) else missing
+            try:
+                values.append(value)
+            except (TypeError, OverflowError):
+                # not of the type of the schema; keep the values as they are
+                values = columns[path] = list(values)
+                values.append(value)
+                decoders[i] = (path, values, keys, None)
+
+    if numpy is not None:
+        for path, values in columns.items():
+            if isinstance(values, array.array):
+                column = numpy.frombuffer(values, dtype=values.typecode)
+                columns[path] = column.astype(bool) if types[path] == BOOLEAN_CODE else column
+    return columns
@@ -0,0 +1,107 @@
+"""Compressed transport for BigDbClient.
+
+With CompressionOptions, BigDbClient negotiates compressed responses (Accept-Encoding), gzip-compresses
+request bodies above a size threshold (Content-Encoding: gzip) and counts the bytes before and after
+compression in TransferStats (see BigDbClient.transfer_stats()). Compression pays off for large
+documents on high-latency or low-bandwidth links to the controller.
+"""
+
+import gzip
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from requests import Request, Response
+from requests.structures import CaseInsensitiveDict
+
+
+class CompressionOptions(NamedTuple):
+    """Compression options for a BigDbClient."""
+
+    """Value of the Accept-Encoding request header, i.e., the response encodings accepted."""
+    accept_encoding: str = "gzip, deflate"
+    """Request bodies of at least this many bytes are gzip-compressed. None disables request compression,
+    which requires the server to accept Content-Encoding: gzip."""
+    request_threshold: Optional[int] = None
+    """gzip compression level for request bodies (1: fastest, 9: smallest)."""
+    level: int = 6
+
+
+class TransferStats(object):
+    """Thread-safe counters of bytes transferred, before and after compression."""
+
+    """Requests with a body."""
+    requests: int = 0
+    """Request body bytes before compression."""
+    request_bytes: int = 0
+    """Request body bytes sent."""
+    request_bytes_sent: int = 0
+    """Responses received."""
+    responses: int = 0
+    """Response body bytes after decompression."""
+    response_bytes: int = 0
+    """Response body bytes received."""
+    response_bytes_received: int = 0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record_request(self, size: int, sent: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.request_bytes += size
+            self.request_bytes_sent += sent
+
+    def record_response(self, response: Response, size: Optional[int] = None) -> None:
+        """Records a response whose body has been read.
+
+        :param size: decompressed body size, for streamed responses whose content is not kept.
+        """
+        if size is None:
+            size = len(response.content)
+        # urllib3 counts the (compressed) bytes read from the connection
+        received = getattr(response.raw, "tell", lambda: None)()
+        if not isinstance(received, int):
+            received = size
+        with self._lock:
+            self.responses += 1
+            self.response_bytes += size
+            self.response_bytes_received += received
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the current counter values as a dict."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "request_bytes": self.request_bytes,
+                "request_bytes_sent": self.request_bytes_sent,
+                "responses": self.responses,
+                "response_bytes": self.response_bytes,
+                "response_bytes_received": self.response_bytes_received,
+            }
+
+    def __repr__(self) -> str:
+        return "TransferStats(%s)" % ", ".join("%s=%d" % item for item in self.snapshot().items())
+
+
+def compress_request(request: Request, options: CompressionOptions, stats: TransferStats) -> None:
+    """Applies options to request before it is sent: sets Accept-Encoding and compresses the body if it is
+    large enough. Records the body size in stats.
+    """
+    # request.headers may be any mapping (or None); copy it before adding headers
+    headers: CaseInsensitiveDict = CaseInsensitiveDict(request.headers or {})
+    headers["Accept-Encoding"] = options.accept_encoding
+    request.headers = headers
+    data = request.data
+    if not data:
+        return
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if not isinstance(data, bytes):
+        # form data etc. is not produced by BigDbClient, send as-is
+        return
+    size = len(data)
+    if options.request_threshold is not None and size >= options.request_threshold:
+        data = gzip.compress(data, compresslevel=options.level)
+        request.data = data
+        headers["Content-Encoding"] = "gzip"
+    stats.record_request(size, len(data))
@@ -0,0 +1,83 @@
+"""Conditional GET support for pollers.
+
+BigDbClient.get_conditional() remembers the validators of the last response for each path and params:
+the ETag and Last-Modified headers (if the server sends them) and a digest of the raw response body. The
+next request for the same path is sent with If-None-Match / If-Modified-Since; if the server answers
+304 Not Modified, or the body has the same digest as before, the previously decoded value is returned
+without decoding the body again, and the result is flagged as unchanged.
+"""
+
+import collections
+import hashlib
+import threading
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from pybsn.cache import ParamsKey, params_key
+
+ConditionalKey = Tuple[str, ParamsKey]
+
+
+class ConditionalResult(NamedTuple):
+    """Result of BigDbClient.get_conditional()."""
+
+    """The decoded response. If changed is False, this is the same object as returned before; do not
+    modify it."""
+    value: Any
+    """False if the data is the same as for the previous request of the same path and params."""
+    changed: bool
+
+
+class _Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+    value: Any
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def digest(content: bytes) -> bytes:
+    """Digest of a response body, used to detect unchanged responses."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class ConditionalStore(object):
+    """Validators and decoded values of the last response per path and params, bounded in size (LRU)."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._entries: "collections.OrderedDict[ConditionalKey, _Validators]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str, params: Optional[Dict[str, str]] = None) -> ConditionalKey:
+        return path, params_key(params)
+
+    def get(self, key: ConditionalKey) -> Optional[_Validators]:
+        with self._lock:
+            validators = self._entries.get(key)
+            if validators is not None:
+                self._entries.move_to_end(key)
+            return validators
+
+    def put(self, key: ConditionalKey, response_headers: Mapping[str, str], content_digest: bytes, value: Any) -> None:
+        """Records the validators of a response and its decoded value."""
+        validators = _Validators(response_headers.get("ETag"), response_headers.get("Last-Modified"), content_digest, value)
+        with self._lock:
+            self._entries[key] = validators
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,406 @@
+"""Counter sampling: deltas and rates of BigDB counters polled at intervals.
+
+A CounterPoller polls the counters of a keyed list (e.g., interface or switch statistics) and computes
+the delta and rate of each counter since the previous poll:
+
+poller = CounterPoller(root.core.switch.interface, counters=["rx-bytes", "tx-bytes"])
+for sample in poller.run(interval=1.0):
+    for row, key in enumerate(sample.keys):
+        if sample.valid["rx-bytes"][row]:
+            print(key, sample.rates["rx-bytes"][row])
+
+Samples are keyed by the key leaves of the list, from the schema. Counters of a nested list are polled
+with within, e.g., CounterPoller(switch_counter, counters=["value"], within="counter") keys each
+counter by (switch-name, name).
+
+Each key is assigned a row when it appears. The rows of keys that are missing from a poll are
+reclaimed by moving the last rows into them, so the rows of a sample are those of the keys of its
+poll, and the row of a key may change between polls; look it up in CounterSample.rows. The values,
+deltas and rates are kept in arrays allocated once (and grown when new keys appear) and reused by
+every poll, so that steady-state polling does not allocate per counter. With NumPy installed, they are
+NumPy arrays and deltas and rates are computed vectorized; otherwise they are array.array buffers.
+The arrays of a CounterSample are views of these buffers and are overwritten by the next poll (which
+also moves rows within them when keys disappear); copy them to keep them. Its keys and rows are its
+own and stay valid.
+
+Counters are unsigned integers of 32 or 64 bits (from their type in the schema). A counter that
+decreased either wrapped around (if it was in the top quarter of its range and is now in the bottom
+quarter; the delta is taken modulo its range) or was reset (e.g., the switch rebooted; the delta is
+the new value). A row is valid for a counter if the counter was present in this and the previous poll.
+"""
+
+import array
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from pybsn.columns import leaf_type_code
+from pybsn.paging import schema_path
+from pybsn.projection import field_name
+
+"""Type codes of counters that wrap at 32 bits; all other integer counters wrap at 64 bits."""
+_NARROW_CODES = frozenset("bBhHiI")
+_INTEGER_CODES = frozenset("bBhHiIqQ")
+
+"""Number of rows the buffers are allocated for initially."""
+INITIAL_CAPACITY = 256
+
+
+class CounterSample(NamedTuple):
+    """The result of a poll. The arrays (one per counter) have one entry per row; they are only valid
+    until the next poll, see the module documentation."""
+
+    """The key of each row (the values of the key leaves, in schema order)."""
+    keys: List[Tuple[Any, ...]]
+    """The row of each key."""
+    rows: Dict[Tuple[Any, ...], int]
+    """Time of the poll (clock of the poller)."""
+    timestamp: float
+    """Seconds since the previous poll; None for the first poll."""
+    elapsed: Optional[float]
+    """The values polled; stale for rows that are not valid."""
+    values: Dict[str, Any]
+    """The increase since the previous poll; 0 for rows that are not valid."""
+    deltas: Dict[str, Any]
+    """The increase per second since the previous poll; NaN for rows that are not valid."""
+    rates: Dict[str, Any]
+    """True (1) for rows with a value in this and the previous poll."""
+    valid: Dict[str, Any]
+
+    def rate(self, key: Tuple[Any, ...], counter: str) -> Optional[float]:
+        """Returns the rate of a counter of the row with the given key, or None if it is not valid."""
+        row = self.rows.get(key)
+        if row is None or row >= len(self.valid[counter]) or not self.valid[counter][row]:
+            return None
+        return float(self.rates[counter][row])
+
+    def delta(self, key: Tuple[Any, ...], counter: str) -> Optional[int]:
+        """Returns the delta of a counter of the row with the given key, or None if it is not valid."""
+        row = self.rows.get(key)
+        if row is None or row >= len(self.valid[counter]) or not self.valid[counter][row]:
+            return None
+        return int(self.deltas[counter][row])
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _Counter(object):
+    """The buffers of one counter; values and seen alternate between polls (see CounterPoller.poll())."""
+
+    def __init__(self, name: str, code: str) -> None:
+        self.name = name
+        self.bits = 32 if code in _NARROW_CODES else 64
+        self.modulus = 1 << self.bits
+        self.code = "I" if self.bits == 32 else "Q"
+        self.values: List[Any] = []
+        # the number of the last poll each row had a value in
+        self.seen: List[Any] = []
+        self.deltas: Any = None
+        self.rates: Any = None
+        self.valid: Any = None
+
+
+class CounterPoller(object):
+    """Polls the counters of a keyed list and computes their deltas and rates; see the module documentation."""
+
+    def __init__(
+        self,
+        node: Any,
+        counters: Optional[Sequence[str]] = None,
+        within: Optional[str] = None,
+        use_numpy: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param node: the Node of the list to poll
+        :param counters: names of the counter leaves (as for Node.select()); by default, all integer leaves
+            that are not keys.
+        :param within: name of a nested list of the elements that holds the counters; its elements are keyed
+            by the keys of the list and their own keys.
+        :param use_numpy: whether to use NumPy arrays; by default, if NumPy is installed.
+        :param clock: returns the current time in seconds, for timestamps and rates
+        :raises ValueError if node is not a keyed list, or a counter is not an integer leaf of it
+        :raises ImportError if use_numpy is True and NumPy is not installed
+        """
+        self._numpy: Any = _numpy() if use_numpy is not False else None
+        if use_numpy and self._numpy is None:
+            raise ImportError("NumPy is not installed")
+        self._clock = clock
+        self._within = field_name(within) if within else None
+
+        schema = node._connection.schema(schema_path(node._path))
+        self._key_names, self._nested_key_names, leaves = self._parse_schema(schema)
+        if counters is None:
+            names = list(leaves)
+        else:
+            names = [field_name(counter) for counter in counters]
+            unknown = [name for name in names if name not in leaves]
+            if unknown:
+                raise ValueError("Not integer leaves of %s: %s" % (node._path, ", ".join(unknown)))
+        self._counters = [_Counter(name, leaves[name]) for name in names]
+        selected = self._key_names + ((self._within,) if self._within else tuple(names))
+        self._node = node.select(*selected)
+
+        self._keys: List[Tuple[Any, ...]] = []
+        self._rows: Dict[Tuple[Any, ...], int] = {}
+        # the number of the last poll each row's key was in
+        self._polled: List[int] = []
+        self._capacity = 0
+        self._grow(INITIAL_CAPACITY)
+        self._polls = 0
+        self._last: Optional[float] = None
+        self._lock = threading.Lock()
+        self._resets = 0
+        self._wraps = 0
+
+    def _parse_schema(self, schema: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[str, ...], Dict[str, str]]:
+        """Returns the key leaves of the list and of the nested list, and the type codes
+        of the integer leaves that may hold counters (see pybsn.columns.leaf_type_code()).
+        """
+
+        def keys(node: Dict[str, Any], what: str) -> Tuple[str, ...]:
+            if node.get("nodeType") != "LIST":
+                raise ValueError("Not a list: %s" % what)
+            names = tuple(node.get("keyNodeNames") or ())
+            if not names:
+                raise ValueError("Not a keyed list: %s" % what)
+            return names
+
+        key_names = keys(schema, schema.get("name", ""))
+        children = schema.get("listElementSchemaNode", {}).get("childNodes", {})
+        nested_key_names: Tuple[str, ...] = ()
+        if self._within:
+            nested = children.get(self._within, {})
+            nested_key_names = keys(nested, self._within)
+            children = nested.get("listElementSchemaNode", {}).get("childNodes", {})
+        excluded = nested_key_names if self._within else key_names
+        leaves = {}
+        for name, child in children.items():
+            code = leaf_type_code(child)
+            if code in _INTEGER_CODES and name not in excluded:
+                leaves[name] = str(code)
+        return key_names, nested_key_names, leaves
+
+    def _grow(self, capacity: int) -> None:
+        """Reallocates the buffers for capacity rows, keeping their contents."""
+        numpy = self._numpy
+        rows = len(self._keys)
+        for counter in self._counters:
+            if numpy is not None:
+                dtype = numpy.uint32 if counter.bits == 32 else numpy.uint64
+                buffers = [
+                    numpy.zeros(capacity, dtype),
+                    numpy.zeros(capacity, dtype),
+                    numpy.zeros(capacity, numpy.int64),
+                    numpy.zeros(capacity, numpy.int64),
+                    numpy.zeros(capacity, dtype),
+                    numpy.zeros(capacity, numpy.float64),
+                    numpy.zeros(capacity, numpy.bool_),
+                ]
+            else:
+                codes = [counter.code, counter.code, "q", "q", counter.code, "d", "B"]
+                buffers = [array.array(code, bytes(capacity * array.array(code).itemsize)) for code in codes]
+            # rows that have not been polled yet have not been seen
+            for seen in buffers[2:4]:
+                seen[:] = array.array("q", [-1]) * capacity if numpy is None else -1
+            if rows:
+                old = counter.values + counter.seen + [counter.deltas, counter.rates, counter.valid]
+                for buffer, previous in zip(buffers, old):
+                    buffer[:rows] = previous[:rows]
+            counter.values, counter.seen = buffers[0:2], buffers[2:4]
+            counter.deltas, counter.rates, counter.valid = buffers[4:7]
+        if self._numpy is not None:
+            # temporaries of the vectorized computation
+            self._masks = [numpy.zeros(capacity, numpy.bool_) for _ in range(4)]
+        self._capacity = capacity
+
+    def _add_row(self, key: Tuple[Any, ...]) -> int:
+        row = len(self._keys)
+        if row >= self._capacity:
+            self._grow(self._capacity * 2)
+        self._keys.append(key)
+        self._rows[key] = row
+        self._polled.append(0)
+        return row
+
+    def _reclaim(self, poll: int) -> None:
+        """Removes the rows of the keys that were not in this poll, moving the last rows into their place."""
+        keys, rows, polled = self._keys, self._rows, self._polled
+        row = 0
+        while row < len(keys):
+            if polled[row] == poll:
+                row += 1
+                continue
+            del rows[keys[row]]
+            last = len(keys) - 1
+            if row != last:
+                keys[row], polled[row] = keys[last], polled[last]
+                rows[keys[row]] = row
+                for counter in self._counters:
+                    for buffer in counter.values + counter.seen:
+                        buffer[row] = buffer[last]
+            keys.pop()
+            polled.pop()
+            # the freed row has not been seen by the key it is assigned to next
+            for counter in self._counters:
+                for seen in counter.seen:
+                    seen[last] = -1
+
+    def _items(self, element: Dict[str, Any]) -> Iterator[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+        key = tuple(element.get(name) for name in self._key_names)
+        if not self._within:
+            yield key, element
+            return
+        for item in element.get(self._within) or ():
+            if isinstance(item, dict):
+                yield key + tuple(item.get(name) for name in self._nested_key_names), item
+
+    def poll(self) -> CounterSample:
+        """Polls the counters once and returns their values, deltas and rates."""
+        with self._lock:
+            self._polls += 1
+            poll = self._polls
+            current = poll % 2
+            rows = self._rows
+            polled = self._polled
+            counters = self._counters
+            present = 0
+            for element in self._node.iter():
+                if not isinstance(element, dict):
+                    continue
+                for key, item in self._items(element):
+                    row = rows.get(key)
+                    if row is None:
+                        row = self._add_row(key)
+                    if polled[row] != poll:
+                        polled[row] = poll
+                        present += 1
+                    for counter in counters:
+                        value = item.get(counter.name)
+                        if type(value) is int and 0 <= value < counter.modulus:
+                            counter.values[current][row] = value
+                            counter.seen[current][row] = poll
+            if present < len(self._keys):
+                self._reclaim(poll)
+            now = self._clock()
+            elapsed = now - self._last if self._last is not None else None
+            self._last = now
+            if self._numpy is not None:
+                self._compute_numpy(poll, elapsed)
+            else:
+                self._compute(poll, elapsed)
+            return self._sample(poll, now, elapsed)
+
+    def _compute(self, poll: int, elapsed: Optional[float]) -> None:
+        current, previous = poll % 2, (poll - 1) % 2
+        nan = float("nan")
+        for counter in self._counters:
+            values, last_values = counter.values[current], counter.values[previous]
+            seen, last_seen = counter.seen[current], counter.seen[previous]
+            deltas, rates, valid = counter.deltas, counter.rates, counter.valid
+            modulus = counter.modulus
+            high, low = modulus - (modulus >> 2), modulus >> 2
+            for row in range(len(self._keys)):
+                if not elapsed or seen[row] != poll or last_seen[row] != poll - 1:
+                    deltas[row], rates[row], valid[row] = 0, nan, 0
+                    continue
+                value, last = values[row], last_values[row]
+                if value >= last:
+                    delta = value - last
+                elif last >= high and value < low:
+                    delta = value + modulus - last
+                    self._wraps += 1
+                else:
+                    delta = value
+                    self._resets += 1
+                deltas[row], rates[row], valid[row] = delta, delta / elapsed, 1
+
+    def _compute_numpy(self, poll: int, elapsed: Optional[float]) -> None:
+        numpy = self._numpy
+        n = len(self._keys)
+        current, previous = poll % 2, (poll - 1) % 2
+        decreased, wrapped, low, invalid = (mask[:n] for mask in self._masks)
+        for counter in self._counters:
+            values, last_values = counter.values[current][:n], counter.values[previous][:n]
+            deltas, rates, valid = counter.deltas[:n], counter.rates[:n], counter.valid[:n]
+            numpy.equal(counter.seen[current][:n], poll, out=valid)
+            numpy.equal(counter.seen[previous][:n], poll - 1, out=invalid)
+            numpy.logical_and(valid, invalid, out=valid)
+            if not elapsed:
+                valid.fill(False)
+            numpy.logical_not(valid, out=invalid)
+            # modular subtraction: the delta of wrapped counters
+            numpy.subtract(values, last_values, out=deltas)
+            numpy.less(values, last_values, out=decreased)
+            numpy.logical_and(decreased, valid, out=decreased)
+            modulus = counter.modulus
+            numpy.greater_equal(last_values, modulus - (modulus >> 2), out=wrapped)
+            numpy.logical_and(wrapped, decreased, out=wrapped)
+            numpy.less(values, modulus >> 2, out=low)
+            numpy.logical_and(wrapped, low, out=wrapped)
+            wraps = int(numpy.count_nonzero(wrapped))
+            # decreased but not wrapped: reset
+            numpy.logical_xor(decreased, wrapped, out=decreased)
+            numpy.copyto(deltas, values, where=decreased)
+            self._wraps += wraps
+            self._resets += int(numpy.count_nonzero(decreased))
+            numpy.copyto(deltas, 0, where=invalid)
+            if elapsed:
+                numpy.divide(deltas, elapsed, out=rates)
+            numpy.copyto(rates, numpy.nan, where=invalid)
+
+    def _sample(self, poll: int, now: float, elapsed: Optional[float]) -> CounterSample:
+        n = len(self._keys)
+        current = poll % 2
+
+        def view(buffer: Any) -> Any:
+            return buffer[:n] if self._numpy is not None else memoryview(buffer)[:n]
+
+        counters = self._counters
+        return CounterSample(
+            list(self._keys),
+            dict(self._rows),
+            now,
+            elapsed,
+            {counter.name: view(counter.values[current]) for counter in counters},
+            {counter.name: view(counter.deltas) for counter in counters},
+            {counter.name: view(counter.rates) for counter in counters},
+            {counter.name: view(counter.valid) for counter in counters},
+        )
+
+    def run(self, interval: float, count: Optional[int] = None) -> Iterator[CounterSample]:
+        """Polls every interval seconds and yields the samples, count times or until the iterator is closed.
+
+        Polls are on a fixed schedule, so that the time taken by polls and by the consumer does not
+        accumulate. If the consumer is late for one or more polls, they are replaced by a single poll
+        right away.
+        """
+        next_poll = self._clock()
+        polled = 0
+        while True:
+            yield self.poll()
+            polled += 1
+            if count is not None and polled >= count:
+                return
+            next_poll += interval
+            delay = next_poll - self._clock()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # late: poll right away, as the last poll that is due, and stay on schedule
+                next_poll += (-delay // interval) * interval
+
+    @property
+    def counters(self) -> List[str]:
+        return [counter.name for counter in self._counters]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the numbers of polls, rows (keys of the last poll) and of counter wraps and resets detected."""
+        with self._lock:
+            return {"polls": self._polls, "rows": len(self._keys), "wraps": self._wraps, "resets": self._resets}
@@ -0,0 +1,103 @@
+"""Discovery of the BigDB URL of a controller host (see pybsn.guess_url()).
+
+The candidate URLs (https://host:8443, http://host:8080) are probed concurrently. The most preferred
+healthy candidate wins: as soon as it has answered, or as soon as all candidates preferred to it have
+failed. An unreachable port therefore no longer delays the discovery of the other one, unless the
+more preferred https port does not answer at all (then it is waited for up to the probe timeout, so
+that plain HTTP is not used just because it answers faster).
+
+Discovered URLs are cached per host for the lifetime of the process and, if a SessionCache is given,
+on disk. The probe is sent on the session that is used afterwards, so its pooled connection is reused
+by the requests that follow.
+"""
+
+import concurrent.futures
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from pybsn.sessioncache import SessionCache
+
+logger = logging.getLogger("pybsn")
+
+"""Default seconds to wait for a probe response."""
+PROBE_TIMEOUT = 2.0
+
+_resolved: Dict[str, str] = {}
+_resolved_lock = threading.Lock()
+
+
+def cached_url(host: str, url_cache: Optional[SessionCache] = None) -> Optional[str]:
+    """Returns the URL discovered for host earlier in this process or, failing that, in url_cache."""
+    with _resolved_lock:
+        url = _resolved.get(host)
+    if url is None and url_cache is not None:
+        url = url_cache.load_url(host)
+        if url is not None:
+            with _resolved_lock:
+                _resolved[host] = url
+    return url
+
+
+def remember_url(host: str, url: str, url_cache: Optional[SessionCache] = None) -> None:
+    with _resolved_lock:
+        _resolved[host] = url
+    if url_cache is not None:
+        url_cache.store_url(host, url)
+
+
+def forget_url(host: str, url_cache: Optional[SessionCache] = None) -> bool:
+    """Removes the URL cached for host, e.g., because it stopped working; returns whether one was cached."""
+    with _resolved_lock:
+        found = _resolved.pop(host, None) is not None
+    if url_cache is not None and url_cache.load_url(host) is not None:
+        url_cache.forget_url(host)
+        found = True
+    return found
+
+
+def clear_url_cache() -> None:
+    """Forgets all URLs cached in this process."""
+    with _resolved_lock:
+        _resolved.clear()
+
+
+def _probe(session: requests.Session, url: str, validate_path: str, timeout: float) -> bool:
+    try:
+        response = session.get(url + validate_path, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("Error connecting to %s: %s", url, str(e))
+        return False
+    if response.status_code == 200:  # OK
+        return True
+    logger.debug("Could connect to URL %s: %s", url, response)
+    return False
+
+
+def probe_urls(session: requests.Session, candidates: List[str], validate_path: str, timeout: float) -> Optional[str]:
+    """Probes candidates (in order of preference) concurrently and returns the most preferred healthy
+    one, without waiting for less preferred ones; None if none is healthy.
+    """
+    if len(candidates) == 1:
+        return candidates[0] if _probe(session, candidates[0], validate_path, timeout) else None
+    executor = concurrent.futures.ThreadPoolExecutor(len(candidates), thread_name_prefix="pybsn-probe")
+    try:
+        futures = {executor.submit(_probe, session, url, validate_path, timeout): i for i, url in enumerate(candidates)}
+        outcomes: List[Optional[bool]] = [None] * len(candidates)
+        for future in concurrent.futures.as_completed(futures):
+            outcomes[futures[future]] = future.result()
+            for url, outcome in zip(candidates, outcomes):
+                if outcome is None:
+                    break  # a more preferred candidate is still being probed
+                if outcome:
+                    return url
+        return None
+    finally:
+        # less preferred probes still in flight finish in the background (bounded by timeout)
+        executor.shutdown(wait=False)
+
+
+def candidate_urls(host: str, proto_ports: List[Tuple[str, int]]) -> List[str]:
+    return ["%s://%s:%d" % (scheme, host, port) for scheme, port in proto_ports]
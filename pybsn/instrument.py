@@ -0,0 +1,237 @@
+"""Request instrumentation.
+
+RequestHooks attached to a client (pybsn.connect(host, hooks=[...])) are called for each request:
+on_request() before it is sent, and on_response() or on_error() when it completes. All three receive
+the same RequestEvent, which carries the method, the path and its template (the path with predicate
+values replaced by *, so that e.g. all switches share controller/core/switch[name=*]), the status,
+the request and response body sizes, and the time spent preparing the request, waiting for the
+response and decoding the JSON body.
+
+LatencyCollector is a built-in hook that keeps per-template latency histograms and error counts:
+
+collector = LatencyCollector()
+client = pybsn.connect(host, token=token, hooks=[collector])
+...
+print(collector.dump())
+"""
+
+import bisect
+import functools
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pybsn.paging import PREDICATE
+
+logger = logging.getLogger("pybsn")
+
+
+@functools.lru_cache(maxsize=4096)
+def path_template(path: str) -> str:
+    """Returns path with the values of its predicates replaced by *, e.g., switch[name='leaf1'] becomes
+    switch[name=*].
+    """
+    return PREDICATE.sub(lambda m: "[%s%s*]" % (m.group(1) or "", m.group(2) or ""), path)
+
+
+class RequestEvent(object):
+    """A request, as passed to RequestHooks. Times are in seconds.
+
+    method, path: of the request; path is relative to the data or RPC prefix (/api/v1/data/)
+    template: path with the predicate values replaced by *, see path_template()
+    status: HTTP status, or None if no response was received
+    request_bytes: size of the request body as sent (i.e., compressed, if it was)
+    response_bytes: size of the (decompressed) response body; None for streamed responses
+    prepare_time: time to build, encode and compress the request
+    network_time: time from sending the request until the response body (or, if streamed, the
+        headers) was received
+    decode_time: time to decode the JSON response, or None if it was not decoded (e.g., for writes)
+    error: the exception, for on_error()
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "template",
+        "status",
+        "request_bytes",
+        "response_bytes",
+        "prepare_time",
+        "network_time",
+        "decode_time",
+        "error",
+    )
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.template = path_template(path)
+        self.status: Optional[int] = None
+        self.request_bytes = 0
+        self.response_bytes: Optional[int] = None
+        self.prepare_time = 0.0
+        self.network_time = 0.0
+        self.decode_time: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def total_time(self) -> float:
+        return self.prepare_time + self.network_time + (self.decode_time or 0.0)
+
+    def __repr__(self) -> str:
+        return "RequestEvent(%s %s, status=%s, total=%.6f)" % (self.method, self.path, self.status, self.total_time)
+
+
+class RequestHooks(object):
+    """Base class of request hooks; override the methods of interest.
+
+    Hooks are called on the thread that makes the request. Exceptions raised by hooks are logged and
+    otherwise ignored.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called before the request is prepared and sent."""
+
+    def on_response(self, event: RequestEvent) -> None:
+        """Called after a successful response has been received and decoded."""
+
+    def on_error(self, event: RequestEvent) -> None:
+        """Called if the request failed; event.error is the exception, event.status is set for HTTP errors."""
+
+
+def emit(hooks: Sequence[RequestHooks], name: str, event: RequestEvent) -> None:
+    """Calls the hook method name of each of hooks with event."""
+    for hook in hooks:
+        try:
+            getattr(hook, name)(event)
+        except Exception:
+            logger.exception("Request hook %r failed", hook)
+
+
+class PendingEvents(threading.local):
+    """Per-thread event of a request whose response is yet to be decoded.
+
+    on_response() is called after decoding, which happens after the request method returns; the
+    event and the time the response arrived are kept here in between.
+    """
+
+    event: Optional[RequestEvent] = None
+    received: float = 0.0
+
+
+"""Upper bounds (seconds) of the histogram buckets: 100us to ~100s, 10% apart (relative error <= 10%)."""
+BUCKET_BOUNDS: Tuple[float, ...] = tuple(1e-4 * 1.1**i for i in range(146))
+
+
+class LatencyHistogram(object):
+    """Histogram of latencies with logarithmic buckets; memory is constant in the number of samples."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Returns the upper bound of the bucket containing the p-th percentile (0 < p <= 100)."""
+        if self.count == 0:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+class _PathStats(object):
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.prepare_time = 0.0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.response_bytes = 0
+
+
+class LatencyCollector(RequestHooks):
+    """Keeps latency histograms and error counts per method and path template."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[Tuple[str, str], _PathStats] = {}
+        self._lock = threading.Lock()
+
+    def on_response(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._get(event)
+            stats.latency.add(event.total_time)
+            stats.prepare_time += event.prepare_time
+            stats.network_time += event.network_time
+            stats.decode_time += event.decode_time or 0.0
+            stats.response_bytes += event.response_bytes or 0
+
+    def on_error(self, event: RequestEvent) -> None:
+        with self._lock:
+            self._get(event).errors += 1
+
+    def _get(self, event: RequestEvent) -> _PathStats:
+        key = (event.method, event.template)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _PathStats()
+        return stats
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Returns the statistics per method and path template, most requested first.
+
+        Latencies (p50, p95, p99, max, mean) are in seconds; prepare, network and decode are the mean
+        times of successful requests spent in each phase.
+        """
+        with self._lock:
+            result: List[Dict[str, Any]] = []
+            for (method, template), stats in self._stats.items():
+                count = stats.latency.count
+                result.append(
+                    {
+                        "method": method,
+                        "path": template,
+                        "count": count,
+                        "errors": stats.errors,
+                        "p50": stats.latency.percentile(50),
+                        "p95": stats.latency.percentile(95),
+                        "p99": stats.latency.percentile(99),
+                        "max": stats.latency.max if count else None,
+                        "mean": stats.latency.total / count if count else None,
+                        "prepare": stats.prepare_time / count if count else None,
+                        "network": stats.network_time / count if count else None,
+                        "decode": stats.decode_time / count if count else None,
+                        "bytes": stats.response_bytes,
+                    }
+                )
+        result.sort(key=lambda s: -(s["count"] + s["errors"]))
+        return result
+
+    def dump(self) -> str:
+        """Returns the statistics as a table, with latencies in milliseconds."""
+
+        def ms(value: Optional[float]) -> str:
+            return "%.1f" % (value * 1000) if value is not None else "-"
+
+        row = "%-6s %8s %6s %9s %9s %9s %9s  %s"
+        lines = [row % ("METHOD", "COUNT", "ERRORS", "p50(ms)", "p95(ms)", "p99(ms)", "max(ms)", "PATH")]
+        for s in self.snapshot():
+            latencies = (ms(s["p50"]), ms(s["p95"]), ms(s["p99"]), ms(s["max"]))
+            lines.append(row % (s["method"], s["count"], s["errors"], *latencies, s["path"]))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,60 @@
+"""Paging over large BigDB lists.
+
+BigDbClient.iter_pages() streams a list (see BigDbClient.iter_get()) and yields its elements in pages
+of a fixed size, so a list with millions of entries can be processed with memory bounded by the page
+size. Each page records the key of its last element. BigDB returns keyed lists ordered by key, so
+iteration can be resumed after that page (e.g., after a restart) with a key-range predicate:
+
+for page in root.core.switch.iter_pages(1000):
+    process(page.elements)
+    checkpoint(page.last_key)
+...
+for page in root.core.switch.iter_pages(1000, start_after=checkpointed_key):
+    ...
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
+
+"""A predicate of a path, e.g., [name='leaf1']. Group 1 is the leaf it compares, if any, and group 2 the operator."""
+PREDICATE = re.compile(r"\[(?:([\w-]+)\s*(!=|<=|>=|=|<|>))?[^\]]*\]")
+
+
+class Page(NamedTuple):
+    """A page of list elements, yielded by BigDbClient.iter_pages()."""
+
+    """The list elements of the page, in key order."""
+    elements: List[Any]
+    """Value of the key leaf of the last element; pass as start_after to resume after this page."""
+    last_key: Any
+
+
+def schema_path(path: str) -> str:
+    """Path of the schema node of a data path, i.e., the path without predicates."""
+    return PREDICATE.sub("", path)
+
+
+def list_key(schema: Dict[str, Any]) -> str:
+    """Returns the name of the key leaf of a list from its schema node.
+
+    :raises ValueError if the schema node is not a keyed list, or the list has a composite key
+        (which cannot be resumed with a single range predicate).
+    """
+    if schema.get("nodeType") != "LIST":
+        raise ValueError("Not a list: %s" % schema.get("nodeType"))
+    keys = schema.get("keyNodeNames") or []
+    if len(keys) != 1:
+        raise ValueError("List has no single key leaf (%s); specify the key explicitly" % ", ".join(keys))
+    return keys[0]
+
+
+def paginate(elements: Iterable[Any], page_size: int, key: str) -> Iterator[Page]:
+    """Groups elements into pages of page_size elements; the last page may be smaller."""
+    page: List[Any] = []
+    for element in elements:
+        page.append(element)
+        if len(page) == page_size:
+            yield Page(page, page[-1].get(key))
+            page = []
+    if page:
+        yield Page(page, page[-1].get(key))
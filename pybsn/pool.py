@@ -0,0 +1,181 @@
+"""Connection pool tuning and statistics for the requests session used by BigDbClient.
+
+pybsn.connect() mounts a PooledHTTPAdapter on the session it creates. The adapter applies PoolOptions
+(pool sizes, blocking behavior, TCP socket options) and counts what happens to the pooled connections,
+so that pools can be sized from data (see BigDbClient.pool_stats()).
+"""
+
+import socket
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import requests.adapters
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class PoolOptions(NamedTuple):
+    """Connection pool and socket options for a BigDbClient session.
+
+    The defaults match those of requests.
+    """
+
+    """Number of per-host connection pools to keep."""
+    pool_connections: int = requests.adapters.DEFAULT_POOLSIZE
+    """Maximum number of connections kept open per host."""
+    pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE
+    """If True, requests wait for a free connection when pool_maxsize connections are in use.
+    Otherwise, an extra connection is opened and discarded after the request."""
+    pool_block: bool = requests.adapters.DEFAULT_POOLBLOCK
+    """Disable Nagle's algorithm, so small requests are sent without delay."""
+    tcp_nodelay: bool = True
+    """Enable TCP keepalive probes on idle pooled connections, so that connections silently dropped by
+    firewalls or the controller are detected."""
+    tcp_keepalive: bool = False
+    """Seconds of idle time before the first keepalive probe (None: system default)."""
+    tcp_keepalive_idle: Optional[int] = None
+    """Seconds between keepalive probes (None: system default)."""
+    tcp_keepalive_interval: Optional[int] = None
+    """Number of unanswered probes after which the connection is dropped (None: system default)."""
+    tcp_keepalive_count: Optional[int] = None
+
+    def socket_options(self) -> List[Tuple[int, int, int]]:
+        """Returns the options as (level, option, value) tuples for socket.setsockopt().
+
+        Keepalive timing options that are not supported by the platform are skipped.
+        """
+        options = []
+        if self.tcp_nodelay:
+            options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        if self.tcp_keepalive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # macOS calls TCP_KEEPIDLE TCP_KEEPALIVE
+            idle_option = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+            for option, value in (
+                (idle_option, self.tcp_keepalive_idle),
+                (getattr(socket, "TCP_KEEPINTVL", None), self.tcp_keepalive_interval),
+                (getattr(socket, "TCP_KEEPCNT", None), self.tcp_keepalive_count),
+            ):
+                if option is not None and value is not None:
+                    options.append((socket.IPPROTO_TCP, option, value))
+        return options
+
+
+class PoolStats(object):
+    """Thread-safe counters of connection pool activity."""
+
+    """TCP connections established."""
+    opened: int = 0
+    """Connections closed, e.g., after being dropped by the server or discarded."""
+    closed: int = 0
+    """HTTP requests sent."""
+    requests: int = 0
+    """HTTP requests sent on an already established connection."""
+    reused: int = 0
+    """Connections closed after use because the pool was full (pool_maxsize too small)."""
+    discarded: int = 0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def _add(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def open(self) -> int:
+        """Number of connections currently open."""
+        return self.opened - self.closed
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the current counter values as a dict."""
+        with self._lock:
+            return {
+                "open": self.opened - self.closed,
+                "opened": self.opened,
+                "closed": self.closed,
+                "requests": self.requests,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+    def __repr__(self) -> str:
+        return "PoolStats(%s)" % ", ".join("%s=%d" % item for item in self.snapshot().items())
+
+
+class _CountingConnectionMixin(object):
+    stats: PoolStats
+    sock: Any
+
+    def connect(self) -> None:
+        super().connect()  # type: ignore[misc]
+        self.stats._add("opened")
+
+    def close(self) -> None:
+        was_open = getattr(self, "sock", None) is not None
+        super().close()  # type: ignore[misc]
+        if was_open:
+            self.stats._add("closed")
+
+
+class _CountingPoolMixin(object):
+    stats: PoolStats
+    pool: Any
+
+    def _make_request(self, conn: Any, *args: Any, **kwargs: Any) -> Any:
+        self.stats._add("requests")
+        if getattr(conn, "sock", None) is not None:
+            self.stats._add("reused")
+        return super()._make_request(conn, *args, **kwargs)  # type: ignore[misc]
+
+    def _put_conn(self, conn: Any) -> None:
+        pool = self.pool
+        if conn is not None and pool is not None and pool.full():
+            self.stats._add("discarded")
+        super()._put_conn(conn)  # type: ignore[misc]
+
+
+def _counting_pool_class(base: Any, stats: PoolStats) -> Any:
+    """Subclass of a urllib3 connection pool class (and its connection class) that reports to stats."""
+    connection_class = type(base.ConnectionCls.__name__, (_CountingConnectionMixin, base.ConnectionCls), {"stats": stats})
+    return type(base.__name__, (_CountingPoolMixin, base), {"stats": stats, "ConnectionCls": connection_class})
+
+
+class PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+    """requests transport adapter that applies PoolOptions and records PoolStats.
+
+    E.g., to use it with a custom session:
+
+        session.mount("https://", PooledHTTPAdapter(PoolOptions(pool_maxsize=32)))
+    """
+
+    options: PoolOptions
+    stats: PoolStats
+
+    def __init__(self, options: Optional[PoolOptions] = None) -> None:
+        self.options = options or PoolOptions()
+        self.stats = PoolStats()
+        super().__init__(
+            pool_connections=self.options.pool_connections,
+            pool_maxsize=self.options.pool_maxsize,
+            pool_block=self.options.pool_block,
+        )
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any) -> None:
+        pool_kwargs["socket_options"] = self.options.socket_options()
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+
+    def proxy_manager_for(self, proxy: str, **proxy_kwargs: Any) -> Any:
+        proxy_kwargs.setdefault("socket_options", self.options.socket_options())
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+
+def mount_pool(session: requests.Session, options: Optional[PoolOptions] = None) -> PooledHTTPAdapter:
+    """Mounts a PooledHTTPAdapter for http and https on the session. Both share one set of PoolStats."""
+    adapter = PooledHTTPAdapter(options)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
@@ -0,0 +1,63 @@
+"""Server-side projection of GET results.
+
+Node.select("name", "dpid") restricts the result of a GET to the given fields: each field becomes a
+select query parameter, so BigDB only serializes and sends the selected leaves. Node.exclude() selects
+all fields of the node's schema but the given ones. Field names are given as in match(), with
+underscores for hyphens.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SELECT_PARAM = "select"
+
+
+def field_name(name: str) -> str:
+    """Converts a python-style field name (mac_address) to the BigDB name (mac-address)."""
+    return name.replace("_", "-")
+
+
+def select_params(params: Optional[Dict[str, Any]], fields: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Returns params with a select parameter for each of fields added. Fields selected by a select
+    parameter of params stay selected; the selections are combined.
+    """
+    if not fields:
+        return params
+    merged: Dict[str, Any] = dict(params) if params else {}
+    selected = selected_fields(params) or ()
+    merged[SELECT_PARAM] = list(selected) + [name for name in fields if name not in selected]
+    return merged
+
+
+def selected_fields(params: Optional[Dict[str, Any]]) -> Optional[Tuple[str, ...]]:
+    """Returns the fields selected by the select parameter of params (a field name or a list of them),
+    or None if there is none.
+    """
+    selected = params.get(SELECT_PARAM) if params else None
+    if selected is None:
+        return None
+    if isinstance(selected, str):
+        return (selected,)
+    return tuple(selected)
+
+
+def child_names(schema: Dict[str, Any]) -> List[str]:
+    """Returns the names of the child nodes of a container or of the elements of a list.
+
+    :raises ValueError if the schema node has no children (e.g., a leaf).
+    """
+    if schema.get("nodeType") == "LIST":
+        schema = schema.get("listElementSchemaNode", {})
+    if schema.get("nodeType") not in ("CONTAINER", "LIST_ELEMENT"):
+        raise ValueError("Cannot select fields of a %s" % schema.get("nodeType"))
+    return list(schema.get("childNodes", {}))
+
+
+def excluding(available: Sequence[str], fields: Sequence[str]) -> Tuple[str, ...]:
+    """Returns the fields of available that are not in fields.
+
+    :raises ValueError if one of fields is not available.
+    """
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise ValueError("Unknown fields: %s" % ", ".join(sorted(unknown)))
+    return tuple(name for name in available if name not in fields)
@@ -0,0 +1,203 @@
+"""Compact records for the elements of BigDB lists.
+
+A list element decoded from JSON is a dict, which stores a hash table with the (hyphenated) field names
+in every element. Large results held in memory (e.g., all endpoints of a fabric) are dominated by this
+overhead. BigDbClient.get_records() / Node.get_records() instead decode each list element into an
+instance of a slotted class generated from the schema of the list, which stores only the values:
+
+for endpoint in root.applications.bcf.info.endpoint_manager.endpoint.get_records():
+    endpoint.mac, endpoint["ip-address"], endpoint.get("vlan")
+
+Records support attribute access (with underscores for hyphens, as in Node.match()) and read-only dict
+access by BigDB or attribute name: [], get(), keys(), values(), items(), in, len() and iteration over the
+names of the fields that are present. Fields absent from an element are absent from its record, as in the
+dict. Containers and lists within an element become records too; to_dict() converts a record back.
+
+Fields that are not in the schema (e.g., from a newer controller) are kept in a dict of their own.
+"""
+
+import keyword
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+_NON_IDENTIFIER = re.compile(r"\W")
+
+_MISSING = object()
+
+
+class Record(object):
+    """Base class of the generated record classes; see the module documentation."""
+
+    __slots__ = ("_extra",)
+
+    """Attribute names of the fields, in schema order."""
+    _fields: Tuple[str, ...] = ()
+    """BigDB names of the fields, in schema order."""
+    _names: Tuple[str, ...] = ()
+    """Attribute name by BigDB name."""
+    _by_name: Dict[str, str] = {}
+    """Attribute name by BigDB name and by attribute name."""
+    _attributes: Dict[str, str] = {}
+    """Converters for the values of container and list fields, by BigDB name."""
+    _converters: Dict[str, Callable[[Any], Any]] = {}
+
+    _extra: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """Creates a record from a decoded list element (or container)."""
+        record = cls.__new__(cls)
+        by_name = cls._by_name
+        converters = cls._converters
+        extra = None
+        for name, value in data.items():
+            attribute = by_name.get(name)
+            if attribute is None:
+                if extra is None:
+                    extra = {}
+                extra[name] = value
+                continue
+            convert = converters.get(name)
+            if convert is not None:
+                value = convert(value)
+            object.__setattr__(record, attribute, value)
+        object.__setattr__(record, "_extra", extra)
+        return record
+
+    def __getitem__(self, name: str) -> Any:
+        attribute = self._attributes.get(name)
+        if attribute is not None:
+            value = getattr(self, attribute, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and name in self._extra:
+            return self._extra[name]
+        raise KeyError(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.get(name, _MISSING) is not _MISSING
+
+    def keys(self) -> List[str]:
+        """Returns the BigDB names of the fields that are present."""
+        names = [name for name, attribute in zip(self._names, self._fields) if hasattr(self, attribute)]
+        if self._extra:
+            names.extend(self._extra)
+        return names
+
+    def values(self) -> List[Any]:
+        return [self[name] for name in self.keys()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, self[name]) for name in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the element as a dict, as it would have been decoded without records."""
+        return {name: _plain(value) for name, value in self.items()}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.items() == other.items()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Records are read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Records are read-only")
+
+    def __repr__(self) -> str:
+        fields = ["%s=%r" % (attribute, getattr(self, attribute)) for attribute in self._fields if hasattr(self, attribute)]
+        if self._extra:
+            fields.append("_extra=%r" % self._extra)
+        return "%s(%s)" % (type(self).__name__, ", ".join(fields))
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+_RESERVED = frozenset(dir(Record))
+
+
+def attribute_name(name: str) -> str:
+    """Returns the attribute name of a field of a record: its BigDB name with underscores for hyphens,
+    and with a trailing underscore if it is a keyword or a method of Record.
+    """
+    attribute = _NON_IDENTIFIER.sub("_", name)
+    if attribute[:1].isdigit():
+        attribute = "_" + attribute
+    if keyword.iskeyword(attribute) or attribute in _RESERVED:
+        attribute += "_"
+    return attribute
+
+
+def _class_name(name: str) -> str:
+    return "".join(part.capitalize() for part in _NON_IDENTIFIER.split(name) if part) or "Record"
+
+
+def _converter(schema: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+    node_type = schema.get("nodeType")
+    if node_type == "CONTAINER":
+        from_dict = record_class(schema).from_dict
+        return lambda value: from_dict(value) if isinstance(value, dict) else value
+    if node_type == "LIST":
+        from_dict = record_class(schema).from_dict
+        return lambda value: [from_dict(v) if isinstance(v, dict) else v for v in value] if isinstance(value, list) else value
+    return None
+
+
+def record_class(schema: Dict[str, Any], name: Optional[str] = None) -> Type[Record]:
+    """Generates a record class for the elements of a list (or for a container) from its schema node.
+
+    :param schema: the schema node of the list or container, as returned by BigDbClient.schema()
+    :param name: the class name; by default, derived from the name of the node (e.g., InterfaceGroup).
+    :raises ValueError if the schema node is not a list or container.
+    """
+    node = schema.get("listElementSchemaNode", {}) if schema.get("nodeType") == "LIST" else schema
+    if node.get("nodeType") not in ("CONTAINER", "LIST_ELEMENT"):
+        raise ValueError("Cannot generate a record class for a %s" % schema.get("nodeType"))
+    children = node.get("childNodes", {})
+    names = tuple(children)
+    fields: Tuple[str, ...] = ()
+    for child in names:
+        attribute = attribute_name(child)
+        while attribute in fields:
+            attribute += "_"  # e.g., both mac-address and mac_address
+        fields += (attribute,)
+    converters = {}
+    for child, child_schema in children.items():
+        convert = _converter(child_schema)
+        if convert is not None:
+            converters[child] = convert
+    by_name = dict(zip(names, fields))
+    attributes = dict(zip(fields, fields))
+    attributes.update(by_name)
+    namespace = {
+        "__slots__": fields,
+        "_fields": fields,
+        "_names": names,
+        "_by_name": by_name,
+        "_attributes": attributes,
+        "_converters": converters,
+    }
+    return type(_class_name(name or schema.get("name") or ""), (Record,), namespace)
@@ -0,0 +1,231 @@
+"""Retries of failed requests and a circuit breaker per controller.
+
+With pybsn.connect(host, retry=RetryPolicy()), requests that fail transiently (connection errors,
+timeouts, 429/502/503/504) are retried with jittered exponential backoff, honoring the Retry-After
+header of the response. Only idempotent methods (GET, PUT, DELETE) are retried after any transient
+failure; other writes and RPCs are retried only if the connection could not be established (the
+request was certainly not sent) or the controller rejected it with 429.
+
+With pybsn.connect(host, breaker=BreakerOptions()), a circuit breaker stops sending requests to a
+controller after failure_threshold consecutive failures: requests fail immediately with
+CircuitOpenError instead of each waiting for a timeout. After reset_timeout seconds, one trial
+request is let through; if it succeeds, the breaker closes again.
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Optional
+
+import requests
+import urllib3.exceptions
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit breaker of the controller is open."""
+
+
+def connect_failed(e: BaseException) -> bool:
+    """True if the connection could not be established, i.e., the request was certainly not sent."""
+    if isinstance(e, (requests.exceptions.ConnectTimeout, CircuitOpenError)):
+        return True
+    if not isinstance(e, requests.exceptions.ConnectionError):
+        return False
+    reason = e.args[0] if e.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Returns the seconds to wait requested by the Retry-After header of response (delay or date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def _status(e: BaseException) -> Optional[int]:
+    response = getattr(e, "response", None) if isinstance(e, requests.exceptions.HTTPError) else None
+    return response.status_code if response is not None else None
+
+
+class RetryPolicy(NamedTuple):
+    """When and how often a BigDbClient retries failed requests."""
+
+    """Attempts in total, including the first one."""
+    max_attempts: int = 3
+    """Backoff before the first retry, in seconds; it grows by multiplier with every retry."""
+    backoff: float = 0.2
+    multiplier: float = 2.0
+    """Upper bound of the backoff, in seconds."""
+    max_backoff: float = 10.0
+    """Wait a random time between 0 and the backoff ("full jitter"), so that clients that failed at the
+    same time do not retry at the same time."""
+    jitter: bool = True
+    """Response statuses that are retried."""
+    statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    """Idempotent methods; these are retried after any transient failure."""
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    """Longest Retry-After (seconds) that is honored; if a response asks for a longer wait, its error is
+    raised instead."""
+    max_retry_after: float = 60.0
+
+    def delay(self, attempt: int, method: str, rpc: bool, error: BaseException) -> Optional[float]:
+        """Returns the seconds to wait before retrying a request whose attempt-th attempt failed with
+        error, or None if it is not to be retried.
+
+        A CircuitOpenError is not retried: the breaker stays open for longer than any backoff, so a
+        retry would only fail the same way.
+        """
+        if attempt >= self.max_attempts or isinstance(error, CircuitOpenError):
+            return None
+        idempotent = not rpc and method in self.methods
+        status = _status(error)
+        if status is not None:
+            if status not in self.statuses or not (idempotent or status == 429):
+                return None
+            wait = retry_after(error.response)  # type: ignore[attr-defined]
+            if wait is not None:
+                return wait if wait <= self.max_retry_after else None
+        elif isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            if not idempotent and not connect_failed(error):
+                return None
+        else:
+            return None
+        backoff = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class RetryStats(object):
+    """Thread-safe counters of retries."""
+
+    """Requests that were retried at least once."""
+    retried: int = 0
+    """Retries sent."""
+    retries: int = 0
+    """Requests that failed after having been retried."""
+    exhausted: int = 0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, retries: int, failed: bool) -> None:
+        if not retries:
+            return
+        with self._lock:
+            self.retried += 1
+            self.retries += retries
+            if failed:
+                self.exhausted += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the current counter values as a dict."""
+        with self._lock:
+            return {"retried": self.retried, "retries": self.retries, "exhausted": self.exhausted}
+
+
+class BreakerOptions(NamedTuple):
+    """Circuit breaker options for a BigDbClient."""
+
+    """Consecutive failures (connection errors, timeouts, 502/503/504) that open the breaker."""
+    failure_threshold: int = 5
+    """Seconds the breaker stays open before a trial request is let through."""
+    reset_timeout: float = 30.0
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def is_outage(e: BaseException) -> bool:
+    """True if e indicates that the controller is down or overloaded, rather than a failed request."""
+    if isinstance(e, CircuitOpenError):
+        return False
+    if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return _status(e) in (502, 503, 504)
+
+
+class CircuitBreaker(object):
+    """Circuit breaker of the requests to one controller; thread-safe.
+
+    closed: requests are sent; failure_threshold consecutive failures open the breaker.
+    open: requests fail with CircuitOpenError, until reset_timeout has passed.
+    half-open: a single trial request is sent; its success closes the breaker, its failure opens it again.
+    """
+
+    def __init__(self, options: BreakerOptions = BreakerOptions(), clock: Callable[[], float] = time.monotonic) -> None:
+        self.options = options
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.options.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self, url: str = "") -> None:
+        """Called before sending a request.
+
+        :raises CircuitOpenError if the breaker is open (or a trial request is already in flight)
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self._clock() - self._opened_at >= self.options.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial = False
+            if self._state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+            self._rejected += 1
+            retry_in = max(0.0, self.options.reset_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(
+            "Circuit breaker for %s is open after %d failures; retrying in %.1fs" % (url, self._failures, retry_in)
+        )
+
+    def record(self, error: Optional[BaseException]) -> None:
+        """Records the outcome of a request that was allowed: error is None for success."""
+        with self._lock:
+            if error is not None and is_outage(error):
+                self._failures += 1
+                if self._state == HALF_OPEN or self._failures >= self.options.failure_threshold:
+                    if self._state != OPEN:
+                        self._opened += 1
+                    self._state = OPEN
+                    self._opened_at = self._clock()
+            else:
+                self._failures = 0
+                self._state = CLOSED
+            self._trial = False
+
+    def release(self) -> None:
+        """Called instead of record() for a request that was allowed but ended without an outcome (e.g., it
+        was interrupted); lets the next trial request through, without changing the state."""
+        with self._lock:
+            self._trial = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the state, the current consecutive failures, how often the breaker opened and how
+        many requests it rejected."""
+        state = self.state
+        with self._lock:
+            return {"state": state, "failures": self._failures, "opened": self._opened, "rejected": self._rejected}
@@ -0,0 +1,189 @@
+"""On-disk cache of the BigDB schema, to look up schema nodes without a request.
+
+The schema of a controller only changes when its software is upgraded, but it is large and slow to
+retrieve. With a SchemaCache, a client retrieves the complete schema (/api/v1/schema/controller) once,
+stores it on disk and serves BigDbClient.schema() for any path from it:
+
+client = pybsn.connect(host, "admin", password, schema_cache=SchemaCache())
+
+Cached schemas are keyed by controller URL and software version. The version is read once per client
+(from VERSION_PATH); after an upgrade, the version differs and the schema is retrieved again, and the
+schemas of older versions of the same controller are removed. If the version cannot be read, the
+cache is not used. Paths that are not found in the cached schema are looked up on the controller.
+
+Schemas are stored preparsed (pickled), which loads several times faster than decoding the JSON and
+takes less space. As with any pickle, only load cache files written by yourself: the files are created
+readable by their owner only, in a directory only the owner can write to.
+"""
+
+import copy
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from pybsn.schemaindex import SchemaIndex
+
+logger = logging.getLogger("pybsn")
+
+"""Data path (below /api/v1/data/) of the software version, which keys the cached schemas."""
+VERSION_PATH = "controller/core/version/appliance"
+
+"""Schema path of the complete schema that is cached."""
+ROOT_SCHEMA_PATH = "controller"
+
+
+def default_directory() -> str:
+    """Returns $PYBSN_SCHEMA_CACHE, or the schema directory in the user's cache directory."""
+    path = os.environ.get("PYBSN_SCHEMA_CACHE")
+    if path:
+        return path
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "pybsn", "schema")
+
+
+def version_key(content: bytes) -> str:
+    """Key of a software version, from the body of the response to VERSION_PATH."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def find_node(schema: Dict[str, Any], path: str) -> Optional[Dict[str, Any]]:
+    """Returns the node at a schema path (without predicates, e.g., controller/core/switch) of a
+    complete schema, or None if there is none.
+    """
+    names = [name for name in path.strip("/").split("/") if name]
+    if not names or names[0] != ROOT_SCHEMA_PATH:
+        return None
+    node = schema
+    for name in names[1:]:
+        if node.get("nodeType") == "LIST":
+            node = node.get("listElementSchemaNode", {})
+        child = node.get("childNodes", {}).get(name)
+        if child is None:
+            return None
+        node = child
+    return node
+
+
+class SchemaCache(object):
+    """A directory of schemas keyed by controller URL and software version; see the module documentation.
+
+    Loaded schemas are also kept in memory, so that clients in the same process share them.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """
+        :param directory: the cache directory; defaults to default_directory().
+        """
+        self.directory = directory or default_directory()
+        self._schemas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._indexes: Dict[Tuple[str, str], SchemaIndex] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+    def path(self, url: str, version: str) -> str:
+        """Returns the file the schema of the controller at url with the given version is stored in."""
+        return os.path.join(self.directory, "%s-%s.pickle" % (self._digest(url), self._digest(version)))
+
+    def load(self, url: str, version: str) -> Optional[Dict[str, Any]]:
+        """Returns the complete schema cached for url and version, if any."""
+        with self._lock:
+            schema = self._schemas.get((url, version))
+        if schema is not None:
+            return schema
+        path = self.path(url, version)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            logger.warning("Ignoring unreadable schema cache %s: %s", path, e)
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url or entry.get("version") != version:
+            return None
+        schema = entry["schema"]
+        with self._lock:
+            self._schemas[(url, version)] = schema
+        return schema
+
+    def store(self, url: str, version: str, schema: Dict[str, Any]) -> None:
+        """Stores the complete schema of url and version and removes those of other versions of url;
+        errors writing the file are logged and ignored.
+        """
+        with self._lock:
+            self._schemas = {key: value for key, value in self._schemas.items() if key[0] != url}
+            self._indexes = {key: value for key, value in self._indexes.items() if key[0] != url}
+            self._schemas[(url, version)] = schema
+        path = self.path(url, version)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.directory, prefix=".schema-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"url": url, "version": version, "schema": schema}, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp, path)
+            except BaseException:
+                os.unlink(temp)
+                raise
+            for stale in glob.glob(os.path.join(self.directory, self._digest(url) + "-*.pickle")):
+                if stale != path:
+                    try:
+                        os.unlink(stale)
+                    except FileNotFoundError:
+                        pass  # removed by another process
+        except OSError as e:
+            logger.warning("Could not write schema cache %s: %s", path, e)
+
+    def index(self, url: str, version: str) -> Optional[SchemaIndex]:
+        """Returns the SchemaIndex of the cached schema of url and version, if it is cached."""
+        with self._lock:
+            index = self._indexes.get((url, version))
+        if index is None:
+            schema = self.load(url, version)
+            if schema is None:
+                return None
+            index = SchemaIndex(schema, ROOT_SCHEMA_PATH)
+            with self._lock:
+                self._indexes[(url, version)] = index
+        return index
+
+    def lookup(self, url: str, version: str, path: str) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the node at a schema path from the cached schema of url and version, or None
+        if the schema is not cached or has no such node.
+        """
+        index = self.index(url, version)
+        entry = index.get(path) if index is not None and path.strip("/") else None
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        node = entry.node if entry is not None else None
+        # copied, as callers may modify the result as they can one retrieved from the controller
+        return copy.deepcopy(node) if node is not None else None
+
+    def clear(self) -> None:
+        """Removes all cached schemas."""
+        with self._lock:
+            self._schemas.clear()
+            self._indexes.clear()
+        for path in glob.glob(os.path.join(self.directory, "*.pickle")):
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.warning("Could not remove schema cache %s: %s", path, e)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the numbers of schema lookups served from the cache (hits) and sent to the controller (misses)."""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses}
@@ -0,0 +1,206 @@
+"""Flattened index of a BigDB schema document, for lookups without walking the nested nodes.
+
+A schema document (as returned by BigDbClient.schema()) is a tree of nodes nested in childNodes,
+listElementSchemaNode, leafSchemaNode and the inputSchemaNode/outputSchemaNode of RPCs. A SchemaIndex is
+built from it once and holds, for every schema path (a data path without predicates, e.g.
+controller/core/switch/name), the node type, key leaves, leaf type, config flag and description in flat
+arrays, in the order of a depth-first traversal:
+
+index = SchemaIndex(client.schema("controller/core"), "controller/core")
+index.keys("controller/core/switch")  # ("name",)
+for entry in index.subtree("controller/core/switch"): ...
+
+A list and its list element share one path, that of the list. The input and output of an RPC are
+indexed below its path as "in" and "out", as they are shown by pybsn-schema.
+
+Looking up a path, its key leaves or its children takes constant time, and listing the paths below a
+prefix takes time proportional to their number.
+"""
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pybsn.paging import schema_path
+
+"""Names of the input and output of RPCs in indexed paths."""
+RPC_INPUT = "in"
+RPC_OUTPUT = "out"
+
+
+class SchemaEntry(NamedTuple):
+    """The indexed attributes of a schema node."""
+
+    path: str
+    name: str
+    """nodeType of the node: CONTAINER, LIST, LEAF, LEAF_LIST or RPC."""
+    node_type: str
+    """Names of the key leaves of a LIST; empty for other nodes."""
+    keys: Tuple[str, ...]
+    """Type of a LEAF or of the elements of a LEAF_LIST (the leafType of its typeSchemaNode, if it has
+    one, e.g., ENUMERATION); None for other nodes."""
+    leaf_type: Optional[str]
+    """True if the node is configuration (it has the config data source)."""
+    config: bool
+    description: Optional[str]
+    """Depth below the root of the index (0 for the root)."""
+    depth: int
+    """The schema node itself, e.g., for the validators of a leaf type."""
+    node: Dict[str, Any]
+
+
+def _leaf_type(node: Dict[str, Any]) -> Optional[str]:
+    if node.get("nodeType") == "LEAF_LIST":
+        node = node.get("leafSchemaNode", {})
+    elif node.get("nodeType") != "LEAF":
+        return None
+    return node.get("typeSchemaNode", node).get("leafType")
+
+
+class SchemaIndex(object):
+    """A schema document indexed by path; see the module documentation."""
+
+    """Indexed paths, depth-first; the attributes of the path at position i are at position i of the
+    other lists."""
+    paths: List[str]
+    names: List[str]
+    node_types: List[str]
+    key_leaves: List[Tuple[str, ...]]
+    leaf_types: List[Optional[str]]
+    configs: List[bool]
+    descriptions: List[Optional[str]]
+    depths: List[int]
+    nodes: List[Dict[str, Any]]
+
+    def __init__(self, schema: Dict[str, Any], path: str = "controller") -> None:
+        """
+        :param schema: the schema document, as returned by BigDbClient.schema(path)
+        :param path: the schema path of the document
+        """
+        self.paths = []
+        self.names = []
+        self.node_types = []
+        self.key_leaves = []
+        self.leaf_types = []
+        self.configs = []
+        self.descriptions = []
+        self.depths = []
+        self.nodes = []
+        # position of each path, position after the last descendant of each path, positions of children
+        self._positions: Dict[str, int] = {}
+        self._ends: List[int] = []
+        self._children: List[List[int]] = []
+        path = schema_path(path).strip("/")
+        self._add(schema, path, path.rsplit("/", 1)[-1], 0)
+
+    def _add(self, node: Dict[str, Any], path: str, name: str, depth: int) -> int:
+        position = len(self.paths)
+        node_type = node.get("nodeType", "")
+        self._positions[path] = position
+        self.paths.append(path)
+        self.names.append(name)
+        self.node_types.append(node_type)
+        self.key_leaves.append(tuple(node.get("keyNodeNames") or ()) if node_type == "LIST" else ())
+        self.leaf_types.append(_leaf_type(node))
+        self.configs.append("config" in node.get("dataSources", ()))
+        self.descriptions.append(node.get("description"))
+        self.depths.append(depth)
+        self.nodes.append(node)
+        self._ends.append(position + 1)
+        children: List[int] = []
+        self._children.append(children)
+
+        if node_type == "LIST":
+            node = node.get("listElementSchemaNode", {})
+        if node_type == "RPC":
+            items = [(RPC_INPUT, node.get("inputSchemaNode")), (RPC_OUTPUT, node.get("outputSchemaNode"))]
+        else:
+            items = list(node.get("childNodes", {}).items())
+        for child_name, child in items:
+            if child is not None:
+                children.append(self._add(child, path + "/" + child_name, child_name, depth + 1))
+        self._ends[position] = len(self.paths)
+        return position
+
+    def _position(self, path: str) -> int:
+        position = self._positions.get(path)
+        if position is None:
+            # a data path, with predicates or slashes
+            position = self._positions[schema_path(path).strip("/")]
+        return position
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, path: str) -> bool:
+        return self.get(path) is not None
+
+    def __iter__(self) -> Iterator[SchemaEntry]:
+        return (self._entry(i) for i in range(len(self.paths)))
+
+    def _entry(self, i: int) -> SchemaEntry:
+        return SchemaEntry(
+            self.paths[i],
+            self.names[i],
+            self.node_types[i],
+            self.key_leaves[i],
+            self.leaf_types[i],
+            self.configs[i],
+            self.descriptions[i],
+            self.depths[i],
+            self.nodes[i],
+        )
+
+    @property
+    def root(self) -> SchemaEntry:
+        return self._entry(0)
+
+    def __getitem__(self, path: str) -> SchemaEntry:
+        """Returns the entry of a schema or data path.
+
+        :raises KeyError if the path is not in the index
+        """
+        return self._entry(self._position(path))
+
+    def get(self, path: str) -> Optional[SchemaEntry]:
+        """Returns the entry of a schema or data path, or None if the path is not in the index."""
+        try:
+            return self._entry(self._position(path))
+        except KeyError:
+            return None
+
+    def node(self, path: str) -> Dict[str, Any]:
+        """Returns the schema node at path.
+
+        :raises KeyError if the path is not in the index
+        """
+        return self.nodes[self._position(path)]
+
+    def node_type(self, path: str) -> str:
+        return self.node_types[self._position(path)]
+
+    def keys(self, path: str) -> Tuple[str, ...]:
+        """Returns the names of the key leaves of the list at path; empty if it is not a keyed list."""
+        return self.key_leaves[self._position(path)]
+
+    def children(self, path: str) -> List[str]:
+        """Returns the names of the child nodes of path (for an RPC, its input and output)."""
+        return [self.names[i] for i in self._children[self._position(path)]]
+
+    def subtree(self, path: Optional[str] = None, max_depth: Optional[int] = None) -> Iterator[SchemaEntry]:
+        """Yields the entries of path (by default, the root) and of its descendants, depth-first.
+
+        :param max_depth: if set, only descendants up to this many levels below path are yielded.
+        """
+        start = 0 if path is None else self._position(path)
+        limit = None if max_depth is None else self.depths[start] + max_depth
+        i, end = start, self._ends[start]
+        while i < end:
+            if limit is not None and self.depths[i] > limit:
+                i = self._ends[i]  # skip the subtree
+                continue
+            yield self._entry(i)
+            i += 1
+
+    def paths_under(self, prefix: str) -> List[str]:
+        """Returns the paths below prefix (excluding prefix itself), depth-first."""
+        start = self._position(prefix)
+        return self.paths[start + 1 : self._ends[start]]
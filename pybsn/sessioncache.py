@@ -0,0 +1,127 @@
+"""On-disk cache of BigDB sessions, to reuse them across process invocations.
+
+pybsn.connect() normally probes for the URL of the controller (see guess_url()) and logs in, which
+creates a new session on the controller each time. Short-lived scripts (e.g., run from cron) can
+instead reuse the session of an earlier run:
+
+client = pybsn.connect(host, "admin", password, session_cache=SessionCache())
+
+The cache stores the resolved URL and the session cookie per host and user, and the URL discovered
+for each host (see pybsn.discovery). On reuse, the cookie is checked with a single request; only if
+it is rejected (e.g., the session expired) does connect() probe and log in again. Clients with a
+cached session do not log out on close(), so that the session stays valid for the next run.
+
+The cache file holds credentials and is created readable by its owner only.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger("pybsn")
+
+
+def default_path() -> str:
+    """Returns $PYBSN_SESSION_CACHE, or sessions.json in the user's cache directory."""
+    path = os.environ.get("PYBSN_SESSION_CACHE")
+    if path:
+        return path
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "pybsn", "sessions.json")
+
+
+class CachedSession(NamedTuple):
+    """A session stored in a SessionCache."""
+
+    """The BigDB URL resolved for the host."""
+    url: str
+    """The session cookie, or None if only the URL is cached (e.g., for API tokens)."""
+    cookie: Optional[str]
+    """Time (seconds since the epoch) the session was stored."""
+    created: float
+
+
+class SessionCache(object):
+    """A file of sessions keyed by host and user; see the module documentation.
+
+    Updates rewrite the file atomically, so concurrent processes never read a partially written file
+    (if they store sessions at the same time, one of the updates may be lost, which only costs a login).
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        :param path: the cache file; defaults to default_path().
+        """
+        self.path = path or default_path()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(host: str, user: Optional[str]) -> str:
+        return "%s@%s" % (user or "", host)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable session cache %s: %s", self.path, e)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory, prefix=".sessions-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(temp, self.path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def load(self, host: str, user: Optional[str]) -> Optional[CachedSession]:
+        """Returns the cached session for host and user, if any."""
+        with self._lock:
+            entry = self._read().get(self._key(host, user))
+        if not isinstance(entry, dict) or not entry.get("url"):
+            return None
+        return CachedSession(entry["url"], entry.get("cookie"), entry.get("created", 0.0))
+
+    def store(self, host: str, user: Optional[str], url: str, cookie: Optional[str]) -> None:
+        """Stores the session for host and user; errors writing the file are logged and ignored."""
+        self._update(self._key(host, user), {"url": url, "cookie": cookie, "created": time.time()})
+
+    def forget(self, host: str, user: Optional[str]) -> None:
+        """Removes the session for host and user, e.g., after it was rejected."""
+        self._update(self._key(host, user), None)
+
+    def load_url(self, host: str) -> Optional[str]:
+        """Returns the URL discovered for host (see pybsn.discovery), if cached."""
+        with self._lock:
+            entry = self._read().get(host)
+        return entry.get("url") if isinstance(entry, dict) else None
+
+    def store_url(self, host: str, url: str) -> None:
+        self._update(host, {"url": url, "created": time.time()})
+
+    def forget_url(self, host: str) -> None:
+        self._update(host, None)
+
+    def _update(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            entries = self._read()
+            if entry is not None:
+                entries[key] = entry
+            elif entries.pop(key, None) is None:
+                return
+            try:
+                self._write(entries)
+            except OSError as e:
+                logger.warning("Could not write session cache %s: %s", self.path, e)
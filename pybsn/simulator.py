@@ -0,0 +1,854 @@
+"""In-memory BigDB simulator for offline testing and load testing.
+
+BigDbSimulator is a threaded HTTP server that behaves like a small BigDB controller, so that pybsn and
+scripts built on it can be exercised without a controller, e.g., on a laptop or in CI:
+
+- an in-memory data tree under /api/v1/data/controller, with GET, PUT (replace), POST (create),
+  PATCH (merge) and DELETE; list elements are addressed with key predicates
+  (switch[name="leaf1"]) and filtered with comparisons (switch[dpid>'00:00...'])
+- RPCs under /api/v1/rpc/controller: core/aaa/session/login and logout are built in, others can be
+  added with add_rpc()
+- the schema under /api/v1/schema/controller, either as given or synthesized from the declared lists
+  and the data
+- injected latency and errors, to see how clients behave against a slow or failing controller
+
+simulator = BigDbSimulator(lists={"core/switch-config": "name"}, latency=0.005).start()
+client = pybsn.connect(simulator.url, "admin", "adminadmin")
+client.root.core.switch_config.match(name="leaf1").put({"name": "leaf1", "dpid": "00:00:00:00:00:00:00:01"})
+...
+simulator.stop()
+
+It can also be run standalone: python -m pybsn.simulator --port 8080 --list core/switch-config=name
+
+Lists are keyed by the leaves declared in lists (or in the keyNodeNames of the given schema) and
+kept ordered by key. Lists that are not declared are keyless; their elements can still be filtered
+with predicates. The simulator aims to be good enough for clients, not to validate data against a
+schema.
+"""
+
+import argparse
+import ast
+import copy
+import gzip
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger("pybsn.simulator")
+
+DATA_PREFIX = "/api/v1/data/controller"
+RPC_PREFIX = "/api/v1/rpc/controller"
+SCHEMA_PREFIX = "/api/v1/schema/controller"
+HEALTHY_PATH = "/api/v1/auth/healthy"
+
+LOGIN_RPC = "core/aaa/session/login"
+LOGOUT_RPC = "core/aaa/session/logout"
+AUTH_CONTEXT = "core/aaa/auth-context"
+
+"""Maximum number of encoded GET responses kept for reuse by a BigDbSimulator."""
+MAX_CACHED_RESPONSES = 256
+
+_OPERATORS = ("!=", "<=", ">=", "=", "<", ">")
+
+Predicate = Tuple[str, str, Any]
+Segment = Tuple[str, List[Predicate]]
+RpcHandler = Callable[[Any], Any]
+
+
+class SimulatorError(Exception):
+    """A request error, returned to the client as a BigDB error response with the given status."""
+
+    def __init__(self, status: int, description: str) -> None:
+        super().__init__(description)
+        self.status = status
+        self.description = description
+
+
+def _value(text: str, quote: Optional[str]) -> Any:
+    """Converts the text of a predicate value to a str (if quoted) or number."""
+    if quote is not None:
+        if "\\" in text:
+            try:
+                return ast.literal_eval(quote + text + quote)
+            except (ValueError, SyntaxError):
+                pass
+        return text
+    for convert in (int, float):
+        try:
+            return convert(text)  # type: ignore[operator]
+        except ValueError:
+            pass
+    return text
+
+
+def parse_path(path: str) -> List[Segment]:
+    """Parses a (percent-encoded) data path relative to the controller into segments, each a name and
+    its predicates (field, operator, value).
+
+    Values are strings if quoted (as by pybsn.template.normalize()) and numbers otherwise; within
+    quotes, slashes and brackets are part of the value.
+
+    :raises SimulatorError (400) if the path is malformed
+    """
+    text = urllib.parse.unquote(path)
+    segments: List[Segment] = []
+    n = len(text)
+    i = 0
+
+    def error(message: str) -> SimulatorError:
+        return SimulatorError(400, "Invalid path %r: %s" % (path, message))
+
+    while i < n:
+        start = i
+        while i < n and text[i] not in "/[":
+            i += 1
+        name = text[start:i]
+        if not name:
+            raise error("empty segment")
+        predicates: List[Predicate] = []
+        while i < n and text[i] == "[":
+            i += 1
+            start = i
+            while i < n and text[i] not in "=!<>]":
+                i += 1
+            field = text[start:i].strip()
+            operator = next((op for op in _OPERATORS if text.startswith(op, i)), None)
+            if not field or operator is None:
+                raise error("unsupported predicate")
+            i += len(operator)
+            while i < n and text[i] == " ":
+                i += 1
+            quote = text[i] if i < n and text[i] in "'\"" else None
+            if quote is not None:
+                i += 1
+                start = i
+                while i < n and (text[i] != quote or text[i - 1] == "\\"):
+                    i += 1
+                if i == n:
+                    raise error("unterminated string")
+                value = text[start:i]
+                i += 1
+                while i < n and text[i] == " ":
+                    i += 1
+            else:
+                start = i
+                while i < n and text[i] != "]":
+                    i += 1
+                value = text[start:i].strip()
+            if i == n or text[i] != "]":
+                raise error("unterminated predicate")
+            i += 1
+            predicates.append((field, operator, _value(value, quote)))
+        segments.append((name, predicates))
+        if i < n:
+            if text[i] != "/":
+                raise error("unexpected %r" % text[i])
+            i += 1
+    return segments
+
+
+def _field(element: Any, field: str) -> Any:
+    for name in field.split("/"):
+        if not isinstance(element, dict):
+            return None
+        element = element.get(name)
+    return element
+
+
+def _compare(actual: Any, operator: str, expected: Any) -> bool:
+    if actual is None or isinstance(actual, (dict, list)):
+        return operator == "!="
+    if isinstance(actual, bool):
+        actual = "true" if actual else "false"
+    if isinstance(actual, (int, float)) and isinstance(expected, str):
+        try:
+            expected = float(expected)
+        except ValueError:
+            actual = str(actual)
+    elif isinstance(actual, str) and not isinstance(expected, str):
+        expected = str(expected)
+    try:
+        if operator == "=":
+            return bool(actual == expected)
+        if operator == "!=":
+            return bool(actual != expected)
+        if operator == "<":
+            return bool(actual < expected)
+        if operator == "<=":
+            return bool(actual <= expected)
+        if operator == ">":
+            return bool(actual > expected)
+        return bool(actual >= expected)
+    except TypeError:
+        return False
+
+
+def _matches(element: Any, predicates: Sequence[Predicate]) -> bool:
+    return all(_compare(_field(element, field), operator, value) for field, operator, value in predicates)
+
+
+def _sort_key(values: Tuple[Any, ...]) -> Tuple[Tuple[int, Any], ...]:
+    return tuple(
+        (0, v) if isinstance(v, (int, float)) and not isinstance(v, bool) else (1, "" if v is None else str(v)) for v in values
+    )
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]) -> None:
+    for name, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(name), dict):
+            _merge(target[name], value)
+        else:
+            target[name] = copy.deepcopy(value)
+
+
+def _project(value: Any, fields: Sequence[str]) -> Any:
+    if not isinstance(value, dict):
+        return value
+    result: Dict[str, Any] = {}
+    for field in fields:
+        names = field.split("/")
+        source: Any = value
+        for name in names:
+            source = source.get(name) if isinstance(source, dict) else None
+        if source is None:
+            continue
+        target = result
+        for name in names[:-1]:
+            target = target.setdefault(name, {})
+        target[names[-1]] = source
+    return result
+
+
+def _leaf_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "DECIMAL"
+    return "STRING"
+
+
+def _list_keys(schema: Dict[str, Any], prefix: str = "") -> Dict[str, Tuple[str, ...]]:
+    """Collects the key leaves of the lists in a schema tree, by schema path."""
+    keys: Dict[str, Tuple[str, ...]] = {}
+    if schema.get("nodeType") == "LIST":
+        keys[prefix] = tuple(schema.get("keyNodeNames") or ())
+        schema = schema.get("listElementSchemaNode", {})
+    for name, child in schema.get("childNodes", {}).items():
+        keys.update(_list_keys(child, prefix + "/" + name if prefix else name))
+    return keys
+
+
+class DataStore(object):
+    """The data tree of a BigDbSimulator; all methods are thread-safe.
+
+    Paths are relative to /api/v1/data/controller and parsed with parse_path().
+    """
+
+    def __init__(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        lists: Optional[Mapping[str, Union[str, Sequence[str]]]] = None,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param data: initial content of the controller container; it is copied.
+        :param lists: key leaves of the keyed lists by schema path (e.g., {"core/switch": "name"}); a
+            sequence of names declares a composite key.
+        :param schema: the controller schema node (as served by /api/v1/schema/controller). Lists are
+            keyed as declared in it, and schema requests are served from it.
+        """
+        self._lock = threading.RLock()
+        self._schema = schema
+        self._keys: Dict[str, Tuple[str, ...]] = _list_keys(schema) if schema else {}
+        for path, key in (lists or {}).items():
+            self._keys[path.strip("/")] = (key,) if isinstance(key, str) else tuple(key)
+        self._root: Dict[str, Any] = {}
+        """Incremented by every write; data read at the same generation is unchanged."""
+        self.generation = 0
+        if data:
+            self.write("PUT", [], copy.deepcopy(data))
+
+    def _key(self, schema_path: str, element: Any) -> Tuple[Any, ...]:
+        return tuple(_field(element, name) for name in self._keys[schema_path])
+
+    def _is_list(self, schema_path: str, value: Any, predicates: Sequence[Predicate]) -> bool:
+        return schema_path in self._keys or isinstance(value, list) or (value is None and bool(predicates))
+
+    def _sort(self, schema_path: str, elements: List[Any]) -> None:
+        if self._keys.get(schema_path):
+            elements.sort(key=lambda e: _sort_key(self._key(schema_path, e)))
+
+    def _exact_key(self, schema_path: str, predicates: Sequence[Predicate]) -> Optional[Dict[str, Any]]:
+        """Returns the key leaves set by predicates, if they identify a single element of a keyed list.
+        For lists without declared keys, the leaves of all = predicates are taken as the key.
+        """
+        keys = self._keys.get(schema_path)
+        values = {field: value for field, operator, value in predicates if operator == "="}
+        if not keys:
+            return values or None
+        if any(key not in values for key in keys):
+            return None
+        return {key: values[key] for key in keys}
+
+    def _element(self, schema_path: str, value: Any, key: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not isinstance(value, dict):
+            raise SimulatorError(400, "List element of %s must be an object" % schema_path)
+        element = copy.deepcopy(value)
+        for name, key_value in (key or {}).items():
+            if name in element and not _compare(element[name], "=", key_value):
+                raise SimulatorError(400, "Key %s=%r does not match the path" % (name, element[name]))
+            element.setdefault(name, key_value)
+        return element
+
+    def _insert(self, schema_path: str, elements: List[Any], element: Dict[str, Any]) -> None:
+        keys = self._keys.get(schema_path)
+        if keys:
+            key = self._key(schema_path, element)
+            if any(v is None for v in key):
+                raise SimulatorError(400, "List element of %s lacks key leaves %s" % (schema_path, ", ".join(keys)))
+            for existing in elements:
+                if self._key(schema_path, existing) == key:
+                    raise SimulatorError(409, "List element %r of %s already exists" % (key, schema_path))
+        elements.append(element)
+        self._sort(schema_path, elements)
+
+    def _children(self, parents: List[Dict[str, Any]], schema_path: str, segment: Segment, create: bool) -> List[Any]:
+        """Returns the nodes addressed by segment below each of parents (list elements are expanded)."""
+        name, predicates = segment
+        result: List[Any] = []
+        for parent in parents:
+            value = parent.get(name)
+            if self._is_list(schema_path, value, predicates):
+                if value is None:
+                    if not create:
+                        continue
+                    value = parent[name] = []
+                matched = [e for e in value if _matches(e, predicates)]
+                key = self._exact_key(schema_path, predicates)
+                if not matched and create and key is not None:
+                    element = self._element(schema_path, {}, key)
+                    self._insert(schema_path, value, element)
+                    matched = [element]
+                result.extend(matched)
+            else:
+                if predicates:
+                    raise SimulatorError(400, "Predicates are only supported on lists: %s" % schema_path)
+                if value is None and create:
+                    value = parent[name] = {}
+                if value is not None:
+                    result.append(value)
+        return result
+
+    def _parents(self, segments: List[Segment], create: bool) -> Tuple[List[Dict[str, Any]], str]:
+        """Returns the containers and list elements holding the last segment, and its schema path."""
+        parents: List[Any] = [self._root]
+        schema_path = ""
+        for segment in segments[:-1]:
+            schema_path = schema_path + "/" + segment[0] if schema_path else segment[0]
+            parents = [p for p in self._children(parents, schema_path, segment, create) if isinstance(p, dict)]
+        if segments:
+            schema_path = schema_path + "/" + segments[-1][0] if schema_path else segments[-1][0]
+        return parents, schema_path
+
+    def get(self, segments: List[Segment]) -> List[Any]:
+        """Returns the values at a path; as BigDB does, the result is a list even for a single node."""
+        with self._lock:
+            if not segments:
+                return [copy.deepcopy(self._root)]
+            parents, schema_path = self._parents(segments, create=False)
+            return copy.deepcopy(self._children(parents, schema_path, segments[-1], create=False))
+
+    def write(self, method: str, segments: List[Segment], data: Any) -> None:
+        """Applies a PUT (replace), POST (create), PATCH (merge) or DELETE to a path."""
+        with self._lock:
+            self.generation += 1
+            if not segments:
+                if method == "DELETE":
+                    self._root = {}
+                elif not isinstance(data, dict):
+                    raise SimulatorError(400, "Data for the controller container must be an object")
+                else:
+                    if method == "PUT":
+                        self._root = {}
+                    for name, value in data.items():
+                        self.write("PATCH" if method == "POST" else method, [(name, [])], value)
+                return
+            parents, schema_path = self._parents(segments, create=method != "DELETE")
+            name, predicates = segments[-1]
+            for parent in parents:
+                if self._is_list(schema_path, parent.get(name), predicates):
+                    self._write_list(method, parent, schema_path, name, predicates, data)
+                elif predicates:
+                    raise SimulatorError(400, "Predicates are only supported on lists: %s" % schema_path)
+                elif method == "DELETE":
+                    parent.pop(name, None)
+                elif method in ("PATCH", "POST") and isinstance(data, dict) and isinstance(parent.get(name), dict):
+                    _merge(parent[name], data)
+                else:
+                    parent[name] = self._normalized(schema_path, copy.deepcopy(data))
+
+    def _normalized(self, schema_path: str, value: Any) -> Any:
+        """Sorts the keyed lists within value, which is to be stored at schema_path."""
+        if isinstance(value, list):
+            self._sort(schema_path, value)
+            items = value
+        else:
+            items = [value]
+        for item in items:
+            if isinstance(item, dict):
+                for name, child in item.items():
+                    self._normalized(schema_path + "/" + name if schema_path else name, child)
+        return value
+
+    def _write_list(
+        self,
+        method: str,
+        parent: Dict[str, Any],
+        schema_path: str,
+        name: str,
+        predicates: List[Predicate],
+        data: Any,
+    ) -> None:
+        elements = parent.setdefault(name, []) if method != "DELETE" else parent.get(name)
+        if elements is None:
+            return
+        key = self._exact_key(schema_path, predicates)
+        if method == "DELETE":
+            if predicates:
+                elements[:] = [e for e in elements if not _matches(e, predicates)]
+            else:
+                del parent[name]
+        elif predicates:
+            matched = [e for e in elements if _matches(e, predicates)]
+            if method == "PUT":
+                elements[:] = [e for e in elements if not _matches(e, predicates)]
+                self._insert(schema_path, elements, self._normalized(schema_path, self._element(schema_path, data, key)))
+            elif method == "POST" and matched:
+                raise SimulatorError(409, "List element of %s already exists" % schema_path)
+            elif matched:
+                for element in matched:
+                    _merge(element, self._element(schema_path, data, None))
+                self._normalized(schema_path, elements)
+            elif key is not None or method == "POST":
+                self._insert(schema_path, elements, self._normalized(schema_path, self._element(schema_path, data, key)))
+        else:
+            new = [self._element(schema_path, e, None) for e in (data if isinstance(data, list) else [data])]
+            if method == "PUT":
+                elements[:] = []
+            for element in new:
+                self._normalized(schema_path, element)
+                existing = None
+                if method == "PATCH" and self._keys.get(schema_path):
+                    key_values = self._key(schema_path, element)
+                    existing = next((e for e in elements if self._key(schema_path, e) == key_values), None)
+                if existing is not None:
+                    _merge(existing, element)
+                else:
+                    self._insert(schema_path, elements, element)
+
+    def schema(self, schema_path: str) -> Dict[str, Any]:
+        """Returns the schema node at schema_path (a path without predicates).
+
+        :raises SimulatorError (404) if there is no such node
+        """
+        names = [name for name in schema_path.strip("/").split("/") if name]
+        with self._lock:
+            if self._schema is not None:
+                node = self._schema
+                for name in names:
+                    if node.get("nodeType") == "LIST":
+                        node = node.get("listElementSchemaNode", {})
+                    node = node.get("childNodes", {}).get(name)
+                    if node is None:
+                        raise SimulatorError(404, "No schema node at %s" % schema_path)
+                return node
+            return self._synthesize("/".join(names))
+
+    def _synthesize(self, schema_path: str) -> Dict[str, Any]:
+        if not schema_path:
+            values: List[Any] = [self._root]
+        else:
+            segments: List[Segment] = [(name, []) for name in schema_path.split("/")]
+            parents, _ = self._parents(segments, create=False)
+            values = [p[segments[-1][0]] for p in parents if segments[-1][0] in p]
+        node = self._node(schema_path, values)
+        if node is None:
+            raise SimulatorError(404, "No schema node at %s" % schema_path)
+        return node
+
+    def _node(self, schema_path: str, values: List[Any], shallow: bool = False) -> Optional[Dict[str, Any]]:
+        name = schema_path.rsplit("/", 1)[-1] or "controller"
+        declared = [path for path in self._keys if path.startswith(schema_path + "/" if schema_path else "")]
+        if schema_path in self._keys or any(isinstance(v, list) and all(isinstance(e, dict) for e in v) for v in values):
+            elements = [e for v in values if isinstance(v, list) for e in v]
+            element: Dict[str, Any] = {"nodeType": "LIST_ELEMENT", "name": name}
+            if not shallow:
+                element["childNodes"] = self._child_nodes(schema_path, elements)
+            return {
+                "nodeType": "LIST",
+                "name": name,
+                "keyNodeNames": list(self._keys.get(schema_path, ())),
+                "listElementSchemaNode": element,
+            }
+        if any(isinstance(v, dict) for v in values) or declared:
+            node: Dict[str, Any] = {"nodeType": "CONTAINER", "name": name}
+            if not shallow:
+                node["childNodes"] = self._child_nodes(schema_path, [v for v in values if isinstance(v, dict)])
+            return node
+        if any(isinstance(v, list) for v in values):
+            items = [e for v in values if isinstance(v, list) for e in v]
+            leaf = {"nodeType": "LEAF", "leafType": _leaf_type(items[0] if items else "")}
+            return {"nodeType": "LEAF_LIST", "name": name, "leafSchemaNode": leaf}
+        if values:
+            return {"nodeType": "LEAF", "name": name, "leafType": _leaf_type(values[0])}
+        return None
+
+    def _child_nodes(self, schema_path: str, containers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        prefix = schema_path + "/" if schema_path else ""
+        names: Dict[str, List[Any]] = {}
+        for container in containers:
+            for name, value in container.items():
+                names.setdefault(name, []).append(value)
+        for path in self._keys:
+            if path.startswith(prefix):
+                names.setdefault(path[len(prefix) :].split("/", 1)[0], [])
+        children = {}
+        for name, values in names.items():
+            child = self._node(prefix + name, values, shallow=True)
+            if child is not None:
+                children[name] = child
+        return children
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of the controller container."""
+        with self._lock:
+            return copy.deepcopy(self._root)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY, delayed ACKs would add ~40ms per request
+    disable_nagle_algorithm = True
+    server: "BigDbSimulator"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _reply(self, status: int, body: Any = None) -> None:
+        self._reply_encoded(status, json.dumps(body).encode() if body is not None else b"")
+
+    def _reply_encoded(self, status: int, encoded: bytes) -> None:
+        self.send_response(status)
+        if encoded:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        if encoded:
+            self.wfile.write(encoded)
+
+    def _read_body(self) -> Any:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        if not body:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise SimulatorError(400, "Request body is not valid JSON")
+
+    def _session(self) -> Optional[str]:
+        cookie = self.headers.get("Cookie", "")
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "session_cookie":
+                return value
+        return None
+
+    def _handle(self) -> None:
+        server = self.server
+        path, _, query = self.path.partition("?")
+        params = urllib.parse.parse_qs(query, keep_blank_values=True)
+        try:
+            server.count_request(self.command)
+            delay = server.delay(self.command, path)
+            if delay > 0:
+                time.sleep(delay)
+            injected = server.injected_error(path)
+            body = self._read_body()
+            if injected is not None:
+                raise SimulatorError(injected, "Injected error")
+            if path == HEALTHY_PATH:
+                self._reply(200, {})
+                return
+            rpc = _relative(path, RPC_PREFIX)
+            if rpc is not None and self.command == "POST" and rpc == LOGIN_RPC:
+                self._reply(200, server.login(body))
+                return
+            server.authorize(self._session())
+            if rpc is not None and self.command == "POST":
+                result = server.rpc(rpc, body, self._session())
+                if result is None:
+                    self._reply(204)
+                else:
+                    self._reply(200, result)
+                return
+            schema = _relative(path, SCHEMA_PREFIX)
+            if schema is not None and self.command == "GET":
+                self._reply(200, server.store.schema(_strip_predicates(schema)))
+                return
+            data = _relative(path, DATA_PREFIX)
+            if data is None:
+                raise SimulatorError(404, "No such resource: %s" % path)
+            if self.command == "GET" and data == AUTH_CONTEXT:
+                self._reply(200, server.auth_context(self._session()))
+            elif self.command == "GET":
+                self._reply_encoded(200, server.encoded_get(self.path, lambda: self._get(data, params)))
+            else:
+                server.store.write(self.command, parse_path(data), body)
+                self._reply(204)
+        except SimulatorError as e:
+            self._reply(e.status, {"description": e.description, "error-code": e.status})
+        except Exception as e:
+            logger.exception("Simulator failed to handle %s %s", self.command, self.path)
+            self._reply(500, {"description": "Internal error: %s" % e, "error-code": 500})
+
+    def _get(self, data: str, params: Dict[str, List[str]]) -> Any:
+        result = self.server.store.get(parse_path(data))
+        fields = params.get("select")
+        if fields:
+            result = [_project(value, fields) for value in result]
+        if params.get("single", [""])[-1] == "true":
+            if not result:
+                raise SimulatorError(404, "No data at %s" % data)
+            return result[0]
+        return result
+
+    do_GET = _handle
+    do_PUT = _handle
+    do_POST = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+
+def _relative(path: str, prefix: str) -> Optional[str]:
+    """Returns path relative to prefix, without surrounding slashes, or None if it is not below prefix."""
+    if path == prefix or path.startswith(prefix + "/"):
+        return path[len(prefix) :].strip("/")
+    return None
+
+
+def _strip_predicates(path: str) -> str:
+    return "/".join(name for name, _ in parse_path(path)) if path else ""
+
+
+class BigDbSimulator(ThreadingHTTPServer):
+    """A local BigDB stand-in serving an in-memory data tree; see the module documentation.
+
+    Each connection is served by its own thread, with HTTP/1.1 keep-alive.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        data: Optional[Dict[str, Any]] = None,
+        lists: Optional[Mapping[str, Union[str, Sequence[str]]]] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        users: Optional[Mapping[str, str]] = None,
+        tokens: Iterable[str] = (),
+        latency: Union[float, Callable[[str, str], float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        :param address: host and port to listen on; port 0 picks a free port (see url).
+        :param data, lists, schema: initial data and list keys, see DataStore.
+        :param users: user names and passwords accepted by the login RPC. If given, all other requests
+            need a valid session cookie (from login or one of tokens); otherwise any login succeeds
+            and no authentication is required.
+        :param tokens: session cookies accepted in addition to those created by login, e.g., API tokens
+            to be passed as pybsn.connect(url, token=...).
+        :param latency: seconds to wait before handling each request, or a function of the method and
+            path returning the seconds to wait.
+        :param error_rate: fraction of requests (0 to 1) that fail with error_status.
+        :param seed: seed for the random choice of failing requests, for reproducible runs.
+        """
+        super().__init__(address, _Handler)
+        self.store = DataStore(data, lists, schema)
+        self.users = dict(users) if users is not None else None
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._sessions: Dict[str, str] = {token: "admin" for token in tokens}
+        self._rpcs: Dict[str, Callable[[Any], Any]] = {LOGOUT_RPC: lambda _: None}
+        self._injected: List[List[Any]] = []
+        self._stats: Dict[str, int] = {"injected_errors": 0}
+        self._responses: Dict[str, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://%s:%d" % (host, port)  # type: ignore[str-bytes-safe]
+
+    def start(self) -> "BigDbSimulator":
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="BigDbSimulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def add_rpc(self, path: str, handler: RpcHandler) -> None:
+        """Serves the RPC at path (relative to /api/v1/rpc/controller) with handler, which is called
+        with the decoded input (or None) and returns the output to send, or None for no content.
+        Handlers may raise SimulatorError to fail the RPC.
+        """
+        self._rpcs[path.strip("/")] = handler
+
+    def inject_error(self, path_prefix: str = "", status: int = 500, count: int = 1) -> None:
+        """Fails the next count requests whose path (e.g., /api/v1/data/controller/core/switch) starts
+        with path_prefix with status.
+        """
+        with self._lock:
+            self._injected.append([path_prefix, status, count])
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of requests handled, in total and by method, and of injected errors."""
+        with self._lock:
+            return dict(self._stats)
+
+    def count_request(self, method: str) -> None:
+        with self._lock:
+            self._stats["requests"] = self._stats.get("requests", 0) + 1
+            self._stats[method] = self._stats.get(method, 0) + 1
+
+    def delay(self, method: str, path: str) -> float:
+        latency = self.latency
+        return latency(method, path) if callable(latency) else latency
+
+    def injected_error(self, path: str) -> Optional[int]:
+        """Returns the status to fail a request for path with, if an error is to be injected."""
+        with self._lock:
+            status = None
+            for injected in self._injected:
+                if path.startswith(injected[0]):
+                    status = injected[1]
+                    injected[2] -= 1
+                    if injected[2] <= 0:
+                        self._injected.remove(injected)
+                    break
+            if status is None and self.error_rate and path != HEALTHY_PATH and self._random.random() < self.error_rate:
+                status = self.error_status
+            if status is not None:
+                self._stats["injected_errors"] += 1
+            return status
+
+    def encoded_get(self, path: str, get: Callable[[], Any]) -> bytes:
+        """Returns the encoded result of get() for a GET of path (including the query). The encoding of
+        an earlier GET of the same path is reused if the data has not been written since, so large lists
+        are not copied and encoded again for every request.
+        """
+        generation = self.store.generation
+        with self._lock:
+            cached = self._responses.get(path)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        encoded = json.dumps(get()).encode()
+        with self._lock:
+            if len(self._responses) >= MAX_CACHED_RESPONSES:
+                self._responses.clear()
+            self._responses[path] = (generation, encoded)
+        return encoded
+
+    def login(self, body: Any) -> Dict[str, Any]:
+        body = body if isinstance(body, dict) else {}
+        user = body.get("user")
+        if self.users is not None and (user not in self.users or self.users[user] != body.get("password")):
+            raise SimulatorError(401, "Invalid user/password combination")
+        cookie = secrets.token_urlsafe(24)
+        with self._lock:
+            self._sessions[cookie] = user or "admin"
+        return {"success": True, "session-cookie": cookie, "error-message": ""}
+
+    def authorize(self, session: Optional[str]) -> None:
+        if self.users is None:
+            return
+        with self._lock:
+            if session not in self._sessions:
+                raise SimulatorError(401, "Authorization failed: no valid session")
+
+    def auth_context(self, session: Optional[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            user = self._sessions.get(session or "", "admin")
+        return [{"auth-context-type": "session-token", "user-info": {"user-name": user, "group": ["admin"]}}]
+
+    def rpc(self, path: str, body: Any, session: Optional[str]) -> Any:
+        if path == LOGOUT_RPC and session is not None:
+            with self._lock:
+                self._sessions.pop(session, None)
+        handler = self._rpcs.get(path)
+        if handler is None:
+            raise SimulatorError(404, "No such RPC: %s" % path)
+        return handler(body)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve an in-memory BigDB simulator")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", "-p", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--data", "-d", help="JSON file with the initial content of the controller container")
+    parser.add_argument("--schema", "-s", help="JSON file with the controller schema (e.g., from pybsn-schema --raw)")
+    parser.add_argument("--list", "-l", action="append", default=[], metavar="PATH=KEY[,KEY]", help="Declare a keyed list")
+    parser.add_argument("--user", "-u", action="append", default=[], metavar="USER:PASSWORD", help="Require login")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of failed requests")
+    args = parser.parse_args(argv)
+
+    def load(filename: Optional[str]) -> Optional[Dict[str, Any]]:
+        if filename is None:
+            return None
+        with open(filename) as f:
+            return json.load(f)
+
+    lists = {}
+    for declaration in args.list:
+        path, _, keys = declaration.partition("=")
+        lists[path] = keys.split(",") if keys else []
+    simulator = BigDbSimulator(
+        (args.host, args.port),
+        data=load(args.data),
+        lists=lists,
+        schema=load(args.schema),
+        users=dict(user.split(":", 1) for user in args.user) if args.user else None,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    print("Serving BigDB simulator on %s" % simulator.url)
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Coalescing of identical concurrent requests ("singleflight").
+
+With pybsn.connect(host, coalesce=True), concurrent GETs of the same path and params through one client
+share a single HTTP request: the first caller sends it, and callers that arrive while it is in flight
+wait for it and receive the same response. This avoids request bursts against the controller when many
+threads resolve the same data at the same time (e.g., in BigDbClient.get_many() or multi-threaded
+exporters). Requests are only shared while in flight; nothing is cached (see pybsn.cache for that).
+A write or RPC through the client ends the sharing of the GETs in flight at that time, so that GETs
+issued after the write do not receive data read before it.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+
+class _Call(Generic[_T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[_T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(object):
+    """Runs at most one call per key at a time; concurrent callers of the same key share its outcome."""
+
+    """Calls that were executed."""
+    calls: int = 0
+    """Calls that were not executed, but waited for an identical call in flight."""
+    coalesced: int = 0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[Any]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], _T]) -> _T:
+        """Returns fn(), or the result of the call of fn for key that is already in flight.
+
+        If that call raises an exception, it is raised to every caller waiting for it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def forget(self) -> None:
+        """Lets later callers start new calls instead of waiting for the calls currently in flight."""
+        with self._lock:
+            self._calls.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the counters as a dict."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
@@ -0,0 +1,169 @@
+"""Incremental decoding of JSON list responses.
+
+BigDB returns lists as a single JSON array. iter_json_array() decodes such an array from a stream of
+byte chunks and yields the elements one at a time, so memory use is bounded by the size of the largest
+element rather than by the size of the whole response.
+
+The boundaries of the elements are found by scanning the raw bytes for brackets, braces and quotes
+(which never occur within multi-byte UTF-8 sequences). The scan resumes where it stopped when more
+chunks arrive, so each byte is scanned once, however large an element is. Each complete element is
+then decoded on its own by the JSON codec of the client.
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator
+
+_WHITESPACE = b" \t\n\r"
+
+"""Characters that open or close a container or a string, outside of strings."""
+_STRUCTURE = re.compile(rb'[][{}"]')
+"""Characters that end a string or escape the next character, within strings."""
+_STRING_END = re.compile(rb'["\\]')
+"""Characters that end a number, true, false or null."""
+_SCALAR_END = re.compile(rb'[][{}",\s]')
+
+_OPEN = frozenset(b"[{")
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+
+
+class _Buffer(object):
+    """Byte buffer filled from an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self.data = bytearray()
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Appends the next chunk to the buffer. Returns False at the end of the stream."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                self.data += chunk
+                return True
+        self.eof = True
+        return False
+
+    def compact(self) -> None:
+        """Drops consumed data so the buffer does not grow with the size of the response."""
+        if self.pos > len(self.data) // 2:
+            del self.data[: self.pos]
+            self.pos = 0
+
+    def skip_whitespace(self) -> bool:
+        """Advances pos to the next non-whitespace character. Returns False at the end of the stream."""
+        while True:
+            data, pos = self.data, self.pos
+            while pos < len(data) and data[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(data):
+                return True
+            if not self.fill():
+                return False
+
+    def peek(self) -> int:
+        return self.data[self.pos]
+
+
+def iter_json_array(chunks: Iterable[bytes], loads: Callable[[bytes], Any] = json.loads) -> Iterator[Any]:
+    """Decodes a JSON array from an iterable of UTF-8 encoded byte chunks and yields its elements.
+
+    If the document is not an array (e.g., a single object returned for params={'single': 'true'}),
+    the whole document is yielded as the only element.
+
+    :param loads: decodes a JSON document from bytes, e.g., JsonCodec.loads
+    :raises ValueError if the document is not valid JSON
+    """
+    buffer = _Buffer(chunks)
+    if not buffer.skip_whitespace():
+        raise ValueError("Empty JSON document")
+    if buffer.peek() != ord("["):
+        while buffer.fill():
+            pass
+        yield loads(bytes(buffer.data[buffer.pos :]))
+        return
+
+    buffer.pos += 1
+    expect_value = True
+    first = True
+    while True:
+        if not buffer.skip_whitespace():
+            raise ValueError("Unterminated JSON array")
+        c = buffer.peek()
+        if c == ord("]") and (first or not expect_value):
+            break
+        if not expect_value:
+            if c != ord(","):
+                raise ValueError("Expected ',' or ']' at offset %d" % buffer.pos)
+            buffer.pos += 1
+            expect_value = True
+            continue
+        buffer.compact()
+        end = _value_end(buffer)
+        value = loads(bytes(buffer.data[buffer.pos : end]))
+        buffer.pos = end
+        yield value
+        expect_value = False
+        first = False
+
+    buffer.pos += 1
+    if buffer.skip_whitespace():
+        raise ValueError("Extra data after JSON array at offset %d" % buffer.pos)
+
+
+def _value_end(buffer: _Buffer) -> int:
+    """Returns the end of the value starting at buffer.pos, reading more chunks until it is complete.
+
+    The value itself is not validated; that is left to the decoder.
+    :raises ValueError if the stream ends within the value
+    """
+    start = buffer.pos
+    first = buffer.data[start]
+    if first not in _OPEN and first != _QUOTE:
+        # A number (or true, false, null) is only complete if it is followed by another character;
+        # otherwise a number split across chunks (e.g., "12" + "34") would be decoded too early
+        scan = start
+        while True:
+            match = _SCALAR_END.search(buffer.data, scan)
+            if match is not None:
+                return match.start()
+            scan = len(buffer.data)
+            if not buffer.fill():
+                return scan
+
+    # a container or a string: scan up to its closing bracket, brace or quote
+    depth = 0
+    in_string = first == _QUOTE
+    scan = start + 1
+    if not in_string:
+        depth = 1
+    while True:
+        match = (_STRING_END if in_string else _STRUCTURE).search(buffer.data, scan)
+        if match is None:
+            scan = max(scan, len(buffer.data))
+            if not buffer.fill():
+                raise ValueError("Unterminated JSON value at offset %d" % start)
+            continue
+        c = buffer.data[match.start()]
+        scan = match.end()
+        if in_string:
+            if c == _BACKSLASH:
+                # the escaped character may be in the next chunk; it is skipped either way
+                scan += 1
+                continue
+            in_string = False
+            if depth == 0:
+                return scan
+        elif c == _QUOTE:
+            in_string = True
+        elif c in _OPEN:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return scan
@@ -0,0 +1,106 @@
+"""Precompiled path and predicate templates.
+
+Node.filter() takes a string.Template-style predicate ("member-vlan<$max") and substitutes normalized
+values into it. compile_template() parses such a template once into literal text and placeholders, so
+that binding values is a single join; templates are cached by text, so filter() only parses each
+distinct template once. Multi-segment paths with predicates can be compiled as well and applied to
+a node with Node.at():
+
+endpoint = compile_template("tenant[name=$t]/segment[name=$s]/endpoint")
+root.applications.bcf.info.endpoint_manager.at(endpoint, t="t1", s="s1")
+"""
+
+import functools
+import urllib.parse
+from string import Template
+from typing import Any, List, Mapping, Optional, Tuple
+
+
+def normalize(v: Any) -> str:
+    """Formats a value for use in a BigDB predicate: strings are quoted and percent-encoded, booleans
+    are 'true' or 'false', numbers are used as-is.
+    """
+    t = type(v)
+    if t is str:
+        return _normalize_str(v)
+    if t is bool:
+        # replace to use booleans to use strings in JSON-boolean style
+        return "'true'" if v else "'false'"
+    if t is int:
+        return str(v)
+    return _normalize_repr(v)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_str(v: str) -> str:
+    if "'" not in v and "\\" not in v and v.isprintable():
+        # repr() would return the string unchanged within single quotes
+        return "'" + urllib.parse.quote(v) + "'"
+    return _normalize_repr(v)
+
+
+def _normalize_repr(v: Any) -> str:
+    repr_ = repr(v)
+    if repr_.startswith("'") and repr_.endswith("'"):
+        return "'" + urllib.parse.quote(repr_[1:-1]) + "'"
+    else:
+        return urllib.parse.quote(repr_)
+
+
+class PathTemplate(object):
+    """A template parsed into literal text and placeholders; see compile_template()."""
+
+    __slots__ = ("template", "_literals", "_names")
+
+    def __init__(self, template: str) -> None:
+        """
+        :param template: text with placeholders in string.Template syntax ($name or ${name}; $$ for $).
+        :raises ValueError on an invalid placeholder
+        """
+        self.template = template
+        literals: List[str] = []
+        names: List[str] = []
+        text = ""
+        pos = 0
+        for match in Template.pattern.finditer(template):
+            text += template[pos : match.start()]
+            pos = match.end()
+            if match.group("escaped") is not None:
+                text += Template.delimiter
+            elif match.group("invalid") is not None:
+                raise ValueError("Invalid placeholder in template at offset %d: %r" % (match.start(), template))
+            else:
+                literals.append(text)
+                names.append(match.group("named") or match.group("braced"))
+                text = ""
+        literals.append(text + template[pos:])
+        self._literals: Tuple[str, ...] = tuple(literals)
+        self._names: Tuple[str, ...] = tuple(names)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Names of the placeholders, in order of appearance."""
+        return self._names
+
+    def substitute(self, values: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> str:
+        """Returns the template with each placeholder replaced by the normalized value of that name.
+
+        :raises KeyError if a value is missing
+        """
+        if values is not None:
+            kwargs = {**values, **kwargs}
+        literals = self._literals
+        parts = [literals[0]]
+        for i, name in enumerate(self._names):
+            parts.append(normalize(kwargs[name]))
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return "PathTemplate(%r)" % self.template
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_template(template: str) -> PathTemplate:
+    """Returns the PathTemplate for template; templates are cached, so each is only parsed once."""
+    return PathTemplate(template)
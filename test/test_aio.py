@@ -0,0 +1,175 @@
+import asyncio
+import json
+import socket
+import time
+import unittest
+from unittest.mock import patch
+
+from pybsn.discovery import cached_url, clear_url_cache, remember_url
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    import pybsn.aio
+except ImportError:  # aiohttp is an optional dependency
+    aiohttp = None
+
+HEALTHY = "/api/v1/auth/healthy"
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp not installed")
+class TestAsyncBigDbClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = "http://127.0.0.1:%d" % self.server.port
+        self.closed_port = _closed_port()
+        clear_url_cache()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        clear_url_cache()
+
+    async def _handle(self, request):
+        body = await request.text()
+        self.requests.append((request.method, request.raw_path, request.cookies.get("session_cookie"), body))
+        path = request.path
+        if path == "/api/v1/rpc/controller/core/aaa/session/login":
+            if json.loads(body) != {"user": "admin", "password": "somepassword"}:
+                return web.json_response({"description": "Invalid user/password combination.", "error-code": 401}, status=401)
+            return web.json_response({"success": True, "session-cookie": "UPhNWlmDN0re8cg9xsqe9QT1QvQTznji"})
+        elif path == "/api/v1/data/controller/core/aaa/auth-context":
+            if request.cookies.get("session_cookie") != "some_token":
+                return web.json_response({"description": "Authorization failed", "error-code": 401}, status=401)
+            return web.json_response([{"auth-context-type": "session-token"}])
+        elif path == "/api/v1/rpc/controller/core/aaa/session/logout":
+            return web.Response(status=204)
+        elif path == "/api/v1/rpc/controller/test-rpc":
+            return web.json_response({"id": 1234})
+        elif path == "/api/v1/rpc/controller/empty":
+            return web.Response(status=204)
+        elif path == "/api/v1/schema/controller/core":
+            return web.json_response({"nodeType": "CONTAINER"})
+        elif path == "/api/v1/data/controller/slow":
+            await asyncio.sleep(1)
+            return web.json_response([])
+        elif path == "/api/v1/data/controller/missing":
+            return web.json_response({"description": "No such path", "error-code": 404}, status=404)
+        elif request.method == "GET":
+            return web.json_response({"path": path, "query": dict(request.query)})
+        return web.Response(status=204)
+
+    async def test_connect_login(self):
+        client = await pybsn.aio.connect(self.url, "admin", "somepassword")
+        async with client:
+            await client.root.core.switch.get()
+        self.assertEqual(self.requests[1][2], "UPhNWlmDN0re8cg9xsqe9QT1QvQTznji")
+        self.assertEqual(self.requests[-1][:2], ("POST", "/api/v1/rpc/controller/core/aaa/session/logout"))
+        self.assertTrue(client.session.closed)
+
+    async def test_connect_wrong_pw(self):
+        with self.assertRaises(aiohttp.ClientResponseError) as context:
+            await pybsn.aio.connect(self.url, "admin", "foo")
+        self.assertEqual(context.exception.status, 401)
+
+    async def test_connect_token(self):
+        async with await pybsn.aio.connect(self.url, token="some_token") as client:
+            self.assertEqual(client.url, self.url)
+        self.assertEqual(self.requests[0][2], "some_token")
+
+    async def test_connect_token_wrong(self):
+        with self.assertRaises(aiohttp.ClientResponseError) as context:
+            await pybsn.aio.connect(self.url, token="wrong_token")
+        self.assertEqual(context.exception.status, 401)
+
+    async def test_get_match_params(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            node = client.root.core.switch_config.match(name="leaf 1")
+            self.assertIsInstance(node, pybsn.aio.AsyncNode)
+            result = await node.get(params={"state-type": "global-config"})
+        self.assertEqual(result["query"], {"state-type": "global-config"})
+        self.assertEqual(
+            self.requests[0][1], "/api/v1/data/controller/core/switch-config[name='leaf%201']?state-type=global-config"
+        )
+
+    async def test_select(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            await client.root.core.switch.select("name", "mac_address").match(name="leaf1").get()
+        self.assertEqual(
+            self.requests[0][1], "/api/v1/data/controller/core/switch[name='leaf1']?select=name&select=mac-address"
+        )
+
+    async def test_concurrent_get(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            results = await asyncio.gather(*(client.root.test[str(i)]() for i in range(20)))
+        self.assertEqual([r["path"] for r in results], ["/api/v1/data/controller/test/%d" % i for i in range(20)])
+
+    async def test_mutations(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            for method in ("post", "put", "patch"):
+                response = await getattr(client.root.test, method)({"foo": "bar"})
+                self.assertEqual(response.status, 204)
+            await client.root.test.delete()
+        self.assertEqual([r[0] for r in self.requests], ["POST", "PUT", "PATCH", "DELETE"])
+        self.assertEqual([json.loads(r[3]) for r in self.requests[:3]], [{"foo": "bar"}] * 3)
+        self.assertEqual(self.requests[3][3], "")
+
+    async def test_rpc(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            self.assertEqual(await client.root.test_rpc.rpc({"description": "desc"}), {"id": 1234})
+            self.assertIsNone(await client.root.empty.rpc())
+
+    async def test_schema(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            self.assertEqual(await client.root.core.schema(), {"nodeType": "CONTAINER"})
+
+    async def test_error_description(self):
+        async with await pybsn.aio.connect(self.url) as client:
+            with self.assertRaises(aiohttp.ClientResponseError) as context:
+                await client.root.missing.get()
+        self.assertEqual(context.exception.status, 404)
+        self.assertIn("No such path", context.exception.message)
+
+    async def test_timeout(self):
+        async with await pybsn.aio.connect(self.url, timeout=0.1) as client:
+            with self.assertRaises(asyncio.TimeoutError):
+                await client.root.slow.get()
+            self.assertEqual(await client.root.slow.get(timeout=None), [])
+
+    async def test_probe_urls(self):
+        closed = "http://127.0.0.1:%d" % self.closed_port
+        async with aiohttp.ClientSession() as session:
+            self.assertEqual(await pybsn.aio.probe_urls(session, [closed, self.url], HEALTHY, 2.0), self.url)
+            self.assertIsNone(await pybsn.aio.probe_urls(session, [closed], HEALTHY, 2.0))
+            # the probes run concurrently, each bounded by the timeout
+            start = time.monotonic()
+            slow = "/api/v1/data/controller/slow"
+            self.assertIsNone(await pybsn.aio.probe_urls(session, [self.url, self.url], slow, 0.2))
+            self.assertLess(time.monotonic() - start, 0.9)
+
+    async def test_guess_url_cached(self):
+        with patch.object(pybsn.aio, "BIGDB_PROTO_PORTS", [("http", self.closed_port), ("http", self.server.port)]):
+            async with aiohttp.ClientSession() as session:
+                self.assertEqual(await pybsn.aio.guess_url(session, "127.0.0.1"), self.url)
+                self.assertEqual(len(self.requests), 1)
+                self.assertEqual(await pybsn.aio.guess_url(session, "127.0.0.1"), self.url)
+                self.assertEqual(len(self.requests), 1)
+        self.assertEqual(cached_url("127.0.0.1"), self.url)
+
+    async def test_connect_rediscovers_stale_url(self):
+        remember_url("127.0.0.1", "http://127.0.0.1:%d" % self.closed_port)
+        with patch.object(pybsn.aio, "BIGDB_PROTO_PORTS", [("http", self.server.port)]):
+            async with await pybsn.aio.connect("127.0.0.1", token="some_token") as client:
+                self.assertEqual(client.url, self.url)
+        self.assertEqual(cached_url("127.0.0.1"), self.url)
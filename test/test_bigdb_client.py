@@ -190,6 +190,36 @@ class TestBigDBClient(unittest.TestCase):
         result = self.client.get(path="controller/test")
         self.assertEqual(result, {"state": "ok"})
 
+    @responses.activate
+    def test_iter_get(self):
+        switches = [{"name": "switch%d" % i, "dpid": "00:00:00:00:00:00:00:%02x" % i} for i in range(100)]
+        responses.add(
+            responses.GET,
+            "http://127.0.0.1:8080/api/v1/data/controller/core/switch?state-type=global-config",
+            json=switches,
+            status=200,
+        )
+        result = self.client.iter_get("controller/core/switch", {"state-type": "global-config"}, chunk_size=16)
+        self.assertEqual(list(result), switches)
+
+    @responses.activate
+    def test_iter_get_error(self):
+        responses.add(
+            responses.GET,
+            "http://127.0.0.1:8080/api/v1/data/controller/missing",
+            json={"description": "not found", "error-code": 404},
+            status=404,
+        )
+        with self.assertRaisesRegex(requests.exceptions.HTTPError, "not found"):
+            list(self.client.iter_get("controller/missing"))
+
+    @responses.activate
+    @patch("requests.Response.raise_for_status", side_effect=requests.exceptions.HTTPError("500 Server Error"))
+    def test_http_error_without_response(self, raise_for_status):
+        responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/test", status=500)
+        with self.assertRaisesRegex(requests.exceptions.HTTPError, "^500 Server Error$"):
+            self.client.get("controller/test")
+
     @responses.activate
     def test_get_with_param(self):
         responses.add(
@@ -283,3 +313,45 @@ class TestBigDBClient(unittest.TestCase):
                 responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/schema/", json={"state": "ok"}, status=200)
                 self.client.schema()
                 mock_debug.assert_called()
+
+    @responses.activate
+    def test_get_many(self):
+        for name in ("a", "b", "c"):
+            responses.add(
+                responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/" + name, json=[{"name": name}], status=200
+            )
+        responses.add(
+            responses.GET,
+            "http://127.0.0.1:8080/api/v1/data/controller/missing",
+            json={"description": "not found", "error-code": 404},
+            status=404,
+        )
+        results = list(
+            self.client.get_many(["controller/a", self.client.root.b, "controller/missing", "controller/c"], max_workers=2)
+        )
+        self.assertEqual([r.path for r in results], ["controller/a", "controller/b", "controller/missing", "controller/c"])
+        self.assertEqual([r.value for r in results], [[{"name": "a"}], [{"name": "b"}], None, [{"name": "c"}]])
+        self.assertIsInstance(results[2].error, requests.exceptions.HTTPError)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            results[2].result()
+        self.assertEqual(results[0].result(), [{"name": "a"}])
+
+    @responses.activate
+    def test_get_many_as_completed(self):
+        for name in ("a", "b", "c"):
+            responses.add(
+                responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/" + name, json=[{"name": name}], status=200
+            )
+        results = self.client.get_many(["controller/a", "controller/b", "controller/c"], as_completed=True)
+        self.assertEqual(sorted(r.path for r in results), ["controller/a", "controller/b", "controller/c"])
+
+    def test_get_many_empty(self):
+        self.assertEqual(list(self.client.get_many([])), [])
+
+    def test_get_many_timeout(self):
+        self.client.default_timeout = 3.0
+        with patch.object(pybsn.BigDbClient, "get") as mock_get:
+            list(self.client.get_many(["controller/a", "controller/b"], params={"single": "true"}))
+            list(self.client.get_many(["controller/a"], timeout=None))
+        mock_get.assert_any_call("controller/a", {"single": "true"}, timeout=pybsn.CLIENT_TIMEOUT)
+        mock_get.assert_called_with("controller/a", None, timeout=None)
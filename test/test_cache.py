@@ -0,0 +1,144 @@
+import unittest
+
+import requests
+import responses
+
+import pybsn
+from pybsn.cache import ResponseCache
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/"
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_ttl(self):
+        cache = ResponseCache({"controller/core/switch": 30, "controller/core": 5}, clock=self.clock)
+        self.assertEqual(cache.ttl("controller/core/switch"), 30)
+        self.assertEqual(cache.ttl("controller/core/switch[name='leaf1']/interface"), 30)
+        self.assertEqual(cache.ttl("controller/core/switch-config"), 5)
+        self.assertIsNone(cache.ttl("controller/applications"))
+        self.assertEqual(ResponseCache(default_ttl=1).ttl("controller/applications"), 1)
+
+    def test_expiry(self):
+        cache = ResponseCache({"controller/core": 5}, clock=self.clock)
+        cache.put("controller/core/switch", None, b"[]")
+        cache.put("controller/applications", None, b"[]")
+        self.assertEqual(cache.get("controller/core/switch"), b"[]")
+        self.assertIsNone(cache.get("controller/core/switch", {"single": "true"}))
+        self.assertIsNone(cache.get("controller/applications"))  # not cached, not a miss
+        self.clock.now += 5
+        self.assertIsNone(cache.get("controller/core/switch"))
+        self.assertEqual(cache.stats(), dict(hits=1, misses=2, evictions=0, invalidations=0, entries=0, bytes=0))
+
+    def test_lru(self):
+        cache = ResponseCache(default_ttl=60, maxsize=2, clock=self.clock)
+        cache.put("a", None, b"1")
+        cache.put("b", None, b"2")
+        cache.get("a")
+        cache.put("c", None, b"3")
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (b"1", None, b"3"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_max_bytes(self):
+        cache = ResponseCache(default_ttl=60, max_bytes=10, clock=self.clock)
+        cache.put("a", None, b"12345")
+        cache.put("b", None, b"12345")
+        cache.put("c", None, b"123")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["bytes"], 8)
+        cache.put("d", None, b"12345678901")
+        self.assertIsNone(cache.get("d"))
+
+    def test_invalidate(self):
+        cache = ResponseCache(default_ttl=60, clock=self.clock)
+        paths = [
+            "controller/core",
+            "controller/core/switch",
+            "controller/core/switch[name='leaf2']",
+            "controller/core/switch[name='leaf1']/interface",
+            "controller/core/switch-config",
+            "controller/applications",
+        ]
+        for path in paths:
+            cache.put(path, None, b"[]")
+        self.assertEqual(cache.invalidate("controller/core/switch[name='leaf1']"), 4)
+        self.assertEqual(
+            [path for path in paths if cache.get(path) is not None],
+            ["controller/core/switch-config", "controller/applications"],
+        )
+
+    def test_stale_put_after_invalidate(self):
+        cache = ResponseCache(default_ttl=60, clock=self.clock)
+        generation = cache.generation
+        cache.invalidate("controller/core/switch")
+        cache.put("controller/core/switch", None, b"[]", generation)
+        self.assertIsNone(cache.get("controller/core/switch"))
+
+
+class TestCachingClient(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.BigDbClient(
+            "http://127.0.0.1:8080", requests.Session(), cache=ResponseCache({"controller/core": 60})
+        )
+
+    @responses.activate
+    def test_hit(self):
+        responses.add(responses.GET, URL + "core/switch", json=[{"name": "leaf1"}])
+        self.assertEqual(self.client.root.core.switch(), [{"name": "leaf1"}])
+        result = self.client.root.core.switch()
+        self.assertEqual(result, [{"name": "leaf1"}])
+        result.append("modified")
+        self.assertEqual(self.client.root.core.switch(), [{"name": "leaf1"}])
+        self.assertEqual(len(responses.calls), 1)
+        stats = self.client.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    @responses.activate
+    def test_bypass(self):
+        responses.add(responses.GET, URL + "core/switch", json=[{"name": "leaf1"}])
+        self.client.root.core.switch.get()
+        self.client.root.core.switch.get(cache=False)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_not_cached(self):
+        responses.add(responses.GET, URL + "applications", json=[])
+        responses.add(responses.GET, URL + "core/missing", status=404)
+        self.client.root.applications()
+        self.client.root.applications()
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.client.root.core.missing()
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_write_invalidates(self):
+        responses.add(responses.GET, URL + "core/switch", json=[])
+        responses.add(responses.GET, URL + "core/switch-config", json=[])
+        responses.add(responses.PATCH, URL + "core/switch%5Bname='leaf1'%5D", status=204)
+        responses.add(responses.POST, "http://127.0.0.1:8080/api/v1/rpc/controller/core/switch-config/reset", status=500)
+        self.client.root.core.switch()
+        self.client.root.core.switch_config()
+        self.client.root.core.switch.match(name="leaf1").patch({"shutdown": True})
+        self.client.root.core.switch()
+        self.client.root.core.switch_config()
+        # switch-config is not affected by the write to switch
+        self.assertEqual(len(responses.calls), 4)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.root.core.switch_config.reset.rpc({})
+        self.client.root.core.switch_config()
+        self.assertEqual(len(responses.calls), 6)
+
+    def test_disabled(self):
+        client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session())
+        self.assertIsNone(client.cache_stats())
@@ -0,0 +1,196 @@
+import json
+import time
+import unittest
+
+import requests
+import responses
+import urllib3.exceptions
+
+import pybsn.cluster
+
+URL1 = "http://10.0.0.1:8080"
+URL2 = "http://10.0.0.2:8080"
+
+
+def _refused(url):
+    return requests.exceptions.ConnectionError(
+        urllib3.exceptions.MaxRetryError(None, url, urllib3.exceptions.NewConnectionError(None, "Connection refused"))
+    )
+
+
+class TestBigDbClusterClient(unittest.TestCase):
+    def _add_status(self, url, role):
+        responses.add(
+            responses.GET,
+            url + "/api/v1/data/controller/cluster",
+            json=[{"status": {"local-node-role": role}}],
+        )
+
+    def _connect(self, **kwargs):
+        return pybsn.cluster.connect_cluster([URL1, URL2], **kwargs)
+
+    @responses.activate
+    def test_roles(self):
+        self._add_status(URL1, "standby")
+        self._add_status(URL2, "active")
+        cluster = self._connect()
+        self.assertEqual([m.role for m in cluster.members], ["standby", "active"])
+        self.assertEqual(cluster.url, URL2)
+        self.assertIs(cluster.session, cluster.members[1].client.session)
+        health = cluster.health()
+        self.assertEqual([h["healthy"] for h in health], [True, True])
+        self.assertEqual([h["requests"] for h in health], [1, 1])
+        self.assertIsNotNone(health[0]["latency"])
+
+    @responses.activate
+    def test_client_state(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        cluster = self._connect(coalesce=True)
+        # initialized by BigDbClient, not inherited from class attributes
+        for name in ("codec", "_transfer_stats", "_schema_version", "_singleflight", "_record_types"):
+            self.assertIn(name, vars(cluster))
+        self.assertIsNotNone(cluster.coalesce_stats())
+        self.assertIsNone(cluster.breaker_stats())
+
+    @responses.activate
+    def test_reads_are_distributed(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        for url in (URL1, URL2):
+            responses.add(responses.GET, url + "/api/v1/data/controller/core/switch", json=[{"url": url}])
+        cluster = self._connect()
+        results = {cluster.root.core.switch()[0]["url"] for _ in range(4)}
+        self.assertEqual(results, {URL1, URL2})
+
+    @responses.activate
+    def test_writes_go_to_active(self):
+        self._add_status(URL1, "standby")
+        self._add_status(URL2, "active")
+
+        def _cb(req):
+            self.assertEqual(json.loads(req.body), {"name": "leaf1"})
+            return (204, {}, None)
+
+        responses.add_callback(responses.POST, URL2 + "/api/v1/data/controller/core/switch-config", callback=_cb)
+        responses.add(responses.POST, URL2 + "/api/v1/rpc/controller/test", json={"ok": True})
+        cluster = self._connect()
+        for _ in range(3):
+            cluster.root.core.switch_config.post({"name": "leaf1"})
+        self.assertEqual(cluster.root.test.rpc(), {"ok": True})
+
+    @responses.activate
+    def test_hooks(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        for url in (URL1, URL2):
+            responses.add(responses.GET, url + "/api/v1/data/controller/core/switch", json=[])
+        collector = pybsn.LatencyCollector()
+        cluster = self._connect(hooks=[collector])
+        for _ in range(4):
+            cluster.root.core.switch()
+        self.assertEqual([(s["path"], s["count"]) for s in collector.snapshot()], [("controller/core/switch", 4)])
+
+    @responses.activate
+    def test_cache_shared(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        for url in (URL1, URL2):
+            responses.add(responses.GET, url + "/api/v1/data/controller/core/switch-config", json=[])
+        responses.add(responses.POST, URL1 + "/api/v1/data/controller/core/switch-config", status=204)
+        cluster = self._connect(cache=pybsn.ResponseCache({"controller/core": 60}))
+        for _ in range(3):
+            cluster.root.core.switch_config()
+        cluster.root.core.switch_config.post({"name": "leaf1"})
+        cluster.root.core.switch_config()
+        self.assertEqual(cluster.cache_stats()["hits"], 2)
+        self.assertEqual(cluster.cache_stats()["invalidations"], 1)
+
+    @responses.activate
+    def test_read_failover(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        responses.add(responses.GET, URL1 + "/api/v1/data/controller/core/switch", body=_refused(URL1))
+        responses.add(responses.GET, URL2 + "/api/v1/data/controller/core/switch", json=[{"url": URL2}])
+        cluster = self._connect()
+        for _ in range(3):
+            self.assertEqual(cluster.root.core.switch(), [{"url": URL2}])
+        self.assertFalse(cluster.members[0].healthy)
+        self.assertEqual(cluster.members[0].errors, 1)
+        self.assertEqual(cluster.health()[0]["last-error"], str(cluster.members[0].last_error))
+
+    @responses.activate
+    def test_write_failover(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        cluster = self._connect()
+
+        # controller 1 goes away, controller 2 takes over
+        responses.replace(responses.GET, URL1 + "/api/v1/data/controller/cluster", body=_refused(URL1))
+        responses.add(responses.PUT, URL1 + "/api/v1/data/controller/core/switch-config", body=_refused(URL1))
+        responses.replace(
+            responses.GET, URL2 + "/api/v1/data/controller/cluster", json=[{"status": {"local-node-role": "active"}}]
+        )
+        responses.add(responses.PUT, URL2 + "/api/v1/data/controller/core/switch-config", status=204)
+
+        cluster.root.core.switch_config.put({"name": "leaf1"})
+        self.assertEqual(cluster.url, URL2)
+        self.assertEqual([m.role for m in cluster.members], [None, "active"])
+        self.assertFalse(cluster.members[0].healthy)
+
+    @responses.activate
+    def test_write_not_repeated_after_send(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        responses.add(
+            responses.POST,
+            URL1 + "/api/v1/data/controller/core/switch-config",
+            body=requests.exceptions.ConnectionError("Connection aborted"),
+        )
+        cluster = self._connect()
+        calls = len(responses.calls)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            cluster.root.core.switch_config.post({"name": "leaf1"})
+        # the roles are not refreshed before the error is raised
+        self.assertEqual(len(responses.calls), calls + 1)
+        self.assertIsNone(cluster.members[0].role)
+
+    @responses.activate
+    def test_recheck(self):
+        self._add_status(URL1, "active")
+        self._add_status(URL2, "standby")
+        responses.add(responses.GET, URL1 + "/api/v1/data/controller/test", body=_refused(URL1))
+        responses.add(responses.GET, URL1 + "/api/v1/data/controller/test", json=[{"url": URL1}])
+        responses.add(responses.GET, URL2 + "/api/v1/data/controller/test", json=[{"url": URL2}])
+        cluster = self._connect(recheck_interval=0.0)
+        cluster.root.test()
+        cluster.root.test()
+        time.sleep(0.01)
+        self.assertEqual({cluster.root.test()[0]["url"] for _ in range(2)}, {URL1, URL2})
+        self.assertTrue(cluster.members[0].healthy)
+
+    @responses.activate
+    def test_unknown_roles(self):
+        responses.add(responses.GET, URL1 + "/api/v1/data/controller/cluster", status=404, json={})
+        responses.add(responses.GET, URL2 + "/api/v1/data/controller/cluster", status=404, json={})
+        cluster = self._connect()
+        self.assertEqual([m.role for m in cluster.members], [None, None])
+        self.assertEqual(cluster.url, URL1)
+
+    @responses.activate
+    def test_no_controller_available(self):
+        responses.add(responses.GET, URL1 + "/api/v1/data/controller/cluster", body=_refused(URL1))
+        responses.add(responses.GET, URL2 + "/api/v1/data/controller/cluster", body=_refused(URL2))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self._connect()
+
+    @responses.activate
+    def test_invalid_credentials(self):
+        responses.add(
+            responses.POST,
+            URL1 + "/api/v1/rpc/controller/core/aaa/session/login",
+            status=401,
+            json={"description": "Invalid user/password combination.", "error-code": 401},
+        )
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self._connect(username="admin", password="wrong")
@@ -0,0 +1,133 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import requests
+import responses
+
+import pybsn
+import pybsn.codec
+from pybsn.codec import CODECS, JsonCodec, get_codec
+
+DOCUMENT = [{"name": "leaf1", "dpid": "00:00:00:00:00:00:00:01", "counter": 2**63, "ratio": 0.5, "up": True, "x": None}]
+
+
+def _installed_codecs():
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+class CountingCodec(JsonCodec):
+    def __init__(self):
+        self.loaded = []
+        self.dumped = []
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return super().loads(data)
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return super().dumps(obj)
+
+
+class TestCodec(unittest.TestCase):
+    def test_roundtrip(self):
+        for codec in _installed_codecs():
+            with self.subTest(codec=codec.name):
+                encoded = codec.dumps(DOCUMENT)
+                self.assertEqual(json.loads(encoded), DOCUMENT)
+                self.assertEqual(codec.loads(json.dumps(DOCUMENT).encode()), DOCUMENT)
+                self.assertEqual(codec.loads(json.dumps(DOCUMENT)), DOCUMENT)
+                self.assertEqual(codec.loads('{"name": "grüße"}'.encode()), {"name": "grüße"})
+
+    def test_malformed_raises_value_error(self):
+        for codec in _installed_codecs():
+            with self.subTest(codec=codec.name):
+                with self.assertRaises(ValueError):
+                    codec.loads(b"<html>Bad Gateway</html>")
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec("json"), JsonCodec)
+        codec = CountingCodec()
+        self.assertIs(get_codec(codec), codec)
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_default_codec_preference(self):
+        installed = _installed_codecs()
+        self.assertEqual(type(get_codec()), type(installed[0]))
+        self.assertIs(get_codec(), get_codec())
+
+    def test_default_codec_fallback(self):
+        def missing():
+            raise ImportError("not installed")
+
+        with patch.object(pybsn.codec, "_default_codec", None):
+            with patch.dict(CODECS, {"orjson": missing, "msgspec": missing, "ujson": missing}):
+                self.assertEqual(type(get_codec()), JsonCodec)
+
+
+class TestClientCodec(unittest.TestCase):
+    def setUp(self):
+        self.codec = CountingCodec()
+        self.client = pybsn.connect("http://127.0.0.1:8080", codec=self.codec)
+
+    @responses.activate
+    def test_get_decodes_bytes(self):
+        responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/test", json=DOCUMENT)
+        self.assertEqual(self.client.get("controller/test"), DOCUMENT)
+        self.assertIsInstance(self.codec.loaded[0], bytes)
+
+    @responses.activate
+    def test_iter_get_decodes_elements(self):
+        responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/test", json=DOCUMENT)
+        self.assertEqual(list(self.client.iter_get("controller/test")), DOCUMENT)
+        self.assertEqual(len(self.codec.loaded), len(DOCUMENT))
+
+    @responses.activate
+    def test_post_encodes(self):
+        def _cb(req):
+            self.assertEqual(json.loads(req.body), {"foo": "bar"})
+            return (204, {}, None)
+
+        responses.add_callback(responses.POST, "http://127.0.0.1:8080/api/v1/data/controller/test", callback=_cb)
+        self.client.root.test.post({"foo": "bar"})
+        self.assertEqual(self.codec.dumped, [{"foo": "bar"}])
+
+    @responses.activate
+    def test_rpc_and_schema(self):
+        responses.add(responses.POST, "http://127.0.0.1:8080/api/v1/rpc/controller/test", json={"id": 1})
+        responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/schema/controller", json={"nodeType": "CONTAINER"})
+        self.assertEqual(self.client.root.test.rpc({"input": 1}), {"id": 1})
+        self.assertEqual(self.client.root.schema(), {"nodeType": "CONTAINER"})
+        self.assertEqual(len(self.codec.loaded), 2)
+
+    @responses.activate
+    def test_error_without_json_body(self):
+        responses.add(
+            responses.GET, "http://127.0.0.1:8080/api/v1/data/controller/test", body="<html>Bad Gateway</html>", status=502
+        )
+        with self.assertRaises(requests.exceptions.HTTPError) as context:
+            self.client.get("controller/test")
+        self.assertEqual(context.exception.response.status_code, 502)
+
+    @responses.activate
+    def test_error_description(self):
+        responses.add(
+            responses.GET,
+            "http://127.0.0.1:8080/api/v1/data/controller/test",
+            json={"description": "No such path", "error-code": 404},
+            status=404,
+        )
+        with self.assertRaises(requests.exceptions.HTTPError) as context:
+            self.client.get("controller/test")
+        self.assertIn("No such path", str(context.exception))
+
+    def test_codec_by_name(self):
+        self.assertEqual(type(pybsn.connect("http://127.0.0.1:8080", codec="json").codec), JsonCodec)
@@ -0,0 +1,164 @@
+import array
+import math
+import unittest
+from unittest.mock import patch
+
+import pybsn
+from pybsn.columns import column_types, decode_columns, leaf_type_code
+from pybsn.simulator import BigDbSimulator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class _FakeArray(object):
+    def __init__(self, values, dtype):
+        self.values = values
+        self.dtype = dtype
+
+    def astype(self, dtype):
+        return _FakeArray([dtype(value) for value in self.values], dtype)
+
+
+class _FakeNumpy(object):
+    """Stands in for NumPy: frombuffer() reads the buffer as NumPy does, with the given dtype."""
+
+    @staticmethod
+    def frombuffer(buffer, dtype):
+        view = memoryview(buffer)
+        assert view.format == dtype, (view.format, dtype)
+        return _FakeArray(view.tolist(), dtype)
+
+
+def _leaf(leaf_name, leaf_type, **type_node):
+    node = {"nodeType": "LEAF", "name": leaf_name, "leafType": leaf_type}
+    if type_node:
+        node["typeSchemaNode"] = dict(type_node, leafType=leaf_type)
+    return node
+
+
+UINT64_RANGE = [{"type": "RANGE_VALIDATOR", "ranges": [{"start": 0, "end": 18446744073709551615}]}]
+
+INTERFACE = {
+    "nodeType": "LIST",
+    "name": "interface",
+    "keyNodeNames": ["name"],
+    "listElementSchemaNode": {
+        "nodeType": "LIST_ELEMENT",
+        "name": "interface",
+        "childNodes": {
+            "name": _leaf("name", "STRING"),
+            "rx-error-count": _leaf("rx-error-count", "INTEGER", typeValidator=UINT64_RANGE),
+            "mtu": _leaf("mtu", "INTEGER", name="uint16"),
+            "offset": _leaf("offset", "INTEGER"),
+            "utilization": _leaf("utilization", "DECIMAL"),
+            "up": _leaf("up", "BOOLEAN"),
+            "tag": {"nodeType": "LEAF_LIST", "name": "tag", "leafSchemaNode": {"leafType": "STRING"}},
+            "stats": {
+                "nodeType": "CONTAINER",
+                "name": "stats",
+                "childNodes": {"rx-bytes": _leaf("rx-bytes", "INTEGER", name="counter64")},
+            },
+            "queue": {"nodeType": "LIST", "name": "queue", "listElementSchemaNode": {"nodeType": "LIST_ELEMENT"}},
+        },
+    },
+}
+
+ELEMENTS = [
+    {
+        "name": "ethernet1",
+        "rx-error-count": 2**64 - 1,
+        "mtu": 9216,
+        "offset": -1,
+        "utilization": 0.5,
+        "up": True,
+        "tag": ["a"],
+        "stats": {"rx-bytes": 1000},
+    },
+    {"name": "ethernet2", "rx-error-count": 3, "up": False},
+]
+
+
+class TestColumns(unittest.TestCase):
+    def test_types(self):
+        self.assertEqual(
+            column_types(INTERFACE),
+            {
+                "name": None,
+                "rx-error-count": "Q",
+                "mtu": "H",
+                "offset": "q",
+                "utilization": "d",
+                "up": "B",
+                "tag": None,
+                "stats/rx-bytes": "Q",
+            },
+        )
+        self.assertIsNone(leaf_type_code(_leaf("mac", "STRING")))
+        with self.assertRaises(ValueError):
+            column_types(_leaf("name", "STRING"))
+
+    def test_decode(self):
+        columns = decode_columns(ELEMENTS, column_types(INTERFACE), use_numpy=False)
+        self.assertEqual(columns["name"], ["ethernet1", "ethernet2"])
+        self.assertEqual(columns["rx-error-count"], array.array("Q", [2**64 - 1, 3]))
+        self.assertEqual(columns["mtu"], array.array("H", [9216, 0]))
+        self.assertEqual(columns["offset"], array.array("q", [-1, 0]))
+        self.assertTrue(math.isnan(columns["utilization"][1]))
+        self.assertEqual(list(columns["up"]), [1, 0])
+        self.assertEqual(columns["tag"], [["a"], None])
+        self.assertEqual(list(columns["stats/rx-bytes"]), [1000, 0])
+
+    def test_fields(self):
+        columns = decode_columns(ELEMENTS, column_types(INTERFACE), fields=["name", "stats"], use_numpy=False)
+        self.assertEqual(list(columns), ["name", "stats/rx-bytes"])
+
+    def test_value_out_of_range(self):
+        columns = decode_columns(ELEMENTS + [{"mtu": -1}, {"mtu": "auto"}], column_types(INTERFACE), use_numpy=False)
+        self.assertEqual(columns["mtu"], [9216, 0, -1, "auto"])
+
+    @patch("pybsn.columns._numpy", return_value=_FakeNumpy())
+    def test_array_conversion(self, _numpy):
+        columns = decode_columns(ELEMENTS + [{"tag": ["b"]}], column_types(INTERFACE), use_numpy=True)
+        self.assertEqual(columns["rx-error-count"].dtype, "Q")
+        self.assertEqual(columns["rx-error-count"].values, [2**64 - 1, 3, 0])
+        self.assertEqual(columns["offset"].values, [-1, 0, 0])
+        self.assertEqual(columns["stats/rx-bytes"].values, [1000, 0, 0])
+        self.assertEqual((columns["up"].dtype, columns["up"].values), (bool, [True, False, False]))
+        self.assertEqual(columns["tag"], [["a"], None, ["b"]])
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_numpy(self):
+        columns = decode_columns(ELEMENTS, column_types(INTERFACE))
+        self.assertEqual(columns["rx-error-count"].dtype, numpy.uint64)
+        self.assertEqual(columns["up"].dtype, numpy.bool_)
+        self.assertEqual(columns["offset"].sum(), -1)
+
+    @unittest.skipIf(numpy, "NumPy is installed")
+    def test_numpy_missing(self):
+        self.assertIsInstance(decode_columns(ELEMENTS, column_types(INTERFACE))["mtu"], array.array)
+        with self.assertRaises(ImportError):
+            decode_columns(ELEMENTS, column_types(INTERFACE), use_numpy=True)
+
+
+class TestClientColumns(unittest.TestCase):
+    def setUp(self):
+        schema = {"nodeType": "CONTAINER", "name": "controller", "childNodes": {"interface": INTERFACE}}
+        self.simulator = BigDbSimulator(data={"interface": ELEMENTS}, schema=schema).start()
+        self.client = pybsn.connect(self.simulator.url)
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_get_columns(self):
+        columns = self.client.root.interface.get_columns(use_numpy=False)
+        self.assertEqual(columns["name"], ["ethernet1", "ethernet2"])
+        self.assertEqual(list(columns["rx-error-count"]), [2**64 - 1, 3])
+
+    def test_select(self):
+        columns = self.client.root.interface.select("rx_error_count").get_columns(use_numpy=False)
+        self.assertEqual(list(columns), ["rx-error-count"])
+        self.client.root.interface.get_columns(use_numpy=False)
+        self.assertEqual(self.simulator.stats()["GET"], 3)  # the schema, once per client
@@ -0,0 +1,93 @@
+import gzip
+import json
+import unittest
+
+import requests
+import responses
+
+import pybsn
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/core/switch"
+
+SWITCHES = [{"name": "switch%d" % i, "dpid": "00:00:00:00:00:00:00:%02x" % i} for i in range(200)]
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.connect(
+            "http://127.0.0.1:8080", compression=pybsn.CompressionOptions(request_threshold=1024, level=9)
+        )
+
+    def _add_gzip_response(self, body):
+        data = json.dumps(body).encode("utf-8")
+        responses.add(responses.GET, URL, body=gzip.compress(data), headers={"Content-Encoding": "gzip"})
+        return data
+
+    @responses.activate
+    def test_compressed_response(self):
+        data = self._add_gzip_response(SWITCHES)
+        self.assertEqual(self.client.root.core.switch.get(), SWITCHES)
+        self.assertEqual(responses.calls[0].request.headers["Accept-Encoding"], "gzip, deflate")
+        stats = self.client.transfer_stats()
+        self.assertEqual(stats["responses"], 1)
+        self.assertEqual(stats["response_bytes"], len(data))
+        self.assertEqual(stats["response_bytes_received"], len(gzip.compress(data)))
+        self.assertEqual(stats["requests"], 0)
+
+    @responses.activate
+    def test_compressed_response_streamed(self):
+        data = self._add_gzip_response(SWITCHES)
+        self.assertEqual(list(self.client.root.core.switch.iter(chunk_size=100)), SWITCHES)
+        stats = self.client.transfer_stats()
+        self.assertEqual(stats["response_bytes"], len(data))
+        self.assertLess(stats["response_bytes_received"], len(data))
+
+    @responses.activate
+    def test_compressed_request(self):
+        def callback(request):
+            self.assertEqual(request.headers["Content-Encoding"], "gzip")
+            self.assertEqual(json.loads(gzip.decompress(request.body)), SWITCHES)
+            return 204, {}, ""
+
+        responses.add_callback(responses.PUT, URL, callback=callback)
+        self.client.root.core.switch.put(SWITCHES)
+        stats = self.client.transfer_stats()
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["request_bytes"], len(self.client.codec.dumps(SWITCHES)))
+        self.assertEqual(stats["request_bytes_sent"], len(responses.calls[0].request.body))
+        self.assertLess(stats["request_bytes_sent"], stats["request_bytes"])
+
+    @responses.activate
+    def test_small_request_not_compressed(self):
+        def callback(request):
+            self.assertNotIn("Content-Encoding", request.headers)
+            self.assertEqual(json.loads(request.body), {"name": "switch1"})
+            return 204, {}, ""
+
+        responses.add_callback(responses.PATCH, URL, callback=callback)
+        self.client.root.core.switch.patch({"name": "switch1"})
+        stats = self.client.transfer_stats()
+        self.assertEqual(stats["request_bytes"], stats["request_bytes_sent"])
+
+    @responses.activate
+    def test_request_compression_disabled(self):
+        client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session(), compression=pybsn.CompressionOptions())
+
+        def callback(request):
+            self.assertNotIn("Content-Encoding", request.headers)
+            return 204, {}, ""
+
+        responses.add_callback(responses.PUT, URL, callback=callback)
+        client.root.core.switch.put(SWITCHES)
+
+    def test_disabled(self):
+        client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session())
+        self.assertIsNone(client.transfer_stats())
+
+    def test_request_headers_copied(self):
+        headers = {"If-None-Match": '"1"'}
+        request = requests.Request("PUT", URL, data=json.dumps(SWITCHES), headers=headers)
+        pybsn.compress_request(request, pybsn.CompressionOptions(request_threshold=1024), pybsn.TransferStats())
+        self.assertEqual(request.headers["content-encoding"], "gzip")
+        self.assertEqual(request.headers["If-None-Match"], '"1"')
+        self.assertEqual(headers, {"If-None-Match": '"1"'})
@@ -0,0 +1,65 @@
+import json
+import unittest
+
+import requests
+import responses
+
+import pybsn
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/core/switch"
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session())
+
+    def _add_validated(self, header, value):
+        def callback(request):
+            if request.headers.get("If-None-Match" if header == "ETag" else "If-Modified-Since") == value:
+                return 304, {}, ""
+            return 200, {header: value}, json.dumps([{"name": "leaf1"}])
+
+        responses.add_callback(responses.GET, URL, callback=callback)
+
+    @responses.activate
+    def test_etag(self):
+        self._add_validated("ETag", '"v1"')
+        first = self.client.get_conditional("controller/core/switch")
+        self.assertEqual(first, ([{"name": "leaf1"}], True))
+        second = self.client.get_conditional("controller/core/switch")
+        self.assertFalse(second.changed)
+        self.assertIs(second.value, first.value)
+        self.assertNotIn("If-None-Match", responses.calls[0].request.headers)
+        self.assertEqual(responses.calls[1].request.headers["If-None-Match"], '"v1"')
+
+    @responses.activate
+    def test_last_modified(self):
+        self._add_validated("Last-Modified", "Wed, 21 Oct 2026 07:28:00 GMT")
+        self.assertTrue(self.client.root.core.switch.get_conditional().changed)
+        self.assertFalse(self.client.root.core.switch.get_conditional().changed)
+
+    @responses.activate
+    def test_digest(self):
+        responses.add(responses.GET, URL, json=[{"name": "leaf1"}])
+        responses.add(responses.GET, URL, json=[{"name": "leaf1"}])
+        responses.add(responses.GET, URL, json=[{"name": "leaf2"}])
+        first = self.client.get_conditional("controller/core/switch")
+        second = self.client.get_conditional("controller/core/switch")
+        third = self.client.get_conditional("controller/core/switch")
+        self.assertTrue(first.changed)
+        self.assertFalse(second.changed)
+        self.assertIs(second.value, first.value)
+        self.assertEqual(third, ([{"name": "leaf2"}], True))
+
+    @responses.activate
+    def test_params_tracked_separately(self):
+        responses.add(responses.GET, URL, json=[{"name": "leaf1"}])
+        self.assertTrue(self.client.get_conditional("controller/core/switch").changed)
+        self.assertTrue(self.client.get_conditional("controller/core/switch", {"state-type": "global-config"}).changed)
+        self.assertFalse(self.client.get_conditional("controller/core/switch", {"state-type": "global-config"}).changed)
+
+    @responses.activate
+    def test_error(self):
+        responses.add(responses.GET, URL, status=404)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.get_conditional("controller/core/switch")
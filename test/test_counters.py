@@ -0,0 +1,268 @@
+import array
+import math
+import unittest
+from random import Random
+from unittest.mock import patch
+
+import pybsn
+from pybsn.counters import CounterPoller
+from pybsn.simulator import BigDbSimulator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _leaf(leaf_name, leaf_type="INTEGER", type_name=None):
+    node = {"nodeType": "LEAF", "name": leaf_name, "leafType": leaf_type}
+    if type_name:
+        node["typeSchemaNode"] = {"name": type_name, "leafType": leaf_type}
+    return node
+
+
+def _list(list_name, keys, *leaves):
+    return {
+        "nodeType": "LIST",
+        "name": list_name,
+        "keyNodeNames": keys,
+        "listElementSchemaNode": {
+            "nodeType": "LIST_ELEMENT",
+            "name": list_name,
+            "childNodes": {leaf["name"]: leaf for leaf in leaves},
+        },
+    }
+
+
+INTERFACE = _list(
+    "interface",
+    ["switch", "name"],
+    _leaf("switch", "STRING"),
+    _leaf("name", "STRING"),
+    _leaf("rx-bytes", type_name="counter64"),
+    _leaf("rx-drops", type_name="counter32"),
+    _leaf("description", "STRING"),
+)
+
+SWITCH_COUNTER = _list(
+    "switch-counter",
+    ["switch-name"],
+    _leaf("switch-name", "STRING"),
+    _list("counter", ["name"], _leaf("name", "STRING"), _leaf("value", type_name="uint64")),
+)
+
+SCHEMA = {
+    "nodeType": "CONTAINER",
+    "name": "controller",
+    "childNodes": {"interface": INTERFACE, "switch-counter": SWITCH_COUNTER},
+}
+
+
+def _interface(switch, name, rx_bytes, rx_drops=0):
+    return {"switch": switch, "name": name, "rx-bytes": rx_bytes, "rx-drops": rx_drops}
+
+
+class TestCounterPoller(unittest.TestCase):
+    use_numpy = False
+
+    def setUp(self):
+        self.simulator = BigDbSimulator(schema=SCHEMA).start()
+        self.client = pybsn.connect(self.simulator.url)
+        self.now = 100.0
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def clock(self):
+        return self.now
+
+    def poller(self, node, **kwargs):
+        kwargs.setdefault("use_numpy", self.use_numpy)
+        return CounterPoller(node, clock=self.clock, **kwargs)
+
+    def set_interfaces(self, *interfaces):
+        self.client.root.interface.put(list(interfaces))
+
+    def poll(self, poller, *interfaces, elapsed=2.0):
+        self.set_interfaces(*interfaces)
+        self.now += elapsed
+        return poller.poll()
+
+    def test_rates(self):
+        poller = self.poller(self.client.root.interface)
+        self.assertEqual(poller.counters, ["rx-bytes", "rx-drops"])
+        sample = self.poll(poller, _interface("leaf1", "ethernet1", 1000), _interface("leaf1", "ethernet2", 0))
+        self.assertEqual(sample.keys, [("leaf1", "ethernet1"), ("leaf1", "ethernet2")])
+        self.assertIsNone(sample.elapsed)
+        self.assertEqual(list(sample.valid["rx-bytes"]), [0, 0])
+        self.assertIsNone(sample.rate(("leaf1", "ethernet1"), "rx-bytes"))
+
+        sample = self.poll(poller, _interface("leaf1", "ethernet1", 3000, 4), _interface("leaf1", "ethernet2", 10))
+        self.assertEqual(sample.elapsed, 2.0)
+        self.assertEqual(list(sample.values["rx-bytes"]), [3000, 10])
+        self.assertEqual(list(sample.deltas["rx-bytes"]), [2000, 10])
+        self.assertEqual(list(sample.rates["rx-bytes"]), [1000.0, 5.0])
+        self.assertEqual(sample.rate(("leaf1", "ethernet1"), "rx-drops"), 2.0)
+        self.assertEqual(sample.delta(("leaf1", "ethernet2"), "rx-bytes"), 10)
+        self.assertEqual(poller.stats(), {"polls": 2, "rows": 2, "wraps": 0, "resets": 0})
+
+    def test_wrap_and_reset(self):
+        poller = self.poller(self.client.root.interface)
+        self.poll(poller, _interface("leaf1", "ethernet1", 2**64 - 10, 2**32 - 1), _interface("leaf1", "ethernet2", 5000))
+        sample = self.poll(poller, _interface("leaf1", "ethernet1", 10, 1), _interface("leaf1", "ethernet2", 100))
+        self.assertEqual(sample.delta(("leaf1", "ethernet1"), "rx-bytes"), 20)
+        self.assertEqual(sample.delta(("leaf1", "ethernet1"), "rx-drops"), 2)
+        # ethernet2 was reset: its delta is the new value
+        self.assertEqual(sample.delta(("leaf1", "ethernet2"), "rx-bytes"), 100)
+        self.assertEqual(sample.rate(("leaf1", "ethernet2"), "rx-bytes"), 50.0)
+        stats = poller.stats()
+        self.assertEqual((stats["wraps"], stats["resets"]), (2, 1))
+
+    def test_keys_come_and_go(self):
+        poller = self.poller(self.client.root.interface, counters=["rx_bytes"])
+        self.poll(poller, _interface("leaf1", "ethernet1", 0))
+        sample = self.poll(poller, _interface("leaf1", "ethernet2", 0))
+        # the row of ethernet1 was reclaimed
+        self.assertEqual(sample.rows, {("leaf1", "ethernet2"): 0})
+        sample = self.poll(poller, _interface("leaf1", "ethernet1", 10), _interface("leaf1", "ethernet2", 10))
+        self.assertEqual(sample.rows, {("leaf1", "ethernet2"): 0, ("leaf1", "ethernet1"): 1})
+        # ethernet1 was missing from the previous poll
+        self.assertEqual(list(sample.valid["rx-bytes"]), [1, 0])
+        self.assertEqual(sample.deltas["rx-bytes"][1], 0)
+        self.assertTrue(math.isnan(sample.rates["rx-bytes"][1]))
+        self.assertEqual(sample.rates["rx-bytes"][0], 5.0)
+
+    def test_rows_reclaimed(self):
+        poller = self.poller(self.client.root.interface, counters=["rx_bytes"])
+        interfaces = [_interface("leaf1", "ethernet%d" % i, 100) for i in range(4)]
+        self.poll(poller, *interfaces)
+        # ethernet3 and ethernet2 move into the rows of ethernet0 and ethernet1
+        sample = self.poll(poller, *[dict(i, **{"rx-bytes": 200}) for i in interfaces[2:]])
+        self.assertEqual(sample.keys, [("leaf1", "ethernet3"), ("leaf1", "ethernet2")])
+        self.assertEqual(sample.delta(("leaf1", "ethernet3"), "rx-bytes"), 100)
+        self.assertEqual(sample.delta(("leaf1", "ethernet2"), "rx-bytes"), 100)
+        # ethernet4 gets the row freed by ethernet2 (and then moves into the row of ethernet3), but
+        # not the values ethernet2 had in it
+        sample = self.poll(poller, _interface("leaf1", "ethernet4", 500), _interface("leaf1", "ethernet2", 300))
+        self.assertEqual(sample.keys, [("leaf1", "ethernet4"), ("leaf1", "ethernet2")])
+        self.assertIsNone(sample.delta(("leaf1", "ethernet4"), "rx-bytes"))
+        self.assertEqual(sample.delta(("leaf1", "ethernet2"), "rx-bytes"), 100)
+        self.assertEqual(poller.stats()["rows"], 2)
+        sample = self.poll(poller, _interface("leaf1", "ethernet4", 600), _interface("leaf1", "ethernet2", 300))
+        self.assertEqual(sample.delta(("leaf1", "ethernet4"), "rx-bytes"), 100)
+
+    def test_sample_kept(self):
+        poller = self.poller(self.client.root.interface, counters=["rx_bytes"])
+        first = self.poll(poller, _interface("leaf1", "ethernet1", 0), _interface("leaf1", "ethernet2", 0))
+        second = self.poll(poller, _interface("leaf1", "ethernet2", 10))
+        self.assertEqual(first.keys, [("leaf1", "ethernet1"), ("leaf1", "ethernet2")])
+        self.assertEqual(first.rows, {("leaf1", "ethernet1"): 0, ("leaf1", "ethernet2"): 1})
+        self.assertEqual(second.rows, {("leaf1", "ethernet2"): 0})
+        self.poll(poller, _interface("leaf1", "ethernet3", 0), _interface("leaf1", "ethernet2", 20))
+        self.assertEqual(second.keys, [("leaf1", "ethernet2")])
+
+    def test_churn(self):
+        poller = self.poller(self.client.root.interface, counters=["rx_bytes"])
+        for i in range(pybsn.counters.INITIAL_CAPACITY):
+            self.poll(poller, _interface("leaf1", "ethernet%d" % i, i), _interface("leaf1", "ethernet%d" % (i + 1), i))
+        self.assertEqual(poller.stats()["rows"], 2)
+        self.assertEqual(poller._capacity, pybsn.counters.INITIAL_CAPACITY)
+
+    def test_invalid_values(self):
+        poller = self.poller(self.client.root.interface, counters=["rx-drops"])
+        self.poll(poller, _interface("leaf1", "ethernet1", 0, 2**32))
+        sample = self.poll(poller, _interface("leaf1", "ethernet1", 0, 1))
+        self.assertIsNone(sample.delta(("leaf1", "ethernet1"), "rx-drops"))
+
+    def test_growth(self):
+        poller = self.poller(self.client.root.interface, counters=["rx-bytes"])
+        count = pybsn.counters.INITIAL_CAPACITY + 1
+        self.poll(poller, *[_interface("leaf1", "ethernet%d" % i, i) for i in range(count)])
+        buffer = poller._counters[0].deltas
+        sample = self.poll(poller, *[_interface("leaf1", "ethernet%d" % i, 2 * i) for i in range(count)])
+        deltas = [sample.delta(("leaf1", "ethernet%d" % i), "rx-bytes") for i in range(count)]
+        self.assertEqual(deltas, list(range(count)))
+        # steady state: the buffers are reused
+        self.poll(poller, *[_interface("leaf1", "ethernet%d" % i, 3 * i) for i in range(count)])
+        self.assertIs(poller._counters[0].deltas, buffer)
+
+    def test_within(self):
+        poller = self.poller(self.client.root.switch_counter, counters=["value"], within="counter")
+        self.client.root.switch_counter.put([{"switch-name": "leaf1", "counter": [{"name": "drop", "value": 1}]}])
+        poller.poll()
+        self.client.root.switch_counter.put([{"switch-name": "leaf1", "counter": [{"name": "drop", "value": 7}]}])
+        self.now += 3.0
+        sample = poller.poll()
+        self.assertEqual(sample.keys, [("leaf1", "drop")])
+        self.assertEqual(sample.rate(("leaf1", "drop"), "value"), 2.0)
+
+    def test_not_a_counter(self):
+        with self.assertRaises(ValueError):
+            self.poller(self.client.root.interface, counters=["description"])
+        with self.assertRaises(ValueError):
+            self.poller(self.client.root.switch_counter, within="switch-name")
+
+    @patch("pybsn.counters.time.sleep")
+    def test_run(self, sleep):
+        def advance(delay):
+            self.now += delay
+
+        sleep.side_effect = advance
+        poller = self.poller(self.client.root.interface)
+        self.set_interfaces(_interface("leaf1", "ethernet1", 0))
+        samples = poller.run(interval=5.0, count=3)
+        self.assertEqual(next(samples).timestamp, 100.0)
+        self.now += 12.0  # the polls at 105 and 110 are late: poll once, right away
+        self.assertEqual(next(samples).timestamp, 112.0)
+        self.assertEqual(next(samples).timestamp, 115.0)
+        self.assertEqual(list(samples), [])
+        self.assertEqual([call[0][0] for call in sleep.call_args_list], [3.0])
+
+    @unittest.skipIf(numpy, "NumPy is installed")
+    def test_numpy_missing(self):
+        poller = CounterPoller(self.client.root.interface, clock=self.clock)
+        self.assertIsInstance(poller._counters[0].deltas, array.array)
+        with self.assertRaises(ImportError):
+            CounterPoller(self.client.root.interface, use_numpy=True)
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class TestNumpyCounterPoller(TestCounterPoller):
+    use_numpy = True
+
+    def test_same_as_python(self):
+        random = Random(42)
+        pollers = [self.poller(self.client.root.interface, use_numpy=use_numpy) for use_numpy in (False, True)]
+        values = {}
+        for _ in range(30):
+            interfaces = []
+            for i in range(40):
+                if random.random() < 0.1:
+                    continue  # the key is missing from this poll
+                key = ("leaf1", "ethernet%d" % i)
+                rx_bytes, rx_drops = values.get(key, (2**64 - 2**20, 2**32 - 100))
+                choice = random.random()
+                if choice < 0.1:
+                    rx_bytes, rx_drops = random.randrange(100), random.randrange(100)  # reset
+                else:
+                    rx_bytes = (rx_bytes + random.randrange(2**20)) % 2**64
+                    rx_drops = (rx_drops + random.randrange(100)) % 2**32
+                values[key] = (rx_bytes, rx_drops)
+                interface = _interface(*key, rx_bytes, rx_drops)
+                if choice > 0.95:
+                    del interface["rx-drops"]  # the counter is missing from this poll
+                interfaces.append(interface)
+            self.set_interfaces(*interfaces)
+            self.now += random.choice([0.5, 1.0, 2.0])
+            python, vectorized = [poller.poll() for poller in pollers]
+            self.assertEqual(python.keys, vectorized.keys)
+            for counter in pollers[0].counters:
+                self.assertEqual(list(python.valid[counter]), [int(v) for v in vectorized.valid[counter]])
+                self.assertEqual(list(python.deltas[counter]), [int(v) for v in vectorized.deltas[counter]])
+                self.assertEqual(
+                    [r for r in python.rates[counter] if not math.isnan(r)],
+                    [float(r) for r in vectorized.rates[counter] if not math.isnan(r)],
+                )
+        self.assertEqual(pollers[0].stats(), pollers[1].stats())
+        self.assertGreater(pollers[0].stats()["wraps"], 0)
+        self.assertGreater(pollers[0].stats()["resets"], 0)
@@ -0,0 +1,69 @@
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+import pybsn
+from pybsn.discovery import cached_url, clear_url_cache, probe_urls, remember_url
+from pybsn.sessioncache import SessionCache
+from pybsn.simulator import BigDbSimulator
+
+HEALTHY = "/api/v1/auth/healthy"
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestDiscovery(unittest.TestCase):
+    def setUp(self):
+        clear_url_cache()
+        self.simulator = BigDbSimulator(users={"admin": "adminadmin"}).start()
+        self.port = self.simulator.server_address[1]
+        self.closed = "http://127.0.0.1:%d" % _closed_port()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.simulator.stop()
+        shutil.rmtree(self.directory)
+        clear_url_cache()
+
+    def test_unreachable_candidate(self):
+        self.assertEqual(probe_urls(requests.Session(), [self.closed, self.simulator.url], HEALTHY, 2.0), self.simulator.url)
+        self.assertIsNone(probe_urls(requests.Session(), [self.closed], HEALTHY, 2.0))
+
+    def test_preferred_candidate_wins(self):
+        other = BigDbSimulator().start()
+        try:
+            self.simulator.latency = 0.2
+            self.assertEqual(probe_urls(requests.Session(), [self.simulator.url, other.url], HEALTHY, 2.0), self.simulator.url)
+            self.simulator.latency = 2.0
+            start = time.monotonic()
+            self.assertEqual(probe_urls(requests.Session(), [self.simulator.url, other.url], HEALTHY, 0.2), other.url)
+            self.assertLess(time.monotonic() - start, 1.5)
+        finally:
+            other.stop()
+
+    def test_guess_url_cached(self):
+        url_cache = SessionCache(os.path.join(self.directory, "sessions.json"))
+        with patch.object(pybsn, "BIGDB_PROTO_PORTS", [("http", int(self.closed.rsplit(":", 1)[1])), ("http", self.port)]):
+            self.assertEqual(pybsn.guess_url(requests.Session(), "127.0.0.1", url_cache=url_cache), self.simulator.url)
+            probes = self.simulator.stats()["GET"]
+            self.assertEqual(pybsn.guess_url(requests.Session(), "127.0.0.1"), self.simulator.url)
+            clear_url_cache()
+            self.assertEqual(pybsn.guess_url(requests.Session(), "127.0.0.1", url_cache=url_cache), self.simulator.url)
+            self.assertEqual(self.simulator.stats()["GET"], probes)
+
+    def test_connect_rediscovers_stale_url(self):
+        remember_url("127.0.0.1", self.closed)
+        with patch.object(pybsn, "BIGDB_PROTO_PORTS", [("http", self.port)]):
+            client = pybsn.connect("127.0.0.1", "admin", "adminadmin")
+        self.assertEqual(client.url, self.simulator.url)
+        self.assertEqual(cached_url("127.0.0.1"), self.simulator.url)
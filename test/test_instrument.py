@@ -0,0 +1,151 @@
+import tempfile
+import unittest
+
+import requests
+import responses
+
+import pybsn
+from pybsn.instrument import LatencyCollector, LatencyHistogram, RequestHooks, path_template
+from pybsn.schemacache import SchemaCache
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/"
+
+
+class RecordingHooks(RequestHooks):
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, event):
+        self.calls.append(("request", event))
+
+    def on_response(self, event):
+        self.calls.append(("response", event))
+
+    def on_error(self, event):
+        self.calls.append(("error", event))
+
+
+class FailingHooks(RequestHooks):
+    def on_response(self, event):
+        raise RuntimeError("broken hook")
+
+
+class TestPathTemplate(unittest.TestCase):
+    def test_path_template(self):
+        self.assertEqual(path_template("controller/core/switch"), "controller/core/switch")
+        self.assertEqual(
+            path_template("controller/core/switch[name='leaf1']/interface[name='eth1']"),
+            "controller/core/switch[name=*]/interface[name=*]",
+        )
+        self.assertEqual(path_template("segment[member-vlan<1000][name!='a']"), "segment[member-vlan<*][name!=*]")
+        self.assertEqual(path_template("node[1]"), "node[*]")
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for i in range(1, 101):
+            histogram.add(i / 1000.0)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.005)
+        self.assertAlmostEqual(histogram.percentile(95), 0.095, delta=0.0095)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.0099)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertEqual(histogram.count, 100)
+
+    def test_out_of_range(self):
+        histogram = LatencyHistogram()
+        histogram.add(0.0)
+        histogram.add(1000.0)
+        self.assertLessEqual(histogram.percentile(50), 1e-4)
+        self.assertEqual(histogram.percentile(100), 1000.0)
+
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        self.hooks = RecordingHooks()
+        self.collector = LatencyCollector()
+        self.client = pybsn.BigDbClient(
+            "http://127.0.0.1:8080", requests.Session(), hooks=[FailingHooks(), self.hooks, self.collector]
+        )
+
+    @responses.activate
+    def test_get(self):
+        responses.add(responses.GET, URL + "core/switch%5Bname='leaf1'%5D", json=[{"name": "leaf1"}])
+        self.assertEqual(self.client.root.core.switch.match(name="leaf1")(), [{"name": "leaf1"}])
+        self.assertEqual([name for name, _ in self.hooks.calls], ["request", "response"])
+        event = self.hooks.calls[1][1]
+        self.assertEqual((event.method, event.template, event.status), ("GET", "controller/core/switch[name=*]", 200))
+        self.assertEqual(event.response_bytes, len(b'[{"name": "leaf1"}]'))
+        self.assertGreater(event.network_time, 0)
+        self.assertGreater(event.prepare_time, 0)
+        self.assertIsNotNone(event.decode_time)
+
+    @responses.activate
+    def test_write_and_error(self):
+        responses.add(responses.PUT, URL + "core/switch-config", status=204)
+        responses.add(responses.GET, URL + "core/missing", json={"description": "Not found"}, status=404)
+        self.client.root.core.switch_config.put({"name": "leaf1"})
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.root.core.missing()
+        (_, put), (_, get) = [call for call in self.hooks.calls if call[0] != "request"]
+        self.assertEqual(self.hooks.calls[1][0], "response")
+        self.assertEqual(self.hooks.calls[3][0], "error")
+        self.assertIsNone(put.decode_time)
+        self.assertEqual(put.request_bytes, len(responses.calls[0].request.body))
+        self.assertEqual(get.status, 404)
+        self.assertIsInstance(get.error, requests.exceptions.HTTPError)
+
+    @responses.activate
+    def test_rpc_no_content(self):
+        responses.add(responses.POST, "http://127.0.0.1:8080/api/v1/rpc/controller/test", status=204)
+        self.client.root.test.rpc()
+        self.assertEqual([name for name, _ in self.hooks.calls], ["request", "response"])
+
+    @responses.activate
+    def test_collector(self):
+        responses.add(responses.GET, URL + "core/switch", json=[])
+        responses.add(responses.GET, URL + "core/missing", status=404)
+        for _ in range(3):
+            self.client.root.core.switch()
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.root.core.missing()
+        switch, missing = self.collector.snapshot()
+        self.assertEqual((switch["path"], switch["count"], switch["errors"]), ("controller/core/switch", 3, 0))
+        self.assertLessEqual(switch["p50"], switch["p99"])
+        self.assertEqual((missing["count"], missing["errors"], missing["p50"]), (0, 1, None))
+        dump = self.collector.dump().splitlines()
+        self.assertEqual(len(dump), 3)
+        self.assertTrue(dump[1].startswith("GET           3      0"))
+        self.collector.reset()
+        self.assertEqual(self.collector.snapshot(), [])
+
+    @responses.activate
+    def test_str_body(self):
+        client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session(), codec="json", hooks=[self.hooks])
+        responses.add(responses.PUT, URL + "core/switch-config", status=204)
+        client.root.core.switch_config.put({"name": "l\u00e9af1"})
+        event = self.hooks.calls[1][1]
+        self.assertEqual(event.request_bytes, len(responses.calls[0].request.body.encode()))
+
+    @responses.activate
+    def test_undecoded_response(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = pybsn.BigDbClient(
+                "http://127.0.0.1:8080", requests.Session(), hooks=[self.hooks], schema_cache=SchemaCache(directory)
+            )
+            # an empty version body is not decoded; its event must not be left to the next request
+            responses.add(responses.GET, URL + "core/version/appliance", body=b"")
+            responses.add(responses.GET, "http://127.0.0.1:8080/api/v1/schema/controller/core", json={})
+            responses.add(responses.GET, URL + "core/switch", body=b"not json")
+            client.schema("controller/core")
+            self.assertEqual([name for name, _ in self.hooks.calls], ["request", "response"])
+            self.assertEqual(self.hooks.calls[1][1].path, "controller/core/version/appliance")
+            with self.assertRaises(ValueError):
+                client.root.core.switch()
+            self.assertEqual([name for name, _ in self.hooks.calls[2:]], ["request", "error"])
+            self.assertEqual(self.hooks.calls[3][1].path, "controller/core/switch")
+            self.assertIsNone(client._pending.event)
+
+    def test_no_hooks(self):
+        self.assertEqual(pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session()).hooks, [])
@@ -28,20 +28,36 @@ class TestNode(unittest.TestCase):
         node = self.root["core"]["switch-config"]
         self.assertEqual(node._path, "controller/core/switch-config")
 
+    def test_children_memoized(self):
+        node = self.root.core.switch_config
+        self.assertIs(self.root.core.switch_config, node)
+        self.assertIs(self.root["core"]["switch-config"], node)
+        self.assertIsNot(self.root.core.switch_config.match(name="leaf1").interface, node.match(name="leaf1").interface)
+        self.assertFalse(hasattr(node, "__deepcopy__"))
+        self.assertEqual(self.root.core["get"]._path, "controller/core/get")
+        self.assertTrue(callable(self.root.core.get))
+
+    def test_getitem_not_memoized(self):
+        switch = self.root.core.switch
+        self.assertIsNot(switch["leaf1"], switch["leaf1"])
+        self.assertEqual(switch["leaf1"]._path, "controller/core/switch/leaf1")
+        self.assertIsNone(switch._children)
+        self.assertFalse(hasattr(switch, "__dict__"))
+
     def test_root_get(self):
         self.client.get.return_value = dict(foo="bar")
         self.assertEqual(self.root.get(), dict(foo="bar"))
-        self.client.get.assert_called_with("controller", None, timeout=CLIENT_TIMEOUT)
+        self.client.get.assert_called_with("controller", None, timeout=CLIENT_TIMEOUT, cache=True)
 
     def test_root_get_with_params(self):
         self.client.get.return_value = dict(foo="bar")
         self.assertEqual(self.root.get(params=PARAMS), dict(foo="bar"))
-        self.client.get.assert_called_with("controller", PARAMS, timeout=CLIENT_TIMEOUT)
+        self.client.get.assert_called_with("controller", PARAMS, timeout=CLIENT_TIMEOUT, cache=True)
 
     def test_root_get_with_timeout(self):
         self.client.get.return_value = dict(foo="bar")
         self.root.get(timeout=short_timeout)
-        self.client.get.assert_called_with("controller", None, timeout=short_timeout)
+        self.client.get.assert_called_with("controller", None, timeout=short_timeout, cache=True)
 
     def test_root_post(self):
         self.root.post(data=dict(foo="bar"))
@@ -153,12 +169,74 @@ class TestNode(unittest.TestCase):
         self.assertEqual(node.filter("b=$x", x=1)._path, "controller/node[b=1]")
         self.assertEqual(node.filter("a=$x", x=True)._path, "controller/node[a='true']")
 
+    def test_at(self):
+        node = self.root.applications.bcf.info.endpoint_manager
+        endpoint = node.at("tenant[name=$t]/segment[name=$s]/endpoint", t="t 1", s="s1")
+        self.assertEqual(endpoint._path, node._path + "/tenant[name='t%201']/segment[name='s1']/endpoint")
+        template = pybsn.compile_template("tenant[name=$t]")
+        self.assertEqual(node.at(template, t="t2").segment._path, node.at("tenant[name=$t]/segment", t="t2")._path)
+
     def test_root_call(self):
         self.client.get.return_value = dict(foo="bar")
         self.assertEqual(self.root(), dict(foo="bar"))
-        self.client.get.assert_called_with("controller", None, timeout=CLIENT_TIMEOUT)
+        self.client.get.assert_called_with("controller", None, timeout=CLIENT_TIMEOUT, cache=True)
 
     def test_root_call_with_timeout(self):
         self.client.get.return_value = dict(foo="bar")
         self.assertEqual(self.root(timeout=short_timeout), dict(foo="bar"))
-        self.client.get.assert_called_with("controller", None, timeout=short_timeout)
+        self.client.get.assert_called_with("controller", None, timeout=short_timeout, cache=True)
+
+    def test_select(self):
+        node = self.root.core.switch.select("name", "mac_address").match(name="leaf1").select("name", "dpid")
+        self.assertEqual(node._path, "controller/core/switch[name='leaf1']")
+        node.get(PARAMS)
+        self.client.get.assert_called_with(
+            "controller/core/switch[name='leaf1']",
+            {"state-type": "global-config", "select": ["name", "mac-address", "dpid"]},
+            timeout=CLIENT_TIMEOUT,
+            cache=True,
+        )
+        self.assertEqual(PARAMS, {"state-type": "global-config"})
+        self.assertEqual(node.interface._select, ())
+
+    def test_exclude(self):
+        self.client.schema.return_value = {
+            "nodeType": "LIST",
+            "listElementSchemaNode": {"nodeType": "LIST_ELEMENT", "childNodes": {"name": {}, "dpid": {}, "interface": {}}},
+        }
+        node = self.root.core.switch.match(name="leaf1").exclude("interface")
+        self.client.schema.assert_called_with("controller/core/switch", timeout=CLIENT_TIMEOUT)
+        self.assertEqual(node._select, ("name", "dpid"))
+        self.assertEqual(node.exclude("dpid")._select, ("name",))
+        with self.assertRaises(ValueError):
+            node.exclude("stats")
+
+    def test_get_conditional(self):
+        self.root.core.switch.get_conditional(PARAMS)
+        self.client.get_conditional.assert_called_with("controller/core/switch", PARAMS, timeout=CLIENT_TIMEOUT)
+
+    def test_iter(self):
+        self.root.core.switch.iter(params={"single": "true"})
+        self.client.iter_get.assert_called_with(
+            "controller/core/switch", {"single": "true"}, timeout=CLIENT_TIMEOUT, chunk_size=pybsn.ITER_CHUNK_SIZE
+        )
+
+    def test_iter_pages(self):
+        self.root.core.switch.iter_pages(100, start_after="leaf1")
+        self.client.iter_pages.assert_called_with(
+            "controller/core/switch", 100, key=None, start_after="leaf1", params=None, timeout=CLIENT_TIMEOUT
+        )
+
+    def test_get_many(self):
+        topology = self.root.applications.bigtap.topology
+        topology.get_many(["core-interface", self.root.core.switch], max_workers=4)
+        nodes, params = self.client.get_many.call_args[0]
+        self.assertEqual(
+            [node._path for node in nodes],
+            ["controller/applications/bigtap/topology/core-interface", "controller/core/switch"],
+        )
+        self.assertIsNone(params)
+        self.assertEqual(self.client.get_many.call_args[1], dict(timeout=CLIENT_TIMEOUT, max_workers=4, as_completed=False))
+        topology.select("name").get_many(["core-interface", self.root.core.switch])
+        nodes, _ = self.client.get_many.call_args[0]
+        self.assertEqual([node._select for node in nodes], [("name",), ()])
@@ -0,0 +1,70 @@
+import unittest
+
+import requests
+import responses
+
+import pybsn
+from pybsn.paging import Page, list_key, paginate, schema_path
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/core/switch"
+SCHEMA_URL = "http://127.0.0.1:8080/api/v1/schema/controller/core/switch"
+
+SWITCHES = [{"name": "leaf%d" % i} for i in range(5)]
+
+
+class TestPaging(unittest.TestCase):
+    def test_paginate(self):
+        self.assertEqual(
+            list(paginate(iter(SWITCHES), 2, "name")),
+            [Page(SWITCHES[0:2], "leaf1"), Page(SWITCHES[2:4], "leaf3"), Page(SWITCHES[4:], "leaf4")],
+        )
+        self.assertEqual(list(paginate(iter([]), 2, "name")), [])
+
+    def test_list_key(self):
+        self.assertEqual(list_key({"nodeType": "LIST", "keyNodeNames": ["name"]}), "name")
+        for schema in ({"nodeType": "CONTAINER"}, {"nodeType": "LIST"}, {"nodeType": "LIST", "keyNodeNames": ["a", "b"]}):
+            with self.subTest(schema=schema):
+                with self.assertRaises(ValueError):
+                    list_key(schema)
+
+    def test_schema_path(self):
+        path = "controller/core/switch[name='leaf1']/interface[name>'e1']"
+        self.assertEqual(schema_path(path), "controller/core/switch/interface")
+
+
+class TestIterPages(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session())
+
+    @responses.activate
+    def test_key_from_schema(self):
+        responses.add(responses.GET, SCHEMA_URL, json={"nodeType": "LIST", "keyNodeNames": ["name"]})
+        responses.add(responses.GET, URL, json=SWITCHES)
+        pages = list(self.client.root.core.switch.iter_pages(3))
+        self.assertEqual([page.last_key for page in pages], ["leaf2", "leaf4"])
+        self.assertEqual([len(page.elements) for page in pages], [3, 2])
+
+    @responses.activate
+    def test_resume(self):
+        responses.add(responses.GET, URL + "%5Bname%3E'leaf2'%5D", json=SWITCHES[3:])
+        pages = list(self.client.root.core.switch.iter_pages(10, key="name", start_after="leaf2"))
+        self.assertEqual(pages, [Page(SWITCHES[3:], "leaf4")])
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_select_includes_key(self):
+        responses.add(responses.GET, URL, json=[{"name": "leaf0", "dpid": "00:01"}])
+        pages = list(self.client.root.core.switch.select("dpid").iter_pages(10, key="name"))
+        self.assertEqual(pages[0].last_key, "leaf0")
+        self.assertEqual(responses.calls[0].request.url, URL + "?select=dpid&select=name")
+
+    @responses.activate
+    def test_select_param_string(self):
+        responses.add(responses.GET, URL, json=[{"name": "leaf0", "dpid": "00:01"}])
+        pages = list(self.client.iter_pages("controller/core/switch", 10, key="name", params={"select": "dpid"}))
+        self.assertEqual(pages[0].last_key, "leaf0")
+        self.assertEqual(responses.calls[0].request.url, URL + "?select=dpid&select=name")
+
+    def test_invalid_page_size(self):
+        with self.assertRaises(ValueError):
+            self.client.iter_pages("controller/core/switch", 0, key="name")
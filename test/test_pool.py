@@ -0,0 +1,96 @@
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import pybsn
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # noinspection PyPep8Naming
+    def do_GET(self):
+        if self.path.endswith("/slow"):
+            time.sleep(0.2)
+        body = b'[{"status": "ok"}]'
+        self.send_response(200)
+        self.send_header("Content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPool(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_connections_reused(self):
+        client = pybsn.connect(self.url)
+        for _ in range(3):
+            self.assertEqual(client.root.test(), [{"status": "ok"}])
+        stats = client.pool_stats()
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["reused"], 2)
+        self.assertEqual(stats["discarded"], 0)
+
+    def test_discarded_when_pool_full(self):
+        client = pybsn.connect(self.url, pool_options=pybsn.PoolOptions(pool_maxsize=1))
+        results = list(client.get_many(["controller/slow"] * 3, max_workers=3))
+        self.assertTrue(all(r.error is None for r in results))
+        stats = client.pool_stats()
+        self.assertEqual(stats["opened"], 3)
+        self.assertEqual(stats["discarded"], 2)
+        self.assertEqual(stats["open"], 1)
+
+    def test_blocking_pool(self):
+        client = pybsn.connect(self.url, pool_options=pybsn.PoolOptions(pool_maxsize=1, pool_block=True))
+        results = list(client.get_many(["controller/slow"] * 3, max_workers=3))
+        self.assertTrue(all(r.error is None for r in results))
+        stats = client.pool_stats()
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["reused"], 2)
+        self.assertEqual(stats["discarded"], 0)
+
+    def test_socket_options(self):
+        client = pybsn.connect(
+            self.url, pool_options=pybsn.PoolOptions(tcp_keepalive=True, tcp_keepalive_idle=30, tcp_keepalive_count=3)
+        )
+        client.root.test()
+        adapter = client.session.get_adapter(self.url)
+        pools = adapter.poolmanager.pools
+        [pool] = [pools[key] for key in pools.keys()]
+        sock = pool.pool.queue[-1].sock
+        self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY), 1)
+        self.assertEqual(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 1)
+        if hasattr(socket, "TCP_KEEPCNT"):
+            self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT), 3)
+
+    def test_socket_options_default(self):
+        options = pybsn.PoolOptions().socket_options()
+        self.assertEqual(options, [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+        self.assertEqual(pybsn.PoolOptions(tcp_nodelay=False).socket_options(), [])
+
+    def test_client_pool_options(self):
+        session = requests.Session()
+        client = pybsn.BigDbClient(self.url, session)
+        self.assertIsNone(client.pool_stats())
+        client = pybsn.BigDbClient(self.url, session, pool_options=pybsn.PoolOptions(pool_maxsize=4))
+        self.assertEqual(client.pool_stats()["requests"], 0)
+        self.assertEqual(session.get_adapter(self.url)._pool_maxsize, 4)
@@ -0,0 +1,78 @@
+import unittest
+
+import requests
+import responses
+
+import pybsn
+from pybsn.cache import ResponseCache
+from pybsn.projection import child_names, excluding, select_params, selected_fields
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/applications/bigtap/tracked-host"
+
+
+class TestProjection(unittest.TestCase):
+    def test_select_params(self):
+        self.assertIsNone(select_params(None, ()))
+        self.assertEqual(select_params({"single": "true"}, ("name",)), {"single": "true", "select": ["name"]})
+        # explicit select parameters are kept
+        self.assertEqual(select_params({"select": "dpid"}, ("name", "dpid")), {"select": ["dpid", "name"]})
+        self.assertEqual(select_params({"select": ["dpid"]}, ()), {"select": ["dpid"]})
+
+    def test_selected_fields(self):
+        self.assertIsNone(selected_fields(None))
+        self.assertIsNone(selected_fields({"single": "true"}))
+        self.assertEqual(selected_fields({"select": "dpid"}), ("dpid",))
+        self.assertEqual(selected_fields({"select": ["dpid", "name"]}), ("dpid", "name"))
+
+    def test_child_names(self):
+        self.assertEqual(child_names({"nodeType": "CONTAINER", "childNodes": {"a": {}, "b": {}}}), ["a", "b"])
+        with self.assertRaises(ValueError):
+            child_names({"nodeType": "LEAF"})
+
+    def test_excluding(self):
+        self.assertEqual(excluding(["a", "b", "c"], ["b"]), ("a", "c"))
+        with self.assertRaises(ValueError):
+            excluding(["a"], ["b"])
+
+
+class TestSelectClient(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session(), cache=ResponseCache(default_ttl=60))
+
+    @responses.activate
+    def test_select_query(self):
+        responses.add(responses.GET, URL, json=[{"ip-addr": "10.0.0.1"}])
+        hosts = self.client.root.applications.bigtap.tracked_host.select("ip_addr", "host_name")
+        self.assertEqual(hosts(), [{"ip-addr": "10.0.0.1"}])
+        self.assertEqual(responses.calls[0].request.url, URL + "?select=ip-addr&select=host-name")
+
+    @responses.activate
+    def test_select_param_combined(self):
+        responses.add(responses.GET, URL, json=[])
+        hosts = self.client.root.applications.bigtap.tracked_host.select("ip_addr")
+        hosts.get(params={"select": "host-name"})
+        self.assertEqual(responses.calls[0].request.url, URL + "?select=host-name&select=ip-addr")
+
+    @responses.activate
+    def test_selections_cached_separately(self):
+        responses.add(responses.GET, URL, json=[])
+        hosts = self.client.root.applications.bigtap.tracked_host
+        for node in (hosts, hosts.select("ip_addr"), hosts.select("host_name"), hosts.select("ip_addr")):
+            node()
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_get_many_keeps_selection(self):
+        responses.add(responses.GET, URL, json=[])
+        hosts = self.client.root.applications.bigtap.tracked_host
+        results = list(self.client.get_many([hosts.select("ip_addr"), "controller/applications/bigtap/tracked-host"]))
+        self.assertEqual([result.error for result in results], [None, None])
+        self.assertEqual(sorted(call.request.url for call in responses.calls), [URL, URL + "?select=ip-addr"])
+
+    def test_at_and_exclude_keep_node_type(self):
+        class MyNode(pybsn.Node):
+            __slots__ = ()
+
+        bigtap = MyNode("controller/applications/bigtap", self.client).select("name")
+        self.assertEqual(bigtap.at("tracked-host")._select, ("name",))
+        self.assertIs(type(bigtap.exclude("name")), MyNode)
@@ -0,0 +1,126 @@
+import sys
+import unittest
+
+import pybsn
+from pybsn.records import Record, attribute_name, record_class
+from pybsn.simulator import BigDbSimulator
+
+
+def _leaf(name, leaf_type="STRING"):
+    return {"nodeType": "LEAF", "name": name, "leafType": leaf_type}
+
+
+INTERFACE = {
+    "nodeType": "LIST",
+    "name": "interface",
+    "keyNodeNames": ["name"],
+    "listElementSchemaNode": {
+        "nodeType": "LIST_ELEMENT",
+        "name": "interface",
+        "childNodes": {"name": _leaf("name"), "speed": _leaf("speed", "INTEGER")},
+    },
+}
+
+SWITCH = {
+    "nodeType": "LIST",
+    "name": "switch",
+    "keyNodeNames": ["name"],
+    "listElementSchemaNode": {
+        "nodeType": "LIST_ELEMENT",
+        "name": "switch",
+        "childNodes": {
+            "name": _leaf("name"),
+            "mac-address": _leaf("mac-address"),
+            "class": _leaf("class"),
+            "items": _leaf("items", "INTEGER"),
+            "interface": INTERFACE,
+            "stats": {"nodeType": "CONTAINER", "name": "stats", "childNodes": {"rx-bytes": _leaf("rx-bytes", "INTEGER")}},
+        },
+    },
+}
+
+ELEMENT = {
+    "name": "leaf1",
+    "mac-address": "00:00:00:00:00:01",
+    "class": "leaf",
+    "interface": [{"name": "ethernet1", "speed": 10}],
+    "stats": {"rx-bytes": 1000},
+}
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.Switch = record_class(SWITCH)
+
+    def test_access(self):
+        switch = self.Switch.from_dict(ELEMENT)
+        self.assertEqual(type(switch).__name__, "Switch")
+        self.assertEqual(switch.mac_address, "00:00:00:00:00:01")
+        self.assertEqual(switch["mac-address"], switch["mac_address"])
+        self.assertEqual(switch.class_, "leaf")
+        self.assertEqual(switch.interface[0].speed, 10)
+        self.assertEqual(switch.stats["rx-bytes"], 1000)
+        self.assertEqual(switch.keys(), ["name", "mac-address", "class", "interface", "stats"])
+        self.assertNotIn("items", switch)
+        self.assertIsNone(switch.get("items"))
+        with self.assertRaises(KeyError):
+            switch["items"]
+        with self.assertRaises(AttributeError):
+            switch.items_
+        with self.assertRaises(AttributeError):
+            switch.name = "leaf2"
+
+    def test_to_dict(self):
+        switch = self.Switch.from_dict(ELEMENT)
+        self.assertEqual(switch.to_dict(), ELEMENT)
+        self.assertEqual(switch, ELEMENT)
+        self.assertEqual(dict(switch.items())["name"], "leaf1")
+        self.assertIn("mac_address='00:00:00:00:00:01'", repr(switch))
+
+    def test_unknown_fields(self):
+        switch = self.Switch.from_dict(dict(ELEMENT, role="spine"))
+        self.assertEqual(switch["role"], "spine")
+        self.assertEqual(switch.keys()[-1], "role")
+
+    def test_compact(self):
+        element = {"name": "leaf1", "mac-address": "00:00:00:00:00:01", "class": "leaf", "items": 1}
+        self.assertLess(sys.getsizeof(self.Switch.from_dict(element)), sys.getsizeof(element) / 2)
+        self.assertFalse(hasattr(self.Switch.from_dict(element), "__dict__"))
+
+    def test_attribute_names(self):
+        self.assertEqual(attribute_name("ip-address"), "ip_address")
+        self.assertEqual(attribute_name("global"), "global_")
+        self.assertEqual(attribute_name("keys"), "keys_")
+        self.assertEqual(attribute_name("802-1x"), "_802_1x")
+
+    def test_not_a_list(self):
+        with self.assertRaises(ValueError):
+            record_class(_leaf("name"))
+
+
+class TestClientRecords(unittest.TestCase):
+    def setUp(self):
+        schema = {
+            "nodeType": "CONTAINER",
+            "name": "controller",
+            "childNodes": {"core": {"nodeType": "CONTAINER", "name": "core", "childNodes": {"switch": SWITCH}}},
+        }
+        self.simulator = BigDbSimulator(schema=schema).start()
+        self.client = pybsn.connect(self.simulator.url)
+        self.client.root.core.switch.post(ELEMENT)
+        self.client.root.core.switch.post({"name": "leaf2", "mac-address": "00:00:00:00:00:02"})
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_get_records(self):
+        switches = self.client.root.core.switch.get_records()
+        self.assertEqual([switch.name for switch in switches], ["leaf1", "leaf2"])
+        self.assertIsInstance(switches[0], Record)
+        self.assertEqual(switches[0], ELEMENT)
+        self.assertIs(type(switches[0]), self.client.record_type("controller/core/switch"))
+
+    def test_match_and_select(self):
+        switches = self.client.root.core.switch.match(name="leaf2").select("mac_address").get_records()
+        self.assertEqual(switches, [{"mac-address": "00:00:00:00:00:02"}])
+        self.assertEqual(self.simulator.stats()["GET"], 2)  # the schema, once per client
@@ -0,0 +1,194 @@
+import unittest
+from unittest.mock import patch
+
+import requests
+import responses
+import urllib3.exceptions
+
+import pybsn
+from pybsn.retry import BreakerOptions, CircuitBreaker, CircuitOpenError, RetryPolicy, connect_failed, retry_after
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/"
+RPC_URL = "http://127.0.0.1:8080/api/v1/rpc/controller/"
+
+
+def _refused():
+    return requests.exceptions.ConnectionError(
+        urllib3.exceptions.MaxRetryError(None, URL, urllib3.exceptions.NewConnectionError(None, "Connection refused"))
+    )
+
+
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(response=response)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff(self):
+        policy = RetryPolicy(max_attempts=5, backoff=0.1, max_backoff=0.3, jitter=False)
+        error = requests.exceptions.ReadTimeout()
+        self.assertEqual([policy.delay(i, "GET", False, error) for i in range(1, 6)], [0.1, 0.2, 0.3, 0.3, None])
+        for _ in range(20):
+            self.assertLessEqual(RetryPolicy(backoff=0.1).delay(2, "GET", False, error), 0.2)
+
+    def test_idempotent_only(self):
+        policy = RetryPolicy(jitter=False)
+        timeout = requests.exceptions.ReadTimeout()
+        self.assertIsNotNone(policy.delay(1, "PUT", False, timeout))
+        self.assertIsNone(policy.delay(1, "POST", False, timeout))
+        self.assertIsNone(policy.delay(1, "GET", True, timeout))
+        self.assertIsNone(policy.delay(1, "PATCH", False, _http_error(503)))
+        # never sent, or rejected before processing
+        self.assertIsNotNone(policy.delay(1, "POST", False, _refused()))
+        self.assertIsNotNone(policy.delay(1, "POST", True, _http_error(429)))
+
+    def test_statuses(self):
+        policy = RetryPolicy(jitter=False)
+        self.assertIsNone(policy.delay(1, "GET", False, _http_error(500)))
+        self.assertIsNone(policy.delay(1, "GET", False, _http_error(404)))
+        self.assertEqual(policy.delay(1, "GET", False, _http_error(503, {"Retry-After": "2"})), 2.0)
+        self.assertIsNone(policy.delay(1, "GET", False, _http_error(503, {"Retry-After": "600"})))
+        self.assertIsNone(policy.delay(1, "GET", False, ValueError()))
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after(_http_error(429, {"Retry-After": "1.5"}).response), 1.5)
+        self.assertEqual(retry_after(_http_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}).response), 0.0)
+        self.assertIsNone(retry_after(_http_error(429, {"Retry-After": "soon"}).response))
+        self.assertIsNone(retry_after(_http_error(429).response))
+
+    def test_circuit_open(self):
+        self.assertIsNone(RetryPolicy().delay(1, "GET", False, CircuitOpenError()))
+
+    def test_connect_failed(self):
+        self.assertTrue(connect_failed(_refused()))
+        self.assertTrue(connect_failed(CircuitOpenError()))
+        self.assertFalse(connect_failed(requests.exceptions.ConnectionError("reset")))
+        self.assertFalse(connect_failed(requests.exceptions.ReadTimeout()))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(BreakerOptions(failure_threshold=2, reset_timeout=10), clock=lambda: self.now)
+
+    def test_open_and_close(self):
+        for _ in range(2):
+            self.breaker.allow()
+            self.breaker.record(_refused())
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+        self.now = 10.0
+        self.assertEqual(self.breaker.state, "half-open")
+        self.breaker.allow()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()  # only one trial at a time
+        self.breaker.record(_http_error(404))
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.stats(), {"state": "closed", "failures": 0, "opened": 1, "rejected": 2})
+
+    def test_failed_trial(self):
+        for _ in range(2):
+            self.breaker.record(_http_error(503))
+        self.now = 10.0
+        self.breaker.allow()
+        self.breaker.record(requests.exceptions.ReadTimeout())
+        self.assertEqual(self.breaker.state, "open")
+        self.now = 15.0
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+    def test_released_trial(self):
+        for _ in range(2):
+            self.breaker.record(_refused())
+        self.now = 10.0
+        self.breaker.allow()
+        self.breaker.release()
+        self.assertEqual(self.breaker.stats()["failures"], 2)
+        self.breaker.allow()  # the next trial
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+    def test_success_resets(self):
+        self.breaker.record(_refused())
+        self.breaker.record(None)
+        self.breaker.record(_refused())
+        self.assertEqual(self.breaker.state, "closed")
+
+
+@patch("pybsn.time.sleep")
+class TestClientRetry(unittest.TestCase):
+    def _client(self, **kwargs):
+        return pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session(), **kwargs)
+
+    @responses.activate
+    def test_get_retried(self, sleep):
+        responses.add(responses.GET, URL + "core/switch", status=503, headers={"Retry-After": "1"})
+        responses.add(responses.GET, URL + "core/switch", body=_refused())
+        responses.add(responses.GET, URL + "core/switch", json=[{"name": "leaf1"}])
+        client = self._client(retry=RetryPolicy(backoff=0.5, jitter=False))
+        self.assertEqual(client.root.core.switch(), [{"name": "leaf1"}])
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1.0, 1.0])
+        self.assertEqual(client.retry_stats(), {"retried": 1, "retries": 2, "exhausted": 0})
+
+    @responses.activate
+    def test_exhausted(self, sleep):
+        responses.add(responses.GET, URL + "core/switch", status=502)
+        client = self._client(retry=RetryPolicy(max_attempts=2))
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.root.core.switch()
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(client.retry_stats(), {"retried": 1, "retries": 1, "exhausted": 1})
+
+    @responses.activate
+    def test_rpc_not_retried(self, sleep):
+        responses.add(responses.POST, RPC_URL + "core/switch/disconnect", status=503)
+        client = self._client(retry=RetryPolicy())
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.root.core.switch.disconnect.rpc()
+        self.assertEqual(len(responses.calls), 1)
+        self.assertFalse(sleep.called)
+
+    @responses.activate
+    def test_breaker(self, sleep):
+        responses.add(responses.GET, URL + "core/switch", body=_refused())
+        client = self._client(breaker=BreakerOptions(failure_threshold=2))
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.root.core.switch()
+        with self.assertRaises(CircuitOpenError):
+            client.root.core.switch()
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(client.breaker_stats()["state"], "open")
+
+    @responses.activate
+    def test_breaker_open_not_retried(self, sleep):
+        responses.add(responses.GET, URL + "core/switch", body=_refused())
+        client = self._client(retry=RetryPolicy(max_attempts=5), breaker=BreakerOptions(failure_threshold=2))
+        # the third attempt fails with CircuitOpenError, which is not retried
+        with self.assertRaises(CircuitOpenError):
+            client.root.core.switch()
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(sleep.call_count, 2)
+        with self.assertRaises(CircuitOpenError):
+            client.root.core.switch()
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(client.retry_stats(), {"retried": 1, "retries": 2, "exhausted": 1})
+
+    def test_breaker_interrupted(self, sleep):
+        client = self._client(breaker=BreakerOptions(failure_threshold=1, reset_timeout=0))
+        client.breaker.record(_refused())
+        # the trial request is interrupted: the breaker stays half-open, and lets the next trial through
+        with patch.object(client, "_logged_request", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                client.root.core.switch()
+        self.assertEqual(client.breaker_stats()["state"], "half-open")
+        self.assertEqual(client.breaker_stats()["failures"], 1)
+        client.breaker.allow()
+
+    def test_defaults(self, sleep):
+        client = self._client()
+        self.assertIsNone(client.retry_stats())
+        self.assertIsNone(client.breaker_stats())
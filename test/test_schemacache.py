@@ -0,0 +1,148 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import requests
+
+import pybsn
+from pybsn.schemacache import SchemaCache, find_node
+from pybsn.simulator import BigDbSimulator
+
+SCHEMA = {
+    "nodeType": "CONTAINER",
+    "name": "controller",
+    "childNodes": {
+        "core": {
+            "nodeType": "CONTAINER",
+            "name": "core",
+            "childNodes": {
+                "switch": {
+                    "nodeType": "LIST",
+                    "name": "switch",
+                    "keyNodeNames": ["name"],
+                    "listElementSchemaNode": {
+                        "nodeType": "LIST_ELEMENT",
+                        "name": "switch",
+                        "childNodes": {
+                            "name": {"nodeType": "LEAF", "name": "name", "leafType": "STRING"},
+                            "dpid": {"nodeType": "LEAF", "name": "dpid", "leafType": "STRING"},
+                        },
+                    },
+                },
+                "version": {
+                    "nodeType": "CONTAINER",
+                    "name": "version",
+                    "childNodes": {
+                        "appliance": {"nodeType": "LEAF", "name": "appliance", "leafType": "STRING"},
+                    },
+                },
+            },
+        }
+    },
+}
+
+
+class TestFindNode(unittest.TestCase):
+    def test_find_node(self):
+        self.assertIs(find_node(SCHEMA, "controller"), SCHEMA)
+        self.assertEqual(find_node(SCHEMA, "controller/core/switch")["nodeType"], "LIST")
+        self.assertEqual(find_node(SCHEMA, "controller/core/switch/dpid/")["leafType"], "STRING")
+        self.assertIsNone(find_node(SCHEMA, "controller/core/interface"))
+        self.assertIsNone(find_node(SCHEMA, "controller/core/switch/dpid/other"))
+        self.assertIsNone(find_node(SCHEMA, ""))
+
+
+class TestSchemaCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SchemaCache(os.path.join(self.directory, "schema"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store_load(self):
+        self.assertIsNone(self.cache.load("http://c1:8080", "v1"))
+        self.cache.store("http://c1:8080", "v1", SCHEMA)
+        self.cache.store("http://c2:8080", "v1", SCHEMA)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.path("http://c1:8080", "v1")).st_mode), 0o600)
+        self.assertEqual(SchemaCache(self.cache.directory).load("http://c1:8080", "v1"), SCHEMA)
+        self.assertIsNone(SchemaCache(self.cache.directory).load("http://c1:8080", "v2"))
+
+    def test_new_version_replaces(self):
+        self.cache.store("http://c1:8080", "v1", SCHEMA)
+        self.cache.store("http://c2:8080", "v1", SCHEMA)
+        self.cache.store("http://c1:8080", "v2", SCHEMA)
+        self.assertFalse(os.path.exists(self.cache.path("http://c1:8080", "v1")))
+        self.assertIsNone(self.cache.load("http://c1:8080", "v1"))
+        self.assertIsNotNone(self.cache.load("http://c2:8080", "v1"))
+
+    def test_lookup_copies(self):
+        self.cache.store("http://c1:8080", "v1", SCHEMA)
+        node = self.cache.lookup("http://c1:8080", "v1", "controller/core/switch")
+        node["name"] = "modified"
+        self.assertEqual(self.cache.lookup("http://c1:8080", "v1", "controller/core/switch")["name"], "switch")
+        self.assertIsNone(self.cache.lookup("http://c1:8080", "v1", "controller/core/interface"))
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 1})
+
+    def test_unreadable(self):
+        os.makedirs(self.cache.directory)
+        with open(self.cache.path("http://c1:8080", "v1"), "wb") as f:
+            f.write(b"not a pickle")
+        with self.assertLogs("pybsn", "WARNING"):
+            self.assertIsNone(self.cache.load("http://c1:8080", "v1"))
+
+
+class TestClientSchemaCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SchemaCache(self.directory)
+        self.simulator = BigDbSimulator(
+            data={"core": {"version": {"appliance": "5.0.0"}}}, lists={"core/switch": "name"}, schema=SCHEMA
+        ).start()
+
+    def tearDown(self):
+        self.simulator.stop()
+        shutil.rmtree(self.directory)
+
+    def _schema_requests(self):
+        return self.simulator.stats()["GET"]
+
+    def test_served_locally(self):
+        client = pybsn.connect(self.simulator.url, schema_cache=self.cache)
+        self.assertEqual(client.schema("controller/core/switch"), SCHEMA["childNodes"]["core"]["childNodes"]["switch"])
+        requests_sent = self._schema_requests()
+        self.assertEqual(client.root.core.switch.match(name="leaf1").dpid.schema()["leafType"], "STRING")
+        self.assertEqual(client.root.schema(), SCHEMA)
+        self.assertEqual(self._schema_requests(), requests_sent)
+        self.assertEqual(client.schema_cache_stats(), {"hits": 3, "misses": 0})
+
+        # another process: only the version is requested
+        client = pybsn.connect(self.simulator.url, schema_cache=SchemaCache(self.directory))
+        client.schema("controller/core")
+        self.assertEqual(self._schema_requests(), requests_sent + 1)
+
+    def test_unknown_path(self):
+        client = pybsn.connect(self.simulator.url, schema_cache=self.cache)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.schema("controller/core/interface")
+        self.assertEqual(client.schema_cache_stats(), {"hits": 0, "misses": 1})
+
+    def test_upgrade(self):
+        pybsn.connect(self.simulator.url, schema_cache=self.cache).schema("controller/core")
+        self.simulator.store.write("PUT", [("core", []), ("version", []), ("appliance", [])], "5.1.0")
+        requests_sent = self._schema_requests()
+        pybsn.connect(self.simulator.url, schema_cache=self.cache).schema("controller/core")
+        # the version, and the schema of the new version
+        self.assertEqual(self._schema_requests(), requests_sent + 2)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_unknown_version(self):
+        self.simulator.store.write("DELETE", [("core", []), ("version", [])], None)
+        client = pybsn.connect(self.simulator.url, schema_cache=self.cache)
+        self.assertEqual(client.schema("controller/core/switch")["nodeType"], "LIST")
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_without_cache(self):
+        self.assertIsNone(pybsn.connect(self.simulator.url).schema_cache_stats())
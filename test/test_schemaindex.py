@@ -0,0 +1,84 @@
+import unittest
+
+from pybsn.schemaindex import SchemaIndex
+
+SCHEMA = {
+    "nodeType": "CONTAINER",
+    "name": "core",
+    "childNodes": {
+        "switch": {
+            "nodeType": "LIST",
+            "name": "switch",
+            "keyNodeNames": ["name"],
+            "dataSources": ["config", "operational"],
+            "description": "Switches",
+            "listElementSchemaNode": {
+                "nodeType": "LIST_ELEMENT",
+                "name": "switch",
+                "childNodes": {
+                    "name": {"nodeType": "LEAF", "name": "name", "leafType": "STRING", "dataSources": ["config"]},
+                    "role": {
+                        "nodeType": "LEAF",
+                        "name": "role",
+                        "leafType": "STRING",
+                        "typeSchemaNode": {"leafType": "ENUMERATION"},
+                    },
+                    "tag": {"nodeType": "LEAF_LIST", "name": "tag", "leafSchemaNode": {"leafType": "INTEGER"}},
+                },
+            },
+        },
+        "disconnect": {
+            "nodeType": "RPC",
+            "name": "disconnect",
+            "inputSchemaNode": {
+                "nodeType": "CONTAINER",
+                "name": "input",
+                "childNodes": {"name": {"nodeType": "LEAF", "name": "name", "leafType": "STRING"}},
+            },
+        },
+    },
+}
+
+
+class TestSchemaIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SchemaIndex(SCHEMA, "controller/core")
+
+    def test_lookup(self):
+        entry = self.index["controller/core/switch"]
+        self.assertEqual((entry.name, entry.node_type, entry.keys), ("switch", "LIST", ("name",)))
+        self.assertEqual((entry.config, entry.description, entry.depth), (True, "Switches", 1))
+        self.assertIs(entry.node, SCHEMA["childNodes"]["switch"])
+        self.assertEqual(self.index.get("controller/core/switch/role").leaf_type, "ENUMERATION")
+        self.assertEqual(self.index.get("controller/core/switch/tag").leaf_type, "INTEGER")
+        self.assertFalse(self.index.get("controller/core/switch/role").config)
+        self.assertIsNone(self.index.get("controller/core/interface"))
+        with self.assertRaises(KeyError):
+            self.index.node_type("controller/core/interface")
+
+    def test_data_paths(self):
+        self.assertEqual(self.index.keys("controller/core/switch[name='leaf1']"), ("name",))
+        self.assertIn("controller/core/switch[name='leaf1']/role/", self.index)
+        self.assertEqual(self.index.keys("controller/core"), ())
+
+    def test_children(self):
+        self.assertEqual(self.index.children("controller/core"), ["switch", "disconnect"])
+        self.assertEqual(self.index.children("controller/core/switch"), ["name", "role", "tag"])
+        self.assertEqual(self.index.children("controller/core/disconnect"), ["in"])
+        self.assertEqual(self.index.node_type("controller/core/disconnect/in/name"), "LEAF")
+
+    def test_subtree(self):
+        self.assertEqual(len(self.index), 8)
+        self.assertEqual([entry.path for entry in self.index], self.index.paths)
+        self.assertEqual(
+            self.index.paths_under("controller/core/switch"),
+            ["controller/core/switch/name", "controller/core/switch/role", "controller/core/switch/tag"],
+        )
+        self.assertEqual(
+            [entry.name for entry in self.index.subtree(max_depth=1)],
+            ["core", "switch", "disconnect"],
+        )
+        self.assertEqual(
+            [entry.name for entry in self.index.subtree("controller/core/disconnect", max_depth=1)],
+            ["disconnect", "in"],
+        )
@@ -0,0 +1,91 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import requests
+
+import pybsn
+from pybsn.sessioncache import SessionCache
+from pybsn.simulator import BigDbSimulator
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SessionCache(os.path.join(self.directory, "pybsn", "sessions.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store_load_forget(self):
+        self.assertIsNone(self.cache.load("host1", "admin"))
+        self.cache.store("host1", "admin", "https://host1:8443", "cookie1")
+        self.cache.store("host1", None, "https://host1:8443", None)
+        session = self.cache.load("host1", "admin")
+        self.assertEqual((session.url, session.cookie), ("https://host1:8443", "cookie1"))
+        self.assertIsNone(self.cache.load("host1", None).cookie)
+        self.assertIsNone(self.cache.load("host2", "admin"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.path).st_mode), 0o600)
+        self.cache.forget("host1", "admin")
+        self.assertIsNone(self.cache.load("host1", "admin"))
+        self.assertIsNotNone(self.cache.load("host1", None))
+
+    def test_unreadable(self):
+        os.makedirs(os.path.dirname(self.cache.path))
+        with open(self.cache.path, "w") as f:
+            f.write("{not json")
+        with self.assertLogs("pybsn", "WARNING"):
+            self.assertIsNone(self.cache.load("host1", "admin"))
+
+
+class TestConnectWithSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SessionCache(os.path.join(self.directory, "sessions.json"))
+        self.simulator = BigDbSimulator(users={"admin": "adminadmin"}, tokens=["api-token"]).start()
+
+    def tearDown(self):
+        self.simulator.stop()
+        shutil.rmtree(self.directory)
+
+    def _connect(self, **kwargs):
+        return pybsn.connect(self.simulator.url, session_cache=self.cache, **kwargs)
+
+    def test_reuse(self):
+        client = self._connect(username="admin", password="adminadmin")
+        cookie = client.session.cookies.get("session_cookie")
+        self.assertEqual(self.cache.load(self.simulator.url, "admin").cookie, cookie)
+        client.close()  # does not log out
+        self.assertEqual(self.simulator.stats()["POST"], 1)
+
+        client = self._connect(username="admin", password="adminadmin")
+        self.assertEqual(client.session.cookies.get("session_cookie"), cookie)
+        self.assertEqual(client.root.core.aaa.auth_context()[0]["user-info"]["user-name"], "admin")
+        self.assertEqual(self.simulator.stats()["POST"], 1)
+
+    def test_rejected_session(self):
+        client = self._connect(username="admin", password="adminadmin")
+        cookie = client.session.cookies.get("session_cookie")
+        requests.post(
+            self.simulator.url + "/api/v1/rpc/controller/core/aaa/session/logout", cookies={"session_cookie": cookie}
+        )
+
+        client = self._connect(username="admin", password="adminadmin")
+        new_cookie = client.session.cookies.get("session_cookie")
+        self.assertNotEqual(new_cookie, cookie)
+        self.assertEqual(self.cache.load(self.simulator.url, "admin").cookie, new_cookie)
+        client.root.core.aaa.auth_context()
+
+    def test_token(self):
+        self._connect(token="api-token")
+        self.assertIsNone(self.cache.load(self.simulator.url, None).cookie)
+        self._connect(token="api-token")
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self._connect(token="wrong")
+        self.assertIsNone(self.cache.load(self.simulator.url, None))
+
+    def test_without_cache(self):
+        client = pybsn.connect(self.simulator.url, "admin", "adminadmin")
+        self.assertFalse(client.keep_session)
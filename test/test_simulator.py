@@ -0,0 +1,139 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+import pybsn
+from pybsn.simulator import BigDbSimulator, DataStore, SimulatorError, parse_path
+
+SWITCHES = [
+    {"name": "leaf2", "dpid": "00:00:00:00:00:00:00:02", "port-count": 48},
+    {"name": "leaf1", "dpid": "00:00:00:00:00:00:00:01", "port-count": 32},
+    {"name": "spine1", "dpid": "00:00:00:00:00:00:00:03", "port-count": 64},
+]
+
+
+class TestParsePath(unittest.TestCase):
+    def test_predicates(self):
+        self.assertEqual(
+            parse_path("core/switch[name='leaf%201']/interface[name=\"ethernet1/1\"]"),
+            [("core", []), ("switch", [("name", "=", "leaf 1")]), ("interface", [("name", "=", "ethernet1/1")])],
+        )
+        self.assertEqual(
+            parse_path("segment[member-vlan%3C1000][id!=5][x%3E=%22a]b%22]"),
+            [("segment", [("member-vlan", "<", 1000), ("id", "!=", 5), ("x", ">=", "a]b")])],
+        )
+        self.assertEqual(parse_path("a[n=%22it's%22]"), [("a", [("n", "=", "it's")])])
+
+    def test_invalid(self):
+        for path in ("a//b", "a[name]", "a[name='x", "a[name='x'"):
+            with self.assertRaises(SimulatorError) as cm:
+                parse_path(path)
+            self.assertEqual(cm.exception.status, 400)
+
+
+class TestDataStore(unittest.TestCase):
+    def setUp(self):
+        self.store = DataStore({"core": {"switch": SWITCHES}}, lists={"core/switch": "name"})
+
+    def get(self, path):
+        return self.store.get(parse_path(path))
+
+    def test_sorted_by_key(self):
+        self.assertEqual([s["name"] for s in self.get("core/switch")], ["leaf1", "leaf2", "spine1"])
+
+    def test_writes(self):
+        self.store.write("PATCH", parse_path("core/switch[name='leaf1']"), {"port-count": 16})
+        self.assertEqual(self.get("core/switch[name='leaf1']/port-count"), [16])
+        self.store.write("PUT", parse_path("core/switch[name='leaf0']"), {"dpid": "00"})
+        self.assertEqual(self.get("core/switch[name='leaf0']"), [{"name": "leaf0", "dpid": "00"}])
+        with self.assertRaises(SimulatorError) as cm:
+            self.store.write("POST", parse_path("core/switch"), {"name": "leaf0"})
+        self.assertEqual(cm.exception.status, 409)
+        self.store.write("DELETE", parse_path("core/switch[port-count>40]"), None)
+        self.assertEqual([s["name"] for s in self.get("core/switch")], ["leaf0", "leaf1"])
+        self.store.write("PUT", parse_path("core/switch[name='leaf0']/interface[name='eth1']"), {"up": True})
+        self.assertEqual(self.get("core/switch/interface[up='true']"), [{"name": "eth1", "up": True}])
+
+    def test_schema(self):
+        switch = self.store.schema("core/switch")
+        self.assertEqual((switch["nodeType"], switch["keyNodeNames"]), ("LIST", ["name"]))
+        self.assertEqual(list(switch["listElementSchemaNode"]["childNodes"]), ["name", "dpid", "port-count"])
+        with self.assertRaises(SimulatorError):
+            self.store.schema("core/missing")
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = BigDbSimulator(
+            data={"core": {"switch": SWITCHES}},
+            lists={"core/switch": "name"},
+            users={"admin": "adminadmin"},
+            tokens=["api-token"],
+        ).start()
+        self.client = pybsn.connect(self.simulator.url, "admin", "adminadmin")
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_login(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            pybsn.connect(self.simulator.url, "admin", "wrong")
+        with self.assertRaises(requests.exceptions.HTTPError):
+            pybsn.connect(self.simulator.url, token="wrong")
+        client = pybsn.connect(self.simulator.url, token="api-token")
+        self.assertEqual(len(client.root.core.switch()), 3)
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            pybsn.BigDbClient(self.simulator.url, requests.Session()).root.core.switch()
+        self.assertEqual(cm.exception.response.status_code, 401)
+
+    def test_crud(self):
+        switch = self.client.root.core.switch
+        self.assertEqual(switch.match(name="leaf1").dpid(), ["00:00:00:00:00:00:00:01"])
+        switch.match(name="leaf 4").put({"dpid": "00:00:00:00:00:00:00:04"})
+        switch.match(name="leaf 4").patch({"port-count": 8})
+        self.assertEqual(switch.match(name="leaf 4").get(params={"single": "true"})["port-count"], 8)
+        self.assertEqual(switch.filter("port-count<$n", n=40).select("name")(), [{"name": "leaf 4"}, {"name": "leaf1"}])
+        switch.match(name="leaf 4").delete()
+        self.assertEqual(len(switch()), 3)
+
+    def test_schema_and_paging(self):
+        switch = self.client.root.core.switch
+        self.assertEqual(switch.exclude("dpid", "port_count")(), [{"name": n} for n in ("leaf1", "leaf2", "spine1")])
+        pages = list(switch.iter_pages(2))
+        self.assertEqual([page.last_key for page in pages], ["leaf2", "spine1"])
+        resumed = list(switch.iter_pages(2, start_after="leaf1"))
+        self.assertEqual([e["name"] for e in resumed[0].elements], ["leaf2", "spine1"])
+
+    def test_rpc(self):
+        self.simulator.add_rpc("test/echo", lambda data: {"echo": data})
+        self.assertEqual(self.client.root.test.echo.rpc({"x": 1}), {"echo": {"x": 1}})
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.root.test.missing.rpc()
+
+    def test_responses_reused(self):
+        switch = self.client.root.core.switch
+        with patch.object(self.simulator.store, "get", wraps=self.simulator.store.get) as get:
+            self.assertEqual(switch(), switch())
+            self.assertEqual(get.call_count, 1)
+            switch.match(name="leaf1").patch({"port-count": 8})
+            self.assertEqual(switch.match(name="leaf1").port_count(), [8])
+            self.assertEqual(switch()[0]["port-count"], 8)
+            self.assertEqual(get.call_count, 3)
+
+    def test_error_injection(self):
+        self.simulator.inject_error("/api/v1/data/controller/core", status=500, count=2)
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.client.root.core.switch()
+        self.assertEqual(len(self.client.root.core.switch()), 3)
+        stats = self.simulator.stats()
+        self.assertEqual(stats["injected_errors"], 2)
+        self.assertEqual(stats["GET"], 3)
+
+    def test_latency(self):
+        self.simulator.latency = lambda method, path: 0.05 if method == "GET" else 0.0
+        start = time.monotonic()
+        self.client.root.core.switch()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+import unittest
+
+import requests
+import responses
+
+import pybsn
+from pybsn.singleflight import SingleFlight
+
+URL = "http://127.0.0.1:8080/api/v1/data/controller/core/switch"
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def _fn(self, result):
+        def fn():
+            self.calls += 1
+            self.release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return fn
+
+    def _run_concurrently(self, count, key, fn):
+        results = []
+
+        def run():
+            try:
+                results.append(self.flight.do(key, fn))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: self.flight.stats()["coalesced"] == count - 1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_shared_result(self):
+        results = self._run_concurrently(5, "a", self._fn("result"))
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.stats(), dict(calls=1, coalesced=4, in_flight=0))
+
+    def test_shared_error(self):
+        error = ValueError("failed")
+        results = self._run_concurrently(3, "a", self._fn(error))
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    def test_sequential_calls_not_shared(self):
+        self.release.set()
+        self.assertEqual(self.flight.do("a", self._fn(1)), 1)
+        self.assertEqual(self.flight.do("a", self._fn(2)), 2)
+        self.assertEqual(self.flight.do("b", self._fn(3)), 3)
+        self.assertEqual(self.flight.stats(), dict(calls=3, coalesced=0, in_flight=0))
+
+    def test_forget(self):
+        leader = threading.Thread(target=self.flight.do, args=("a", self._fn(1)))
+        leader.start()
+        wait_until(lambda: self.calls == 1)
+        self.flight.forget()
+        self.release.set()
+        self.assertEqual(self.flight.do("a", self._fn(2)), 2)
+        leader.join()
+        self.assertEqual(self.flight.stats(), dict(calls=2, coalesced=0, in_flight=0))
+
+
+class TestCoalescingClient(unittest.TestCase):
+    def setUp(self):
+        self.client = pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session(), coalesce=True)
+        self.release = threading.Event()
+
+        def callback(request):
+            self.release.wait(5)
+            return 200, {}, json.dumps([{"name": "leaf1"}])
+
+        responses.add_callback(responses.GET, URL, callback=callback)
+
+    @responses.activate
+    def test_concurrent_gets_coalesced(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.client.root.core.switch())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: self.client.coalesce_stats()["coalesced"] == 3)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [[{"name": "leaf1"}]] * 4)
+        self.assertEqual(len({id(result) for result in results}), 4)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_params_not_coalesced(self):
+        self.release.set()
+        self.client.root.core.switch()
+        self.client.root.core.switch({"single": "true"})
+        self.assertEqual(self.client.coalesce_stats(), dict(calls=2, coalesced=0, in_flight=0))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(pybsn.BigDbClient("http://127.0.0.1:8080", requests.Session()).coalesce_stats())
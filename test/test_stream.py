@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from pybsn.stream import iter_json_array
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    DOCUMENT = [
+        {"name": "leaf1", "dpid": "00:00:00:00:00:00:00:01", "port": [1, 2, 3]},
+        {"name": 'tricky ] , [ " \\\\ {', "value": -12345.678e-3},
+        1234567890,
+        "café ☃",
+        [],
+        {},
+        True,
+        None,
+        [[1, [2]], {"a": {"b": [3]}}],
+    ]
+
+    def test_all_chunk_sizes(self):
+        data = json.dumps(self.DOCUMENT, ensure_ascii=False).encode("utf-8")
+        for size in (1, 2, 3, 7, 64, len(data)):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size))), self.DOCUMENT)
+
+    def test_whitespace(self):
+        data = b' \n[ 1 ,\t"a" ,\r\n {"b" : 2} ]\n '
+        self.assertEqual(list(iter_json_array(chunked(data, 1))), [1, "a", {"b": 2}])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b"[", b" ", b"]"])), [])
+
+    def test_not_an_array(self):
+        self.assertEqual(list(iter_json_array([b'{"name":', b' "leaf1"}'])), [{"name": "leaf1"}])
+        self.assertEqual(list(iter_json_array([b"12", b"34"])), [1234])
+
+    def test_yields_incrementally(self):
+        def chunks():
+            yield b'[{"a": 1},'
+            raise AssertionError("read past the first element")
+
+        self.assertEqual(next(iter_json_array(chunks())), {"a": 1})
+
+    def test_escapes_across_chunks(self):
+        data = json.dumps(["\\", '\\"]', {"a": "\\\\"}]).encode()
+        for size in (1, 2, 3):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size))), ["\\", '\\"]', {"a": "\\\\"}])
+
+    def test_large_element_decoded_once(self):
+        element = {"port": [{"name": "ethernet%d" % i} for i in range(2000)]}
+        data = json.dumps([element, 1]).encode()
+        decoded = []
+
+        def loads(value):
+            decoded.append(value)
+            return json.loads(value)
+
+        self.assertEqual(list(iter_json_array(chunked(data, 16), loads)), [element, 1])
+        self.assertEqual(len(decoded), 2)
+
+    def test_malformed(self):
+        for data in (b"", b"[1, 2", b"[1 2]", b"[1,]", b"[,1]", b"[1] 2", b'[{"a": }]', b'{"a": 1'):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(chunked(data, 2)))
@@ -0,0 +1,39 @@
+import unittest
+
+from pybsn.template import PathTemplate, compile_template, normalize
+
+
+class TestNormalize(unittest.TestCase):
+    def test_types(self):
+        self.assertEqual(normalize("foo bar"), "'foo%20bar'")
+        self.assertEqual(normalize("foo/bar"), "'foo/bar'")
+        self.assertEqual(normalize("café"), "'caf%C3%A9'")
+        self.assertEqual(normalize(123), "123")
+        self.assertEqual(normalize(-1.5), "-1.5")
+        self.assertEqual(normalize(True), "'true'")
+        self.assertEqual(normalize(False), "'false'")
+
+    def test_repr_escapes(self):
+        self.assertEqual(normalize("it's"), "%22it%27s%22")
+        self.assertEqual(normalize("a\\b"), "'a%5C%5Cb'")
+        self.assertEqual(normalize("a\nb"), "'a%5Cnb'")
+
+
+class TestPathTemplate(unittest.TestCase):
+    def test_substitute(self):
+        template = PathTemplate("tenant[name=$t]/segment[name=${s}]/endpoint[cost<$$1]")
+        self.assertEqual(template.names, ("t", "s"))
+        self.assertEqual(template.substitute(t="t1", s=2), "tenant[name='t1']/segment[name=2]/endpoint[cost<$1]")
+        self.assertEqual(template.substitute({"t": "t1"}, s=True), "tenant[name='t1']/segment[name='true']/endpoint[cost<$1]")
+
+    def test_no_placeholders(self):
+        self.assertEqual(PathTemplate("a='foo'").substitute(), "a='foo'")
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            PathTemplate("name=$x").substitute(y=1)
+        with self.assertRaises(ValueError):
+            PathTemplate("name=$1")
+
+    def test_cached(self):
+        self.assertIs(compile_template("name=$x"), compile_template("name=$x"))
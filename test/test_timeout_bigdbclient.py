@@ -21,7 +21,9 @@ long_timeout = urllib3.util.Timeout(connect=MIDDLE_BLOCKING_TIME * 2.0, read=MID
 
 
 class SuccessfulResponse:
+    status_code = 200
     text = '{"schema":"big"}'
+    content = b'{"schema":"big"}'
 
     def raise_for_status(self):
         pass
@@ -81,6 +83,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
 
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword")
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url)
             self._assertTimeoutValue(None, mock_send.mock_calls[0])
 
@@ -94,6 +97,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword", timeout=short_timeout)
 
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url)
             self._assertTimeoutValue(short_timeout, mock_send.mock_calls[0])
 
@@ -107,6 +111,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword", timeout=SHORT_BLOCKING_TIME)
 
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url)
             self._assertTimeoutValue(SHORT_BLOCKING_TIME, mock_send.mock_calls[0])
 
@@ -116,6 +121,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword")
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url, timeout=short_timeout)
             self._assertTimeoutValue(short_timeout, mock_send.mock_calls[0])
 
@@ -125,6 +131,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword", timeout=short_timeout.read_timeout)
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url, timeout=None)
             self._assertTimeoutValue(None, mock_send.mock_calls[0])
 
@@ -136,6 +143,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect("http://127.0.0.1:8080", "admin", "somepassword", timeout=short_timeout.read_timeout)
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url, timeout=timeout_arg)
             self._assertTimeoutValue(timeout_arg, mock_send.mock_calls[0])
 
@@ -147,6 +155,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect(self.url, "admin", "somepassword", timeout=middle_timeout.read_timeout)
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.get(self.url, timeout=pybsn.CLIENT_TIMEOUT)
             self._assertTimeoutValue(middle_timeout.read_timeout, mock_send.mock_calls[0])
 
@@ -156,6 +165,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect(self.url, "admin", "somepassword")
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.rpc(self.url, data={})
             self._assertTimeoutValue(None, mock_send.mock_calls[0])
 
@@ -165,6 +175,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect(self.url, "admin", "somepassword", timeout=short_timeout)
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.rpc(self.url, data={})
             self._assertTimeoutValue(short_timeout, mock_send.mock_calls[0])
 
@@ -174,6 +185,7 @@ class TestTimeoutBigDbClient(unittest.TestCase):
         self._add_login_responses()
         client = pybsn.connect(self.url, "admin", "somepassword")
         with patch.object(requests.Session, "send") as mock_send:
+            mock_send.return_value = SuccessfulResponse()
             client.rpc(self.url, data={}, timeout=short_timeout)
             self._assertTimeoutValue(short_timeout, mock_send.mock_calls[0])
 